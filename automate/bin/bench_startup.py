@@ -0,0 +1,178 @@
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+from discovery import *
+
+# Cold-start benchmark for generated projects: every run is a fresh
+# interpreter, timed from process launch through django.setup(), the
+# ROOT_URLCONF import and the first request via the test client.
+#
+# Functions in this bench_startup.py file:
+# percentile(values, pct)
+# summarize_timings(values)
+# run_startup_probe(project_path, settings_module, request_path, python_exe)
+# bench_startup(project_path, runs, request_path, python_exe)
+# compare_results(previous, current)
+
+BENCH_DIR_NAME = ".bench"
+STARTUP_PHASES = ("import_django", "setup", "urlconf", "first_request", "in_process", "wall")
+
+# Runs inside the child interpreter; prints one JSON line with its timings.
+STARTUP_PROBE = r"""
+import json, os, sys, time
+t0 = time.perf_counter()
+import django
+t1 = time.perf_counter()
+django.setup()
+t2 = time.perf_counter()
+from importlib import import_module
+from django.conf import settings
+import_module(settings.ROOT_URLCONF)
+from django.urls import get_resolver
+get_resolver().url_patterns
+t3 = time.perf_counter()
+from django.test import Client
+settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, "testserver"]
+status = Client(raise_request_exception=False).get(sys.argv[1]).status_code
+t4 = time.perf_counter()
+print(json.dumps({
+    "import_django": t1 - t0, "setup": t2 - t1, "urlconf": t3 - t2,
+    "first_request": t4 - t3, "in_process": t4 - t0, "status": status,
+    "modules": len(sys.modules),
+}))
+"""
+
+
+def percentile(values, pct):
+    """Linear-interpolated percentile (pct in 0..100) of a list of numbers."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize_timings(values):
+    """Return min/median/p95/max/mean for a list of timings."""
+    return {
+        "min": min(values),
+        "median": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "max": max(values),
+        "mean": sum(values) / len(values),
+    }
+
+
+def run_startup_probe(project_path, settings_module, request_path="/", python_exe=sys.executable):
+    """Launch one fresh interpreter in the project and return its timings."""
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings_module)
+    start = time.perf_counter()
+    result = subprocess.run([python_exe, "-c", STARTUP_PROBE, request_path], cwd=project_path, env=env,
+                            capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "probe failed")
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings["wall"] = wall
+    return timings
+
+
+def bench_startup(project_path, runs=10, request_path="/", python_exe=sys.executable):
+    """Run the startup probe `runs` times and summarize every phase."""
+    project_path = os.path.abspath(project_path)
+    settings_package = find_settings_package(project_path)
+    if settings_package is None:
+        raise FileNotFoundError(f"No settings package found in '{project_path}'.")
+
+    # one warm-up run so the .pyc files exist and every run measures the same thing
+    run_startup_probe(project_path, f"{settings_package}.settings", request_path, python_exe)
+    samples = [run_startup_probe(project_path, f"{settings_package}.settings", request_path, python_exe)
+               for _ in range(runs)]
+
+    return {
+        "project": os.path.basename(project_path),
+        "settings": f"{settings_package}.settings",
+        "python": python_exe,
+        "runs": runs,
+        "request_path": request_path,
+        "status": samples[-1]["status"],
+        "modules": samples[-1]["modules"],
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "phases": {phase: summarize_timings([s[phase] for s in samples]) for phase in STARTUP_PHASES},
+        "samples": samples,
+    }
+
+
+def compare_results(previous, current):
+    """Return {phase: (previous_median, current_median, change_pct)} for two result dicts."""
+    comparison = {}
+    for phase in STARTUP_PHASES:
+        before = previous.get("phases", {}).get(phase, {}).get("median")
+        after = current["phases"][phase]["median"]
+        if before:
+            comparison[phase] = (before, after, (after - before) / before * 100.0)
+    return comparison
+
+
+def _print_report(results, comparison=None):
+    print(f"Startup benchmark for '{results['project']}' ({results['runs']} runs, "
+          f"GET {results['request_path']} -> {results['status']}, {results['modules']} modules loaded)")
+    print(f"{'phase':<15}{'median ms':>12}{'p95 ms':>12}{'min ms':>12}{'max ms':>12}")
+    for phase in STARTUP_PHASES:
+        stats = results["phases"][phase]
+        line = (f"{phase:<15}{stats['median'] * 1000:>12.1f}{stats['p95'] * 1000:>12.1f}"
+                f"{stats['min'] * 1000:>12.1f}{stats['max'] * 1000:>12.1f}")
+        if comparison and phase in comparison:
+            line += f"   {comparison[phase][2]:+.1f}% vs baseline"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Measure cold-start time of a generated Django project.')
+    parser.add_argument('project_path', help='The directory of the Django project (the one holding manage.py)')
+    parser.add_argument('--runs', type=int, default=10, help='Number of fresh interpreters to launch (default 10)')
+    parser.add_argument('--path', default='/', help='Path requested through the test client (default /)')
+    parser.add_argument('--python', default=sys.executable, help='Interpreter to launch (default: this one)')
+    parser.add_argument('--output', help=f'JSON file for the results (default <project>/{BENCH_DIR_NAME}/startup-<time>.json)')
+    parser.add_argument('--compare', help='Earlier results JSON to compare medians against')
+
+    args = parser.parse_args()
+    if not os.path.isdir(args.project_path):
+        print(f"BENCH-Error: Django project '{args.project_path}' does not exist.")
+        sys.exit(1)
+    if args.runs < 1:
+        print("BENCH-Error: --runs must be at least 1.")
+        sys.exit(1)
+
+    baseline = None
+    if args.compare:
+        # read before the (slow) runs so a bad path fails fast
+        try:
+            with open(args.compare, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+            if not isinstance(baseline, dict):
+                raise ValueError("not a results object")
+        except (OSError, ValueError) as e:
+            print(f"BENCH-Error: can't read --compare file '{args.compare}': {e}")
+            sys.exit(1)
+
+    try:
+        results = bench_startup(args.project_path, args.runs, args.path, args.python)
+    except (OSError, RuntimeError) as e:
+        print(f"BENCH-Error: {e}")
+        sys.exit(1)
+
+    comparison = compare_results(baseline, results) if baseline is not None else None
+    _print_report(results, comparison)
+
+    output = args.output or os.path.join(args.project_path, BENCH_DIR_NAME, f"startup-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved to {output}")
@@ -0,0 +1,366 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+from discovery import find_settings_package
+from scaffold import create_project_skeleton, create_app_skeleton
+from generate_urls import generate_app_urls, generate_urls
+from build_urls import build_static_urls, LAZY_URLS_TEMPLATE
+from bench_startup import percentile, summarize_timings, BENCH_DIR_NAME
+
+# URL routing micro-benchmark for generated projects. A fresh interpreter
+# boots the project, imports the real root URLConf and walks it: every route
+# gets a sample path (converters filled with sample values), and every named
+# route a reverse() call. Per-call times of resolve(), of resolve() on paths
+# that 404 (a miss at the root and inside every include) and of reverse() are
+# reported as throughput and percentiles.
+#
+# Synthetic mode builds throwaway projects of N apps x M modules with the same
+# generators `./django create` uses (urls_app.py, app_urls.py, a static or
+# dynamic root urls.py) and benchmarks each, to show how routing cost scales.
+#
+# Functions in this bench_urls.py file:
+# run_url_probe(project_path, settings_module, iterations=20, python_exe=sys.executable)
+# summarize_url_probe(probe)
+# bench_urls(project_path, iterations=20, python_exe=sys.executable)
+# build_synthetic_project(base_dir, apps, modules, root="static", router=False)
+# bench_synthetic(sizes, iterations=20, root="static", router=False, python_exe=sys.executable, keep_dir=None)
+
+URL_OPERATIONS = ("resolve", "resolve_404", "reverse")
+SYNTHETIC_ROOTS = ("static", "dynamic")
+PROJECT_TEMPLATE_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "template", "project"))
+DYNAMIC_URLS_TEMPLATE = os.path.join(PROJECT_TEMPLATE_DIR, "dynamic_project_urls.py")
+# routes of every synthetic module: the shapes generated modules typically have
+SYNTHETIC_VIEWS = "from django.http import HttpResponse\n\n\ndef item(request, **kwargs):\n    return HttpResponse()\n"
+SYNTHETIC_URLS = """from django.urls import path
+
+from .views___MOD__ import item
+
+urlpatterns = [
+    path('', item, name='__APP_____MOD__-list'),
+    path('<int:pk>/', item, name='__APP_____MOD__-detail'),
+    path('<int:pk>/edit/', item, name='__APP_____MOD__-edit'),
+    path('<slug:slug>/', item, name='__APP_____MOD__-slug'),
+]
+"""
+
+# Runs inside the child interpreter; prints one JSON line with per-call nanoseconds.
+URL_PROBE = r"""
+import json, re, sys, time
+import django
+django.setup()
+from importlib import import_module
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.urls import (NoReverseMatch, Resolver404, URLResolver, get_resolver, resolve, reverse)
+from django.urls.converters import get_converters
+from django.urls.resolvers import RegexPattern, RoutePattern
+
+iterations = int(sys.argv[1])
+t0 = time.perf_counter()
+import_module(settings.ROOT_URLCONF)
+get_resolver().url_patterns
+urlconf = time.perf_counter() - t0
+
+SAMPLES = {"int": "7", "slug": "sample-slug", "str": "sample", "path": "a/b",
+           "uuid": "00000000-0000-0000-0000-000000000007"}
+CONVERTER_RE = re.compile(r"<(?:(?P<converter>[^>:]+):)?(?P<name>[^>]+)>")
+LITERAL_RE = re.compile(r"^[\w\-./]*$")
+converters = get_converters()
+
+
+def sample_route(pattern):
+    # (sample path piece, reverse kwargs) or None when no sample can be made
+    if isinstance(pattern, RoutePattern):
+        kwargs = {}
+        def fill(match):
+            converter = match.group("converter") or "str"
+            if converter not in SAMPLES or converter not in converters:
+                raise KeyError(converter)
+            kwargs[match.group("name")] = converters[converter].to_python(SAMPLES[converter])
+            return SAMPLES[converter]
+        try:
+            return CONVERTER_RE.sub(fill, str(pattern)), kwargs
+        except KeyError:
+            return None
+    if isinstance(pattern, RegexPattern):
+        literal = pattern.regex.pattern.lstrip("^").rstrip("$").replace("\\/", "/")
+        return (literal, {}) if LITERAL_RE.match(literal) else None
+    return str(pattern), {}  # locale prefix
+
+
+paths, names, missing, skipped, broken = [], [], ["/__bench_missing__/"], 0, 0
+
+
+def walk(patterns, prefix, namespaces, depth):
+    global skipped, broken
+    for pattern in patterns:
+        sample = sample_route(pattern.pattern)
+        if sample is None:
+            skipped += 1
+            continue
+        route, kwargs = sample
+        if isinstance(pattern, URLResolver):
+            nested = namespaces + [pattern.namespace] if pattern.namespace else namespaces
+            if depth < 3 and route:
+                missing.append(f"/{prefix}{route}__bench_missing__/")
+            try:
+                walk(pattern.url_patterns, prefix + route, nested, depth + 1)
+            except ImproperlyConfigured:  # e.g. an include of a urls_<mod>.py without urlpatterns
+                broken += 1
+        else:
+            paths.append("/" + prefix + route)
+            if pattern.name:
+                names.append((":".join(namespaces + [pattern.name]), kwargs))
+
+
+walk(get_resolver().url_patterns, "", [], 0)
+
+
+def is_miss(path):
+    try:
+        resolve(path)
+    except Resolver404:
+        return True
+    return False  # swallowed by a catch-all route such as <slug:slug>/
+
+
+missing = [path for path in dict.fromkeys(missing) if is_miss(path)]
+
+
+def resolve_hit(path):
+    resolve(path)
+
+
+def resolve_miss(path):
+    try:
+        resolve(path)
+    except Resolver404:
+        pass
+
+
+def reverse_name(item):
+    reverse(item[0], kwargs=item[1] or None)
+
+
+def timed(call, items):
+    usable = []
+    for item in items:  # warm-up pass: imports lazy includes, fills the reverse dicts
+        try:
+            call(item)
+            usable.append(item)
+        except (Resolver404, NoReverseMatch):
+            pass
+    samples = []
+    clock = time.perf_counter_ns
+    for _ in range(iterations):
+        for item in usable:
+            start = clock()
+            call(item)
+            samples.append(clock() - start)
+    return samples, len(items) - len(usable)
+
+
+resolve_samples, resolve_failed = timed(resolve_hit, paths)
+miss_samples, _ = timed(resolve_miss, missing)
+reverse_samples, reverse_failed = timed(reverse_name, names)
+print(json.dumps({
+    "urlconf": urlconf, "routes": len(paths), "names": len(names), "missing_paths": len(missing),
+    "skipped": skipped, "broken_includes": broken, "resolve_failed": resolve_failed,
+    "reverse_failed": reverse_failed, "resolve": resolve_samples, "resolve_404": miss_samples,
+    "reverse": reverse_samples,
+}))
+"""
+
+
+def run_url_probe(project_path, settings_module, iterations=20, python_exe=sys.executable):
+    """Launch a fresh interpreter in the project and return the raw probe output (samples in ns)."""
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings_module)
+    result = subprocess.run([python_exe, "-c", URL_PROBE, str(iterations)], cwd=project_path, env=env,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "probe failed")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def summarize_url_probe(probe):
+    """Per-operation calls, ops/s and percentiles (in seconds) of a probe; the raw samples are dropped."""
+    summary = {key: value for key, value in probe.items() if key not in URL_OPERATIONS}
+    for operation in URL_OPERATIONS:
+        samples = [ns / 1e9 for ns in probe[operation]]
+        if not samples:
+            summary[operation] = None
+            continue
+        stats = summarize_timings(samples)
+        stats["p99"] = percentile(samples, 99)
+        stats["calls"] = len(samples)
+        stats["ops_per_sec"] = len(samples) / sum(samples) if sum(samples) else None
+        summary[operation] = stats
+    return summary
+
+
+def bench_urls(project_path, iterations=20, python_exe=sys.executable):
+    """Benchmark the project's own URLConf."""
+    project_path = os.path.abspath(project_path)
+    settings_package = find_settings_package(project_path)
+    if settings_package is None:
+        raise FileNotFoundError(f"No settings package found in '{project_path}'.")
+    results = summarize_url_probe(run_url_probe(project_path, f"{settings_package}.settings", iterations, python_exe))
+    results.update({"project": os.path.basename(project_path), "iterations": iterations, "python": python_exe,
+                    "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")})
+    return results
+
+
+def build_synthetic_project(base_dir, apps, modules, root="static", router=False):
+    """
+    Generate a project of `apps` apps with `modules` modules each under base_dir; returns its path.
+
+    root="static" writes the `./django build-urls` root urls.py, root="dynamic"
+    installs dynamic_project_urls.py, which probes INSTALLED_APPS at import.
+    """
+    project_name = f"bench_{apps}x{modules}"
+    project_path = os.path.join(base_dir, project_name)
+    settings_package = f"project_{project_name}"
+    os.makedirs(project_path)
+    create_project_skeleton(settings_package, project_path)
+
+    app_names = [f"app_a{i}" for i in range(apps)]
+    for app_name in app_names:
+        create_app_skeleton(app_name, project_path)
+        app_path = os.path.join(project_path, app_name)
+        mod_app = os.path.join(app_path, "mod_app")
+        os.makedirs(mod_app)
+        open(os.path.join(mod_app, "__init__.py"), "w").close()
+        for j in range(modules):
+            mod_path = os.path.join(app_path, f"mod_m{j}")
+            os.makedirs(mod_path)
+            open(os.path.join(mod_path, "__init__.py"), "w").close()
+            with open(os.path.join(mod_path, f"views_m{j}.py"), "w") as f:
+                f.write(SYNTHETIC_VIEWS)
+            with open(os.path.join(mod_path, f"urls_m{j}.py"), "w") as f:
+                f.write(SYNTHETIC_URLS.replace("__APP__", app_name[4:]).replace("__MOD__", f"m{j}"))
+        generate_app_urls(app_name, app_name[4:], project_path)
+
+    settings_file = os.path.join(project_path, settings_package, "settings.py")
+    with open(settings_file, "a", encoding="utf-8") as f:
+        f.write(f"\nINSTALLED_APPS += {app_names!r}\nALLOWED_HOSTS = ['*']\n"
+                "STATIC_ROOT = BASE_DIR / 'staticfiles'\nMEDIA_URL = 'media/'\nMEDIA_ROOT = BASE_DIR / 'media'\n")
+    if root == "static":
+        build_static_urls(project_path, lazy=True, router=router)
+    else:
+        package_dir = os.path.join(project_path, settings_package)
+        shutil.copyfile(DYNAMIC_URLS_TEMPLATE, os.path.join(package_dir, "urls.py"))
+        shutil.copyfile(LAZY_URLS_TEMPLATE, os.path.join(package_dir, os.path.basename(LAZY_URLS_TEMPLATE)))
+    # after build_static_urls() so urls_app.py picks up the prefix router if there is one
+    for app_name in app_names:
+        generate_urls(os.path.join(project_path, app_name), "urls_app")
+    return project_path
+
+
+def bench_synthetic(sizes, iterations=20, root="static", router=False, python_exe=sys.executable, keep_dir=None):
+    """Build and benchmark one synthetic project per (apps, modules) size; returns a list of results."""
+    base_dir = keep_dir or tempfile.mkdtemp(prefix="bench-urls-")
+    try:
+        results = []
+        for apps, modules in sizes:
+            project_path = build_synthetic_project(base_dir, apps, modules, root, router)
+            settings_module = f"{find_settings_package(project_path)}.settings"
+            result = summarize_url_probe(run_url_probe(project_path, settings_module, iterations, python_exe))
+            result.update({"apps": apps, "modules": modules})
+            results.append(result)
+        return results
+    finally:
+        if keep_dir is None:
+            shutil.rmtree(base_dir, ignore_errors=True)
+
+
+def _parse_sizes(text):
+    sizes = []
+    for item in text.split(","):
+        apps, _, modules = item.strip().lower().partition("x")
+        if not (apps.isdigit() and modules.isdigit() and int(apps) > 0 and int(modules) > 0):
+            raise argparse.ArgumentTypeError(f"sizes look like 10x20,50x20 (apps x modules), not {item!r}")
+        sizes.append((int(apps), int(modules)))
+    return sizes
+
+
+def _us(stats, key):
+    return f"{stats[key] * 1e6:.1f}" if stats else "-"
+
+
+def _print_report(results):
+    print(f"URL benchmark for '{results['project']}': {results['routes']} routes, {results['names']} named, "
+          f"{results['missing_paths']} 404 paths, {results['iterations']} iterations "
+          f"(URLConf import {results['urlconf'] * 1000:.1f} ms)")
+    notes = [f"{results[key]} {label}" for key, label in (
+        ("skipped", "patterns without a sample path"), ("broken_includes", "includes without urlpatterns"),
+        ("resolve_failed", "sample paths that did not resolve"), ("reverse_failed", "names that did not reverse"))
+        if results[key]]
+    if notes:
+        print(f"  skipped: {', '.join(notes)}")
+    print(f"{'operation':<13}{'calls':>9}{'ops/s':>12}{'p50 us':>10}{'p95 us':>10}{'p99 us':>10}{'max us':>10}")
+    for operation in URL_OPERATIONS:
+        stats = results[operation]
+        calls, rate = (stats["calls"], f"{stats['ops_per_sec']:.0f}") if stats else (0, "-")
+        print(f"{operation:<13}{calls:>9}{rate:>12}{_us(stats, 'median'):>10}{_us(stats, 'p95'):>10}"
+              f"{_us(stats, 'p99'):>10}{_us(stats, 'max'):>10}")
+
+
+def _print_scaling(results, root, router):
+    print(f"Synthetic URL scaling ({root} root URLConf{', prefix router' if router else ''}), times in us")
+    print(f"{'apps x mods':<13}{'routes':>8}{'import ms':>11}{'resolve p50':>13}{'p99':>8}"
+          f"{'404 p50':>9}{'reverse p50':>13}{'resolve/s':>11}")
+    for result in results:
+        stats = result["resolve"]
+        rate = f"{stats['ops_per_sec']:.0f}" if stats else "-"
+        print(f"{result['apps']:>4} x {result['modules']:<6}{result['routes']:>8}{result['urlconf'] * 1000:>11.1f}"
+              f"{_us(stats, 'median'):>13}{_us(stats, 'p99'):>8}{_us(result['resolve_404'], 'median'):>9}"
+              f"{_us(result['reverse'], 'median'):>13}{rate:>11}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Time resolve() and reverse() on a generated URLConf.')
+    parser.add_argument('project_path', nargs='?', help='The directory of the Django project (omit with --synthetic)')
+    parser.add_argument('--iterations', type=int, default=20, help='Timed passes over every sample (default 20)')
+    parser.add_argument('--python', default=sys.executable, help='Interpreter to launch (default: this one)')
+    parser.add_argument('--synthetic', type=_parse_sizes, metavar='NxM[,NxM...]', help='Benchmark generated projects of N apps x M modules instead')
+    parser.add_argument('--root', choices=SYNTHETIC_ROOTS, default='static', help='Root URLConf of the synthetic projects (default static)')
+    parser.add_argument('--router', action='store_true', help='Synthetic projects use the prefix router')
+    parser.add_argument('--keep', metavar='DIR', help='Build the synthetic projects in DIR and keep them')
+    parser.add_argument('--output', help=f'JSON file for the results (default <project>/{BENCH_DIR_NAME}/urls-<time>.json)')
+
+    args = parser.parse_args()
+    if args.iterations < 1:
+        print("BENCH-URLS-Error: --iterations must be at least 1.")
+        sys.exit(1)
+    if args.synthetic is None and (args.project_path is None or not os.path.isfile(os.path.join(args.project_path, "manage.py"))):
+        print(f"BENCH-URLS-Error: Django project '{args.project_path}' does not exist.")
+        sys.exit(1)
+    if args.keep and os.path.exists(args.keep) and os.listdir(args.keep):
+        print(f"BENCH-URLS-Error: --keep directory '{args.keep}' is not empty.")
+        sys.exit(1)
+
+    try:
+        if args.synthetic:
+            if args.keep:
+                os.makedirs(args.keep, exist_ok=True)
+            results = bench_synthetic(args.synthetic, args.iterations, args.root, args.router, args.python, args.keep)
+            _print_scaling(results, args.root, args.router)
+        else:
+            results = bench_urls(args.project_path, args.iterations, args.python)
+            _print_report(results)
+    except (OSError, RuntimeError) as e:
+        print(f"BENCH-URLS-Error: {e}")
+        sys.exit(1)
+
+    if args.output or not args.synthetic:
+        output = args.output or os.path.join(args.project_path, BENCH_DIR_NAME, f"urls-{time.strftime('%Y%m%d-%H%M%S')}.json")
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {output}")
@@ -0,0 +1,185 @@
+import os
+import sys
+import json
+import shlex
+import hashlib
+import argparse
+
+from discovery import find_settings_package
+
+# Single-boot management runner: Django is set up once and several
+# management commands run in that one process, instead of one `manage.py`
+# interpreter (and one full Django boot) per command.
+#
+#   ./django up <project>                 makemigrations + migrate + runserver
+#   ./django mgmt <project> "a; b --x; c" any commands, in order, one boot
+#
+# `up` skips makemigrations/migrate when nothing they depend on changed since
+# the last successful run: the models*.py and migrations/*.py files, the
+# settings package and the identity of sqlite database files. The hash is
+# kept in <project>/.model_state.json.
+#
+# Functions in this boot.py file:
+# split_commands(command_string)
+# model_state_hash(project_path, databases=None)
+# boot_django(project_path)
+# run_commands(project_path, commands)
+# up(project_path, runserver_args=(), force=False)
+
+MODEL_STATE_FILE = ".model_state.json"
+UP_MIGRATION_COMMANDS = (["makemigrations"], ["migrate"])
+SKIPPED_SCAN_DIRS = ("__pycache__", "node_modules", "static", "staticfiles", "media", "templates")
+BIN_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def split_commands(command_string):
+    """'makemigrations; migrate --plan' -> [['makemigrations'], ['migrate', '--plan']]"""
+    return [shlex.split(part) for part in command_string.split(";") if part.strip()]
+
+
+def _model_state_files(project_path, settings_package):
+    """Project-relative paths of every file whose change can require makemigrations/migrate."""
+    found = []
+    for root, dirs, files in os.walk(project_path):
+        dirs[:] = sorted(d for d in dirs if not d.startswith(".") and d not in SKIPPED_SCAN_DIRS)
+        in_migrations = os.path.basename(root) == "migrations"
+        in_settings = os.path.basename(root) == settings_package
+        for filename in sorted(files):
+            if not filename.endswith(".py"):
+                continue
+            if in_migrations or in_settings or filename == "models.py" or filename.startswith("models_"):
+                found.append(os.path.relpath(os.path.join(root, filename), project_path))
+    return found
+
+
+def model_state_hash(project_path, databases=None):
+    """
+    Hash of everything that decides whether makemigrations/migrate have work to do.
+
+    databases is settings.DATABASES; sqlite files contribute their inode so a
+    deleted or replaced database is noticed.
+    """
+    project_path = os.path.abspath(project_path)
+    digest = hashlib.sha256()
+    for relative_path in _model_state_files(project_path, find_settings_package(project_path)):
+        digest.update(relative_path.encode("utf-8"))
+        with open(os.path.join(project_path, relative_path), "rb") as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    for alias, database in sorted((databases or {}).items()):
+        if "sqlite3" in database.get("ENGINE", ""):
+            name = str(database.get("NAME", ""))
+            try:
+                identity = os.stat(name).st_ino
+            except (FileNotFoundError, ValueError):  # not created yet, or ':memory:'
+                identity = None
+            digest.update(f"{alias}={name}@{identity}".encode("utf-8"))
+        else:
+            digest.update(f"{alias}={database.get('ENGINE')}:{database.get('NAME')}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _read_model_state(project_path):
+    try:
+        with open(os.path.join(project_path, MODEL_STATE_FILE), "r", encoding="utf-8") as f:
+            return json.load(f).get("hash")
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _write_model_state(project_path, state_hash):
+    state_path = os.path.join(project_path, MODEL_STATE_FILE)
+    tmp_path = f"{state_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"hash": state_hash}, f)
+    os.replace(tmp_path, state_path)
+
+
+def boot_django(project_path):
+    """Make project_path importable the way manage.py does and run django.setup() once."""
+    project_path = os.path.abspath(project_path)
+    settings_package = find_settings_package(project_path)
+    if settings_package is None:
+        raise RuntimeError(f"no settings package found in {project_path}")
+    os.chdir(project_path)
+    # manage.py would not see automate/bin on sys.path
+    sys.path[:] = [project_path] + [p for p in sys.path if os.path.abspath(p or ".") != BIN_DIR]
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", f"{settings_package}.settings")
+    import django
+    django.setup()
+    return project_path
+
+
+def _is_reloader_child():
+    # runserver's autoreloader re-executes this script with RUN_MAIN=true
+    return os.environ.get("RUN_MAIN") == "true"
+
+
+def run_commands(project_path, commands):
+    """
+    Run management commands (lists of argv words) in order in this process.
+
+    Stops at the first command that fails and returns its exit code.
+    """
+    from django.core.management import execute_from_command_line
+
+    manage_py = os.path.join(project_path, "manage.py")
+    for argv in commands:
+        if not _is_reloader_child():
+            print(f">>> manage.py {shlex.join(argv)}", flush=True)
+        try:
+            execute_from_command_line([manage_py] + argv)
+        except SystemExit as e:
+            if e.code not in (None, 0):
+                print(f"BOOT-Error: 'manage.py {shlex.join(argv)}' exited with {e.code}; stopping.", file=sys.stderr)
+                return e.code if isinstance(e.code, int) else 1
+    return 0
+
+
+def up(project_path, runserver_args=(), force=False):
+    """makemigrations + migrate (skipped when the model state is unchanged) + runserver, one boot."""
+    from django.conf import settings
+
+    previous_hash = _read_model_state(project_path)
+    current_hash = model_state_hash(project_path, settings.DATABASES)
+    if force or current_hash != previous_hash:
+        exit_code = run_commands(project_path, [list(c) for c in UP_MIGRATION_COMMANDS])
+        if exit_code:
+            return exit_code
+        # makemigrations may have just written files; record the state after it
+        _write_model_state(project_path, model_state_hash(project_path, settings.DATABASES))
+    elif not _is_reloader_child():
+        print("Models and migrations unchanged, skipping makemigrations/migrate.", flush=True)
+    # in the reloader's child this re-checks models on every restart, then serves
+    return run_commands(project_path, [["runserver", *runserver_args]])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Run several manage.py commands in one Django boot.')
+    parser.add_argument('project_path', help='The directory of the Django project (the one holding manage.py)')
+    parser.add_argument('commands', nargs='?', help='Semicolon-separated management commands, e.g. "makemigrations; migrate"')
+    parser.add_argument('--up', action='store_true', help='makemigrations + migrate (when models changed) + runserver')
+    parser.add_argument('--force', action='store_true', help='With --up: run makemigrations/migrate even if nothing changed')
+
+    args, runserver_args = parser.parse_known_args()
+    if not os.path.isfile(os.path.join(args.project_path, "manage.py")):
+        print(f"BOOT-Error: Django project '{args.project_path}' does not exist.")
+        sys.exit(1)
+    if not args.up and not args.commands:
+        parser.error("give a command list or --up")
+    # boot_django() changes directory and runserver's reloader re-runs sys.argv; keep it valid
+    sys.argv[0] = os.path.abspath(sys.argv[0])
+    sys.argv[sys.argv.index(args.project_path)] = os.path.abspath(args.project_path)
+    try:
+        project_path = boot_django(args.project_path)
+    except (RuntimeError, ImportError) as e:
+        print(f"BOOT-Error: {e}")
+        sys.exit(1)
+
+    if args.up:
+        if args.commands:
+            runserver_args = [args.commands, *runserver_args]  # e.g. `up demo 8001`
+        sys.exit(up(project_path, runserver_args, force=args.force))
+    commands = split_commands(args.commands)
+    if _is_reloader_child():
+        commands = commands[-1:]  # the earlier commands already ran in the reloader's parent
+    sys.exit(run_commands(project_path, commands))
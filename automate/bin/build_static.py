@@ -0,0 +1,274 @@
+import os
+import re
+import sys
+import gzip
+import json
+import time
+import hashlib
+import argparse
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+
+from discovery import find_settings_package
+from generate_urls import write_file_if_changed
+from utils import compile_placeholders, substitute_placeholders, fast_copy_file
+from boot import boot_django
+
+try:
+    import brotli
+except ImportError:  # optional; only the .br variants are skipped without it
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+# Incremental production build of a project's static files. Sources come from
+# Django's staticfiles finders (what collectstatic would copy). For every file
+# STATIC_ROOT gets the original name, a fingerprinted `name.<hash>.ext` copy
+# and, for compressible types, .gz and .br variants of both. CSS url()
+# references are rewritten to fingerprinted names before the CSS itself is
+# hashed.
+#
+# STATIC_ROOT/staticfiles.json uses ManifestStaticFilesStorage's format (so
+# {% static %} resolves fingerprinted names) with an extra "build" section
+# recording each source's size, mtime and hash. A rebuild skips sources whose
+# size and mtime are unchanged, and skips writing files whose content hash is
+# unchanged.
+#
+# Functions in this build_static.py file:
+# fingerprint_name(name, digest)
+# rewrite_css_urls(name, content, paths)
+# compressed_variants(content)
+# install_static_build(project_path)
+# collect_static_sources()
+# build_static(project_path, max_workers=None, force=False, verbose=True)
+
+PROJECT_TEMPLATE_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "template", "project"))
+STATIC_BUILD_TEMPLATE = os.path.join(PROJECT_TEMPLATE_DIR, "static_build.py")
+STATIC_MANIFEST_NAME = "staticfiles.json"
+DEFAULT_STATIC_ROOT = "staticfiles"
+SETTINGS_HOOK = ("\n\n# Added by `./django build-static`: fingerprinted, precompressed static files\n"
+                 "from .static_build import apply_static_build\n"
+                 "apply_static_build(globals())\n")
+IGNORE_PATTERNS = ["CVS", ".*", "*~"]
+COMPRESSIBLE_EXTENSIONS = {".css", ".js", ".mjs", ".json", ".map", ".svg", ".xml", ".txt", ".html", ".htm",
+                           ".ico", ".webmanifest", ".wasm", ".ttf", ".otf", ".eot"}
+COMPRESS_MIN_SIZE = 256
+COMPRESS_MIN_SAVING = 0.05  # keep a variant only if it is at least 5% smaller
+CSS_URL_RE = re.compile(r"""url\(\s*(["']?)([^"')\s]+)\1\s*\)""")
+
+
+def fingerprint_name(name, digest):
+    """'css/site.css' + digest -> 'css/site.<12 hex>.css' (the shape Django's hashed names have)."""
+    root, ext = posixpath.splitext(name)
+    return f"{root}.{digest[:12]}{ext}"
+
+
+def rewrite_css_urls(name, content, paths):
+    """Point relative url() references in a CSS file at their fingerprinted names."""
+    def replace(match):
+        quote, url = match.groups()
+        if url.startswith(("data:", "http:", "https:", "//", "#", "/")):
+            return match.group(0)
+        path, sep, suffix = url, "", ""
+        split = re.search(r"[?#]", url)
+        if split:  # keep ?v=1 / #iefix style suffixes
+            path, sep, suffix = url[:split.start()], url[split.start()], url[split.start() + 1:]
+        target = posixpath.normpath(posixpath.join(posixpath.dirname(name), path))
+        if target not in paths:
+            return match.group(0)
+        hashed = posixpath.join(posixpath.dirname(path), posixpath.basename(paths[target]))
+        return f"url({quote}{hashed}{sep}{suffix}{quote})"
+    return CSS_URL_RE.sub(replace, content)
+
+
+def compressed_variants(content):
+    """{'.gz': bytes, '.br': bytes} for variants worth keeping (brotli only if installed)."""
+    variants = {}
+    if len(content) < COMPRESS_MIN_SIZE:
+        return variants
+    limit = len(content) * (1 - COMPRESS_MIN_SAVING)
+    gz = gzip.compress(content, compresslevel=9, mtime=0)  # mtime=0: identical input, identical bytes
+    if len(gz) < limit:
+        variants[".gz"] = gz
+    if brotli is not None:
+        br = brotli.compress(content, quality=11)
+        if len(br) < limit:
+            variants[".br"] = br
+    return variants
+
+
+def install_static_build(project_path):
+    """Put static_build.py in the settings package and hook it into settings.py (once)."""
+    settings_package = find_settings_package(project_path)
+    if settings_package is None:
+        raise FileNotFoundError(f"No settings package found in '{project_path}'.")
+    with open(STATIC_BUILD_TEMPLATE, "r", encoding="utf-8") as f:
+        template = f.read()
+    content, _ = substitute_placeholders(template, compile_placeholders({
+        "__PROJECT_NAME__": os.path.basename(os.path.abspath(project_path)),
+        "__DEFAULT_STATIC_ROOT__": DEFAULT_STATIC_ROOT,
+    }))
+    write_file_if_changed(os.path.join(project_path, settings_package, "static_build.py"), content)
+
+    settings_file = os.path.join(project_path, settings_package, "settings.py")
+    with open(settings_file, "r", encoding="utf-8") as f:
+        settings_source = f.read()
+    if "apply_static_build(globals())" not in settings_source:
+        with open(settings_file, "a", encoding="utf-8") as f:
+            f.write(SETTINGS_HOOK)
+
+
+def collect_static_sources():
+    """{static name: source file} from the staticfiles finders; the first finder to list a name wins."""
+    from django.contrib.staticfiles.finders import get_finders
+
+    sources = {}
+    for finder in get_finders():
+        for path, storage in finder.list(IGNORE_PATTERNS):
+            prefix = getattr(storage, "prefix", None)
+            name = (posixpath.join(prefix, path) if prefix else path).replace(os.sep, "/")
+            sources.setdefault(name, storage.path(path))
+    return sources
+
+
+def _load_manifest(static_root):
+    try:
+        with open(os.path.join(static_root, STATIC_MANIFEST_NAME), "r", encoding="utf-8") as f:
+            return json.load(f).get("build", {}).get("files", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def _outputs(name, entry):
+    names = [name, entry["hashed"]]
+    return names + [n + ext for n in names for ext in entry.get("variants", [])]
+
+
+def _write_bytes(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def _remove_outputs(static_root, names):
+    for output in names:
+        try:
+            os.remove(os.path.join(static_root, output))
+        except FileNotFoundError:
+            pass
+
+
+def build_static(project_path, max_workers=None, force=False, verbose=True):
+    """
+    Build STATIC_ROOT for the project and return a summary dict.
+
+    Boots Django in this process (the finders and STATIC_ROOT come from the
+    project's settings).
+    """
+    project_path = os.path.abspath(project_path)
+    install_static_build(project_path)
+    boot_django(project_path)
+    from django.conf import settings
+
+    static_root = str(settings.STATIC_ROOT)
+    start = time.perf_counter()
+    sources = collect_static_sources()
+    previous = {} if force else _load_manifest(static_root)
+    files = {}
+    stats = {"files": len(sources), "written": 0, "unchanged": 0, "raw_bytes": 0, ".gz": 0, ".br": 0}
+
+    def outputs_exist(name, entry):
+        return all(os.path.exists(os.path.join(static_root, n)) for n in _outputs(name, entry))
+
+    def process(name, paths=None):
+        source = sources[name]
+        stat = os.stat(source)
+        old = previous.get(name)
+        if (paths is None and old and old["size"] == stat.st_size and old["mtime_ns"] == stat.st_mtime_ns
+                and outputs_exist(name, old)):
+            return name, old, False  # unchanged source, nothing read
+        with open(source, "rb") as f:
+            content = f.read()
+        source_digest = hashlib.sha256(content).hexdigest()
+        if paths is not None:  # CSS: hash what is served, i.e. after the url() rewrite
+            content = rewrite_css_urls(name, content.decode("utf-8", errors="surrogateescape"), paths).encode("utf-8", errors="surrogateescape")
+        digest = hashlib.sha256(content).hexdigest()
+        entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": source_digest,
+                 "hashed": fingerprint_name(name, digest)}
+        if old and old.get("hashed") == entry["hashed"] and outputs_exist(name, old):
+            entry["variants"] = old.get("variants", [])
+            return name, entry, False  # touched but identical
+        variants = compressed_variants(content) if posixpath.splitext(name)[1].lower() in COMPRESSIBLE_EXTENSIONS else {}
+        entry["variants"] = sorted(variants)
+        if paths is None:
+            os.makedirs(os.path.dirname(os.path.join(static_root, name)), exist_ok=True)
+            fast_copy_file(source, os.path.join(static_root, name))
+        else:
+            _write_bytes(os.path.join(static_root, name), content)
+        _write_bytes(os.path.join(static_root, entry["hashed"]), content)
+        for ext, data in variants.items():
+            _write_bytes(os.path.join(static_root, name + ext), data)
+            _write_bytes(os.path.join(static_root, entry["hashed"] + ext), data)
+        if old and old.get("hashed") != entry["hashed"]:
+            _remove_outputs(static_root, [n for n in _outputs(name, old) if n not in _outputs(name, entry)])
+        return name, entry, True
+
+    css_names = sorted(n for n in sources if n.lower().endswith(".css"))
+    other_names = sorted(n for n in sources if not n.lower().endswith(".css"))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(process, other_names))
+        paths = {name: entry["hashed"] for name, entry, _ in results}
+        results += list(executor.map(lambda n: process(n, paths), css_names))
+
+    for name, entry, written in results:
+        files[name] = entry
+        stats["written" if written else "unchanged"] += 1
+        stats["raw_bytes"] += entry["size"]
+        for ext in entry.get("variants", []):
+            try:
+                stats[ext] += os.path.getsize(os.path.join(static_root, name + ext))
+            except FileNotFoundError:
+                pass
+
+    removed = [name for name in previous if name not in files]
+    for name in removed:
+        _remove_outputs(static_root, _outputs(name, previous[name]))
+    stats["removed"] = len(removed)
+
+    paths = {name: entry["hashed"] for name, entry in sorted(files.items())}
+    manifest = {
+        "version": "1.1",  # read by ManifestStaticFilesStorage
+        "paths": paths,
+        "hash": hashlib.sha256(json.dumps(paths, sort_keys=True).encode("utf-8")).hexdigest()[:12],
+        "build": {"brotli": brotli is not None, "files": files},
+    }
+    _write_bytes(os.path.join(static_root, STATIC_MANIFEST_NAME), json.dumps(manifest, indent=1, sort_keys=True).encode("utf-8"))
+    stats["static_root"] = static_root
+    stats["seconds"] = time.perf_counter() - start
+    if verbose:
+        print(f"{stats['files']} static file(s) in {static_root}: {stats['written']} built, "
+              f"{stats['unchanged']} unchanged, {stats['removed']} removed in {stats['seconds']:.2f}s")
+        print(f"  {stats['raw_bytes']} bytes raw, {stats['.gz']} gzip"
+              + (f", {stats['.br']} brotli" if brotli is not None else " (brotli not installed, no .br variants)"))
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Collect static files with fingerprinted names and precompressed variants.')
+    parser.add_argument('project_path', help='The directory of the Django project (the one holding manage.py)')
+    parser.add_argument('--workers', type=int, default=None, help='Parallel hashing/compression threads')
+    parser.add_argument('--force', action='store_true', help='Ignore the previous manifest and rebuild everything')
+    parser.add_argument('--quiet', action='store_true', help='No summary output')
+
+    args = parser.parse_args()
+    if not os.path.isfile(os.path.join(args.project_path, "manage.py")):
+        print(f"BUILD-STATIC-Error: Django project '{args.project_path}' does not exist.")
+        sys.exit(1)
+    try:
+        build_static(args.project_path, max_workers=args.workers, force=args.force, verbose=not args.quiet)
+    except (OSError, RuntimeError) as e:
+        print(f"BUILD-STATIC-Error: {e}")
+        sys.exit(1)
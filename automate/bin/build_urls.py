@@ -0,0 +1,170 @@
+import os
+import re
+import sys
+import hashlib
+import argparse
+
+from discovery import *
+from generate_urls import write_file_if_changed, generate_urls, generate_aggregators, PREFIX_ROUTER_MODULE
+from utils import compile_placeholders, substitute_placeholders
+
+# Build step that replaces the import-time INSTALLED_APPS probing of
+# dynamic_project_urls.py with a plain, static root urls.py.
+#
+# Functions in this build_urls.py file:
+# render_static_urls(project_path, lazy=True, router=False)
+# build_static_urls(project_path, lazy=True, router=None)
+# check_static_urls(project_path)
+
+PROJECT_TEMPLATE_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "template", "project"))
+STATIC_URLS_TEMPLATE = os.path.join(PROJECT_TEMPLATE_DIR, "static_project_urls.py")
+LAZY_URLS_TEMPLATE = os.path.join(PROJECT_TEMPLATE_DIR, "lazy_urls.py")
+PREFIX_ROUTER_TEMPLATE = os.path.join(PROJECT_TEMPLATE_DIR, f"{PREFIX_ROUTER_MODULE}.py")
+CHECKSUM_RE = re.compile(r"^# checksum: (\S+)$", re.MULTILINE)
+CHECKSUM_PLACEHOLDER = "__CHECKSUM__"
+
+
+def _checksum(content):
+    """sha256 of the file with the checksum value blanked out."""
+    blanked = CHECKSUM_RE.sub(f"# checksum: {CHECKSUM_PLACEHOLDER}", content, count=1)
+    return "sha256:" + hashlib.sha256(blanked.encode("utf-8")).hexdigest()
+
+
+def _urls_file_path(project_path):
+    settings_package = find_settings_package(project_path)
+    if settings_package is None:
+        raise FileNotFoundError(f"No settings package found in '{project_path}'.")
+    return os.path.join(project_path, settings_package, "urls.py"), settings_package
+
+
+def _include_expression(project_path, app, urls_module, lazy):
+    """include()/lazy_include() call for an app's URL module, keeping its app_name namespace."""
+    dotted = f"{app}.{urls_module}"
+    if not lazy:
+        return f"include('{dotted}')"
+    app_name = read_module_constant(os.path.join(project_path, app, f"{urls_module}.py"), "app_name")
+    if isinstance(app_name, str):
+        return f"lazy_include('{dotted}', app_name='{app_name}')"
+    return f"lazy_include('{dotted}')"
+
+
+def render_static_urls(project_path, lazy=True, router=False):
+    """
+    Return the static root urls.py content for the project's current apps.
+
+    With lazy=True the app URL modules are registered through lazy_include()
+    and only imported when a request first reaches their prefix. With
+    router=True the patterns are wrapped in dispatch_patterns().
+    """
+    project_path = os.path.abspath(project_path)
+    urls_file, settings_package = _urls_file_path(project_path)
+    installed_apps = read_installed_apps(os.path.join(project_path, settings_package, "settings.py"))
+    app_modules, rest_modules = find_url_apps(project_path, installed_apps)
+
+    lines = []
+    for app in app_modules:
+        lines.append(f"    path('{app.replace('app_', '')}/', {_include_expression(project_path, app, 'app_urls', lazy)}),\n")
+    for app in rest_modules:
+        lines.append(f"    path('api/{app.replace('rest_', '')}/', {_include_expression(project_path, app, 'rest_urls', lazy)}),\n")
+
+    with open(STATIC_URLS_TEMPLATE, "r", encoding="utf-8") as f:
+        template = f.read()
+    built_apps = app_modules + rest_modules
+    content, _ = substitute_placeholders(template, compile_placeholders({
+        "__PROJECT_NAME__": os.path.basename(project_path),
+        "__URL_IMPORTS__": ("from .lazy_urls import lazy_include\n" if lazy else "")
+                           + (f"from .{PREFIX_ROUTER_MODULE} import dispatch_patterns\n" if router else ""),
+        "__URL_DISPATCH__": "urlpatterns = dispatch_patterns(urlpatterns)\n" if router else "",
+        "__URL_PATTERNS__": "".join(lines),
+        "__BUILT_APPS__": "{" + ", ".join(repr(app) for app in built_apps) + "}" if built_apps else "set()",
+    }))
+    content = content.replace(CHECKSUM_PLACEHOLDER, _checksum(content), 1)
+    return content
+
+
+def _copy_runtime_module(template_file, package_dir):
+    with open(template_file, "r", encoding="utf-8") as f:
+        write_file_if_changed(os.path.join(package_dir, os.path.basename(template_file)), f.read())
+
+
+def build_static_urls(project_path, lazy=True, router=None):
+    """
+    Write the static root urls.py plus the runtime modules it needs. Returns (urls_file, written).
+
+    router=True installs prefix_router.py and regenerates every app's
+    urls_app.py with it, router=False removes it again, None keeps the
+    project's current choice. The mod_app/all_*_imports.py aggregators of every
+    app are refreshed as well.
+    """
+    project_path = os.path.abspath(project_path)
+    urls_file, _ = _urls_file_path(project_path)
+    package_dir = os.path.dirname(urls_file)
+    router_file = os.path.join(package_dir, f"{PREFIX_ROUTER_MODULE}.py")
+    if router is None:
+        router = os.path.isfile(router_file)
+
+    if lazy:
+        _copy_runtime_module(LAZY_URLS_TEMPLATE, package_dir)
+    router_changed = router != os.path.isfile(router_file)
+    if router:
+        _copy_runtime_module(PREFIX_ROUTER_TEMPLATE, package_dir)
+    elif os.path.isfile(router_file):
+        os.remove(router_file)
+    for entry in sorted(os.listdir(project_path)):
+        app_directory = os.path.join(project_path, entry)
+        if not os.path.isdir(os.path.join(app_directory, "mod_app")):
+            continue
+        if router_changed:  # urls_app.py picks the router up from the settings package
+            generate_urls(app_directory, "urls_app")
+        # mod_app/all_*_imports.py also go stale when module files are edited by hand
+        generate_aggregators(app_directory)
+
+    return urls_file, write_file_if_changed(urls_file, render_static_urls(project_path, lazy, router))
+
+
+def check_static_urls(project_path):
+    """
+    Return (ok, message) describing whether the built urls.py is intact and current.
+
+    The embedded checksum detects hand edits; comparing with a fresh render
+    detects apps added or removed since the last build.
+    """
+    urls_file, _ = _urls_file_path(os.path.abspath(project_path))
+    if not os.path.isfile(urls_file):
+        return False, f"{urls_file} does not exist."
+    with open(urls_file, "r", encoding="utf-8") as f:
+        content = f.read()
+    match = CHECKSUM_RE.search(content)
+    if match is None:
+        return False, f"{urls_file} was not generated by build-urls."
+    if match.group(1) != _checksum(content):
+        return False, f"{urls_file} was edited by hand (checksum mismatch)."
+    if content != render_static_urls(project_path, lazy="import lazy_include" in content,
+                                         router="import dispatch_patterns" in content):
+        return False, f"{urls_file} is out of date with the project's apps."
+    return True, f"{urls_file} is up to date."
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Write a static root urls.py for a generated Django project.')
+    parser.add_argument('project_path', help='The directory of the Django project (the one holding manage.py)')
+    parser.add_argument('--check', action='store_true', help='Only verify the checksum and that the file is current')
+    parser.add_argument('--eager', action='store_true', help='Import every app URL module at boot (plain include())')
+    parser.add_argument('--router', action=argparse.BooleanOptionalAction, default=None,
+                        help='Dispatch on the first/second path segment with a dict lookup (prefix_router.py)')
+
+    args = parser.parse_args()
+    if not os.path.isdir(args.project_path):
+        print(f"BUILD-URLS-Error: Django project '{args.project_path}' does not exist.")
+        sys.exit(1)
+
+    try:
+        if args.check:
+            ok, message = check_static_urls(args.project_path)
+            print(message)
+            sys.exit(0 if ok else 1)
+        urls_file, written = build_static_urls(args.project_path, lazy=not args.eager, router=args.router)
+    except (OSError, SyntaxError) as e:
+        print(f"BUILD-URLS-Error: {e}")
+        sys.exit(1)
+    print(f"Static URLs written to {urls_file}." if written else f"{urls_file} is already up to date.")
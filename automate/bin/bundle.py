@@ -0,0 +1,269 @@
+import os
+import re
+import ast
+import sys
+import json
+import shutil
+import fnmatch
+import argparse
+import compileall
+import py_compile
+
+from discovery import *
+from utils import copy_many
+from scaffold import get_django_version
+from build_urls import render_static_urls, LAZY_URLS_TEMPLATE, PREFIX_ROUTER_TEMPLATE
+from generate_urls import PREFIX_ROUTER_MODULE
+from bench_startup import run_startup_probe
+
+# Deployable bundle of a generated project (Vercel's Python runtime, or any
+# WSGI host): a pruned copy of the project with a static root urls.py,
+# precompiled bytecode and a vercel.json, plus a report of its size and
+# import footprint. The source project is never modified.
+#
+# Left out of the bundle:
+#   - apps in the project directory that INSTALLED_APPS doesn't list
+#   - all_*_imports.py stubs with no code that nothing imports
+#   - tests, dev shortcuts (m1/m2/m3/m123), the sqlite database, hidden files
+#
+# Functions in this bundle.py file:
+# plan_bundle(project_path)
+# write_bundle(project_path, output_dir, optimize=-1)
+# bundle_report(output_dir, plan)
+
+DEFAULT_BUNDLE_DIR = ".bundle"  # <PROJECT_BASE_DIR>/.bundle/<project>
+DEV_ONLY_FILES = {"m1", "m2", "m3", "m123", "db.sqlite3", "gunicorn.conf.py", "tests.py", "conftest.py",
+                  "pytest.ini", "tox.ini"}
+DEV_ONLY_FILE_PATTERNS = ("test_*.py", "*_test.py", "*_tests.py", "*.pyc", "*.sqlite3-journal")
+DEV_ONLY_DIRS = {"__pycache__", "tests", "node_modules"}
+STUB_RE = re.compile(r"^all_\w+_imports\.py$")
+# fingerprinted static names from `./django build-static` never change content
+VERCEL_IMMUTABLE_ROUTE = r"/static/(.*\.[0-9a-f]{12}\..*)"
+
+
+def _installed_app_labels(project_path, settings_package):
+    """Top-level packages of INSTALLED_APPS, or None when settings.py doesn't spell it out as literals."""
+    installed = read_installed_apps(os.path.join(project_path, settings_package, "settings.py"))
+    if installed is None:
+        return None
+    # 'app_blog' and 'app_blog.apps.AppBlogConfig' both install the app_blog package
+    return {entry.split(".")[0] for entry in installed}
+
+
+def _is_empty_stub(file_path):
+    """A blank/comment-only file, or a generated lazy aggregator whose name map is empty."""
+    with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+        text = f.read()
+    if all(not line.strip() or line.lstrip().startswith("#") for line in text.splitlines()):
+        return True
+    if "_NAME_TO_MODULE" not in text:
+        return False
+    try:
+        tree = ast.parse(text, filename=file_path)
+    except SyntaxError:
+        return False
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(isinstance(t, ast.Name) and t.id == "_NAME_TO_MODULE" for t in node.targets):
+            return isinstance(node.value, ast.Dict) and not node.value.keys
+    return False
+
+
+def plan_bundle(project_path):
+    """
+    Decide what goes into the bundle without copying anything.
+
+    Returns a dict with the (source, relative path) files to copy and what was
+    left out, by reason.
+    """
+    project_path = os.path.abspath(project_path)
+    settings_package = find_settings_package(project_path)
+    if settings_package is None:
+        raise FileNotFoundError(f"No settings package found in '{project_path}'.")
+    installed = _installed_app_labels(project_path, settings_package)
+    if installed is None:
+        # pruning an app that is installed after all breaks django.setup() in the bundle
+        print(f"Warning: INSTALLED_APPS in {settings_package}/settings.py can't be read statically; app pruning skipped.",
+              file=sys.stderr)
+        unused_apps = []
+    else:
+        unused_apps = [app for app in scan_project_apps(project_path) if app not in installed]
+
+    files, skipped_dev, stubs = [], [], []
+    for root, dirs, filenames in os.walk(project_path):
+        relative_root = os.path.relpath(root, project_path)
+        if relative_root == ".":
+            relative_root = ""
+            dirs[:] = [d for d in dirs if d not in unused_apps]
+        kept_dirs = []
+        for d in dirs:
+            if d.startswith(".") or d in DEV_ONLY_DIRS:
+                skipped_dev.append(os.path.join(relative_root, d) + os.sep)
+            else:
+                kept_dirs.append(d)
+        dirs[:] = sorted(kept_dirs)
+        for filename in sorted(filenames):
+            relative_path = os.path.join(relative_root, filename)
+            if (filename.startswith(".") or filename in DEV_ONLY_FILES
+                    or any(fnmatch.fnmatch(filename, pattern) for pattern in DEV_ONLY_FILE_PATTERNS)):
+                skipped_dev.append(relative_path)
+            elif STUB_RE.match(filename) and _is_empty_stub(os.path.join(root, filename)):
+                stubs.append(relative_path)
+            else:
+                files.append((os.path.join(root, filename), relative_path))
+
+    # an empty stub still has to ship if some bundled module imports it by name
+    bundled_sources = [source for source, relative_path in files if relative_path.endswith(".py")]
+    referenced = set()
+    for source in bundled_sources:
+        with open(source, "r", encoding="utf-8", errors="replace") as f:
+            text = f.read()
+        referenced.update(stub for stub in stubs if os.path.splitext(os.path.basename(stub))[0] in text)
+    files += [(os.path.join(project_path, stub), stub) for stub in sorted(referenced)]
+    stubs = [stub for stub in stubs if stub not in referenced]
+
+    return {
+        "project_path": project_path,
+        "settings_package": settings_package,
+        "files": files,
+        "unused_apps": unused_apps,
+        "pruned_stubs": stubs,
+        "skipped_dev": skipped_dev,
+    }
+
+
+def _write_text(file_path, content):
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def _vercel_config(settings_package, has_static):
+    routes = []
+    builds = [{"src": f"{settings_package}/wsgi.py", "use": "@vercel/python"}]
+    if has_static:
+        builds.append({"src": "staticfiles/**", "use": "@vercel/static"})
+        routes.append({"src": VERCEL_IMMUTABLE_ROUTE, "dest": "/staticfiles/$1",
+                       "headers": {"cache-control": "public, max-age=31536000, immutable"}})
+        routes.append({"src": "/static/(.*)", "dest": "/staticfiles/$1"})
+    routes.append({"src": "/(.*)", "dest": f"{settings_package}/wsgi.py"})
+    return {"builds": builds, "routes": routes}
+
+
+def write_bundle(project_path, output_dir, optimize=-1):
+    """
+    Build the bundle for project_path in output_dir (replaced if it exists). Returns the plan.
+
+    The bundle gets a static root urls.py (apps resolved now, not at import
+    time) and .pyc files compiled with unchecked-hash invalidation, so they
+    stay valid when the deploy step rewrites file mtimes.
+    """
+    plan = plan_bundle(project_path)
+    project_path, settings_package = plan["project_path"], plan["settings_package"]
+    output_dir = os.path.abspath(output_dir)
+    if output_dir == project_path or output_dir.startswith(project_path + os.sep):
+        raise ValueError("the bundle directory must not be inside the bundled project tree")
+    shutil.rmtree(output_dir, ignore_errors=True)
+
+    pairs = [(source, os.path.join(output_dir, relative_path)) for source, relative_path in plan["files"]]
+    for directory in sorted({os.path.dirname(target) for _, target in pairs}):
+        os.makedirs(directory, exist_ok=True)
+    copied, failed = copy_many(pairs, preserve_metadata=False)
+    if failed:
+        raise OSError(f"{failed} file(s) could not be copied into the bundle")
+
+    # static URLConf: no INSTALLED_APPS probing in every cold start
+    package_dir = os.path.join(output_dir, settings_package)
+    router = os.path.isfile(os.path.join(project_path, settings_package, f"{PREFIX_ROUTER_MODULE}.py"))
+    _write_text(os.path.join(package_dir, "urls.py"), render_static_urls(project_path, lazy=True, router=router))
+    shutil.copyfile(LAZY_URLS_TEMPLATE, os.path.join(package_dir, os.path.basename(LAZY_URLS_TEMPLATE)))
+    if router:
+        shutil.copyfile(PREFIX_ROUTER_TEMPLATE, os.path.join(package_dir, os.path.basename(PREFIX_ROUTER_TEMPLATE)))
+
+    # Vercel's Python runtime looks for `app` in the entry module
+    wsgi_file = os.path.join(package_dir, "wsgi.py")
+    if os.path.isfile(wsgi_file):
+        with open(wsgi_file, "r", encoding="utf-8") as f:
+            wsgi_source = f.read()
+        if re.search(r"^app\s*=", wsgi_source, re.MULTILINE) is None:
+            _write_text(wsgi_file, wsgi_source.rstrip("\n") + "\n\napp = application\n")
+    if not os.path.isfile(os.path.join(output_dir, "vercel.json")):
+        has_static = os.path.isfile(os.path.join(output_dir, "staticfiles", "staticfiles.json"))
+        _write_text(os.path.join(output_dir, "vercel.json"), json.dumps(_vercel_config(settings_package, has_static), indent=2) + "\n")
+    if not os.path.isfile(os.path.join(output_dir, "requirements.txt")):
+        _write_text(os.path.join(output_dir, "requirements.txt"), f"Django=={get_django_version() or '5.1.4'}\n")
+
+    compiled = compileall.compile_dir(output_dir, quiet=1, workers=0, optimize=optimize,
+                                      invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH)
+    if not compiled:
+        raise RuntimeError("some modules failed to compile, see the output above")
+    return plan
+
+
+def _tree_size(path):
+    total, count = 0, 0
+    for root, dirs, files in os.walk(path):
+        for filename in files:
+            total += os.path.getsize(os.path.join(root, filename))
+            count += 1
+    return total, count
+
+
+def bundle_report(output_dir, plan):
+    """Size of the bundle vs the source tree, and the import footprint of both."""
+    report = {"bundle_dir": output_dir}
+    report["bundle_bytes"], report["bundle_files"] = _tree_size(output_dir)
+    report["source_bytes"], report["source_files"] = _tree_size(plan["project_path"])
+    top_level = {}
+    for entry in os.scandir(output_dir):
+        top_level[entry.name] = _tree_size(entry.path)[0] if entry.is_dir() else entry.stat().st_size
+    report["largest"] = sorted(top_level.items(), key=lambda item: -item[1])[:5]
+
+    settings_module = f"{plan['settings_package']}.settings"
+    for key, path in (("bundle_imports", output_dir), ("source_imports", plan["project_path"])):
+        try:
+            probe = run_startup_probe(path, settings_module)
+            report[key] = {"modules": probe["modules"], "in_process_ms": probe["in_process"] * 1000, "status": probe["status"]}
+        except RuntimeError as e:
+            report[key] = {"error": str(e)}
+    return report
+
+
+def _print_report(plan, report):
+    print(f"Bundle written to {report['bundle_dir']}")
+    print(f"  pruned apps: {', '.join(plan['unused_apps']) or '-'}")
+    print(f"  pruned stubs: {len(plan['pruned_stubs'])}, dev-only entries left out: {len(plan['skipped_dev'])}")
+    print(f"  size: {report['bundle_bytes'] / 1024:.1f} KiB in {report['bundle_files']} files "
+          f"(source tree {report['source_bytes'] / 1024:.1f} KiB in {report['source_files']} files)")
+    for name, size in report["largest"]:
+        print(f"    {size / 1024:10.1f} KiB  {name}")
+    for key, label in (("bundle_imports", "bundle"), ("source_imports", "source")):
+        footprint = report[key]
+        if "error" in footprint:
+            print(f"  import footprint ({label}): probe failed: {footprint['error']}")
+        else:
+            print(f"  import footprint ({label}): {footprint['modules']} modules, "
+                  f"{footprint['in_process_ms']:.1f} ms to first response (HTTP {footprint['status']})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Write a pruned, precompiled deployment bundle of a generated project.')
+    parser.add_argument('project_path', help='The directory of the Django project (the one holding manage.py)')
+    parser.add_argument('--output', help=f'Bundle directory (default <PROJECT_BASE_DIR>/{DEFAULT_BUNDLE_DIR}/<project>)')
+    parser.add_argument('--optimize', type=int, choices=[-1, 0, 1, 2], default=-1, help='Bytecode optimization level (default: interpreter default)')
+    parser.add_argument('--no-report', action='store_true', help='Skip the size/import footprint report')
+
+    args = parser.parse_args()
+    if not os.path.isfile(os.path.join(args.project_path, "manage.py")):
+        print(f"BUNDLE-Error: Django project '{args.project_path}' does not exist.")
+        sys.exit(1)
+    project_path = os.path.abspath(args.project_path)
+    output_dir = args.output or os.path.join(os.path.dirname(project_path), DEFAULT_BUNDLE_DIR, os.path.basename(project_path))
+    try:
+        plan = write_bundle(project_path, output_dir, args.optimize)
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"BUNDLE-Error: {e}")
+        sys.exit(1)
+    if args.no_report:
+        print(f"Bundle written to {os.path.abspath(output_dir)}")
+    else:
+        _print_report(plan, bundle_report(os.path.abspath(output_dir), plan))
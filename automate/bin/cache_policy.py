@@ -0,0 +1,183 @@
+import os
+import sys
+import argparse
+import importlib
+import configparser
+
+from discovery import find_settings_package
+from generate_urls import write_file_if_changed
+from utils import compile_placeholders, substitute_placeholders
+from boot import boot_django
+
+# Per-module response caching for generated projects. The [cache] section of
+# config.ini (plus optional [cache.<app>.<mod>] sections) is rendered into
+# <settings package>/module_cache.py, which settings.py applies as its last
+# statement: it adds a "module_cache" entry to CACHES and provides the
+# @cache_module_view decorator that views_<mod>.py files opt into.
+#
+# Functions in this cache_policy.py file:
+# read_cache_config(config_file=CONFIG_FILE)
+# render_module_cache(project_path, cache_config=None)
+# install_module_cache(project_path, cache_config=None)
+# render_module_views(project_path, app_name, mod_name)
+# invalidate_cached_prefix(project_path, prefix)
+
+REPO_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+CONFIG_FILE = os.path.join(REPO_DIR, "config.ini")
+PROJECT_TEMPLATE_DIR = os.path.join(REPO_DIR, "automate", "template", "project")
+MODULE_CACHE_TEMPLATE = os.path.join(PROJECT_TEMPLATE_DIR, "module_cache.py")
+MODULE_VIEWS_TEMPLATE = os.path.join(PROJECT_TEMPLATE_DIR, "views_module.py")
+CACHE_SECTION = "cache"
+CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+}
+DEFAULT_CACHE_CONFIG = {"enabled": True, "backend": "locmem", "location": os.path.join(".cache", "responses"),
+                        "ttl": 300, "vary": ["Accept-Language"], "modules": {}}
+SETTINGS_HOOK = ("\n\n# Added by `./django cache`: per-module response cache ([cache] in config.ini)\n"
+                 "from .module_cache import apply_module_cache\n"
+                 "apply_module_cache(globals())\n")
+
+
+def _value(section, key, fallback=None):
+    # config.ini quotes its string values
+    value = section.get(key)
+    return fallback if value is None else value.strip().strip('"').strip("'")
+
+
+def _policy(section):
+    policy = {}
+    enabled = _value(section, "enabled")
+    if enabled is not None:
+        policy["enabled"] = enabled.lower() in ("yes", "true", "on", "1")
+    ttl = _value(section, "ttl")
+    if ttl is not None:
+        try:
+            policy["ttl"] = int(ttl)
+        except ValueError:
+            raise ValueError(f"[{section.name}] ttl must be a number of seconds, not {ttl!r}")
+    vary = _value(section, "vary")
+    if vary is not None:
+        policy["vary"] = [header.strip() for header in vary.split(",") if header.strip()]
+    return policy
+
+
+def read_cache_config(config_file=CONFIG_FILE):
+    """
+    The [cache] settings as a dict; missing keys (or a missing file) fall back to DEFAULT_CACHE_CONFIG.
+
+    modules maps "<app>.<mod>" to the keys its [cache.<app>.<mod>] section sets.
+    """
+    parser = configparser.ConfigParser(inline_comment_prefixes=(";",))
+    parser.read(config_file)
+    config = dict(DEFAULT_CACHE_CONFIG, modules={})
+    if parser.has_section(CACHE_SECTION):
+        section = parser[CACHE_SECTION]
+        config.update(_policy(section))
+        config["backend"] = _value(section, "backend", config["backend"])
+        config["location"] = _value(section, "location", config["location"])
+    if config["backend"] not in CACHE_BACKENDS:
+        raise ValueError(f"[{CACHE_SECTION}] backend must be one of {', '.join(CACHE_BACKENDS)}, not {config['backend']!r}")
+    for name in parser.sections():
+        if name.startswith(f"{CACHE_SECTION}."):
+            config["modules"][name[len(CACHE_SECTION) + 1:]] = _policy(parser[name])
+    return config
+
+
+def render_module_cache(project_path, cache_config=None):
+    """Return the content of <settings package>/module_cache.py for the project."""
+    cache_config = cache_config or read_cache_config()
+    settings_package = find_settings_package(project_path)
+    if settings_package is None:
+        raise FileNotFoundError(f"No settings package found in '{project_path}'.")
+    with open(MODULE_CACHE_TEMPLATE, "r", encoding="utf-8") as f:
+        template = f.read()
+    content, _ = substitute_placeholders(template, compile_placeholders({
+        "__PROJECT_NAME__": os.path.basename(os.path.abspath(project_path)),
+        "__SETTINGS_PACKAGE__": settings_package,
+        "__CACHE_ENABLED__": repr(bool(cache_config["enabled"])),
+        "__CACHE_BACKEND__": CACHE_BACKENDS[cache_config["backend"]],
+        "__CACHE_LOCATION__": cache_config["location"],
+        "__CACHE_TTL__": str(cache_config["ttl"]),
+        "__CACHE_VARY__": repr(list(cache_config["vary"])),
+        "__MODULE_POLICIES__": "".join(f"    {module!r}: {policy!r},\n"
+                                       for module, policy in sorted(cache_config["modules"].items())),
+    }))
+    return content
+
+
+def install_module_cache(project_path, cache_config=None):
+    """Write module_cache.py into the settings package and hook it into settings.py (once). Returns True if anything changed."""
+    settings_package = find_settings_package(project_path)
+    if settings_package is None:
+        raise FileNotFoundError(f"No settings package found in '{project_path}'.")
+    changed = write_file_if_changed(os.path.join(project_path, settings_package, "module_cache.py"),
+                                    render_module_cache(project_path, cache_config))
+    settings_file = os.path.join(project_path, settings_package, "settings.py")
+    with open(settings_file, "r", encoding="utf-8") as f:
+        settings_source = f.read()
+    if "apply_module_cache(globals())" not in settings_source:
+        with open(settings_file, "a", encoding="utf-8") as f:
+            f.write(SETTINGS_HOOK)
+        changed = True
+    return changed
+
+
+def render_module_views(project_path, app_name, mod_name):
+    """
+    Starter views_<mod>.py for a new module, showing the cache decorator.
+
+    Returns "" for projects without module_cache.py, which keep the empty file
+    they always got.
+    """
+    settings_package = find_settings_package(project_path)
+    if settings_package is None or not os.path.isfile(os.path.join(project_path, settings_package, "module_cache.py")):
+        return ""
+    with open(MODULE_VIEWS_TEMPLATE, "r", encoding="utf-8") as f:
+        template = f.read()
+    content, _ = substitute_placeholders(template, compile_placeholders({
+        "__SETTINGS_PACKAGE__": settings_package,
+        "__APP_NAME__": app_name,
+        "__MODULE_NAME__": mod_name,
+    }))
+    return content
+
+
+def invalidate_cached_prefix(project_path, prefix):
+    """Drop cached responses under a URL prefix from outside the server (shared backends only). Returns the modules."""
+    project_path = os.path.abspath(project_path)
+    boot_django(project_path)
+    from django.conf import settings
+
+    module_cache = importlib.import_module(f"{find_settings_package(project_path)}.module_cache")
+    backend = settings.CACHES.get(module_cache.CACHE_ALIAS, {}).get("BACKEND", "")
+    if backend == CACHE_BACKENDS["locmem"]:
+        raise RuntimeError("the locmem cache lives inside each server process; call invalidate_url_prefix() "
+                           "from the application, or set backend = \"file\" in [cache]")
+    return module_cache.invalidate_url_prefix(prefix)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Write the per-module response cache settings of a project from config.ini.')
+    parser.add_argument('project_path', help='The directory of the Django project (the one holding manage.py)')
+    parser.add_argument('--invalidate', metavar='PREFIX', help="Drop the cached responses of every module mounted under a URL prefix ('/' for all)")
+
+    args = parser.parse_args()
+    if not os.path.isfile(os.path.join(args.project_path, "manage.py")):
+        print(f"CACHE-Error: Django project '{args.project_path}' does not exist.")
+        sys.exit(1)
+    try:
+        if args.invalidate:
+            modules = invalidate_cached_prefix(args.project_path, args.invalidate)
+            print(f"Invalidated cached responses under {args.invalidate}: {', '.join(modules) or 'no module mounted there'}")
+            sys.exit(0)
+        cache_config = read_cache_config()
+        changed = install_module_cache(args.project_path, cache_config)
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"CACHE-Error: {e}")
+        sys.exit(1)
+    state = "enabled" if cache_config["enabled"] else "disabled"
+    print(f"Module cache {state}: {cache_config['backend']} backend, ttl {cache_config['ttl']}s, "
+          f"vary {', '.join(cache_config['vary']) or '-'}" + ("" if changed else " (unchanged)"))
+    for module, policy in sorted(cache_config["modules"].items()):
+        print(f"  {module}: {policy}")
@@ -0,0 +1,172 @@
+import os
+import sys
+import json
+import time
+import argparse
+
+from discovery import find_settings_package, scan_project_apps
+from generate_urls import write_file_if_changed
+from utils import compile_placeholders, substitute_placeholders
+from boot import boot_django
+
+# Ahead-of-time check of the module templates of a generated project: every
+# file in <app>/templates/<app>/<mod_*>/ is parsed with the project's Django
+# template engine, syntax errors are reported with file and line, and the
+# names of the templates that parsed are written to
+# <settings package>/template_manifest.json for warm_template_cache().
+#
+# The settings side (cached loader outside DEBUG, warm_template_cache()) is
+# <settings package>/template_loading.py, installed when a project is created;
+# `./django compile-templates <project> --install` adds it to an older project.
+# The check itself never edits settings.
+#
+# Functions in this compile_templates.py file:
+# install_template_loading(project_path)
+# find_module_templates(project_path, mod_prefix="mod")
+# compile_templates(project_path, verbose=True)
+
+PROJECT_TEMPLATE_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "template", "project"))
+TEMPLATE_LOADING_TEMPLATE = os.path.join(PROJECT_TEMPLATE_DIR, "template_loading.py")
+TEMPLATE_MANIFEST_NAME = "template_manifest.json"
+SETTINGS_HOOK = ("\n\n# Added by the project generator: cached template loader outside DEBUG\n"
+                 "from .template_loading import apply_template_loading\n"
+                 "apply_template_loading(globals())\n")
+
+
+def install_template_loading(project_path):
+    """Put template_loading.py in the settings package and hook it into settings.py (once)."""
+    settings_package = find_settings_package(project_path)
+    if settings_package is None:
+        raise FileNotFoundError(f"No settings package found in '{project_path}'.")
+    with open(TEMPLATE_LOADING_TEMPLATE, "r", encoding="utf-8") as f:
+        template = f.read()
+    content, _ = substitute_placeholders(template, compile_placeholders({
+        "__PROJECT_NAME__": os.path.basename(os.path.abspath(project_path)),
+    }))
+    write_file_if_changed(os.path.join(project_path, settings_package, "template_loading.py"), content)
+
+    settings_file = os.path.join(project_path, settings_package, "settings.py")
+    with open(settings_file, "r", encoding="utf-8") as f:
+        settings_source = f.read()
+    if "apply_template_loading(globals())" not in settings_source:
+        with open(settings_file, "a", encoding="utf-8") as f:
+            f.write(SETTINGS_HOOK)
+
+
+def find_module_templates(project_path, mod_prefix="mod"):
+    """
+    [(template name, file path)] for the files under <app>/templates/<app>/<mod_*>/, sorted.
+
+    The name is what get_template() takes, e.g. 'app_blog/mod_posts/list.html'.
+    """
+    project_path = os.path.abspath(project_path)
+    found = []
+    for app in scan_project_apps(project_path):
+        templates_root = os.path.join(project_path, app, "templates")
+        app_templates = os.path.join(templates_root, app)
+        if not os.path.isdir(app_templates):
+            continue
+        with os.scandir(app_templates) as entries:
+            module_dirs = sorted(e.path for e in entries if e.is_dir() and e.name.startswith(f"{mod_prefix}_"))
+        for module_dir in module_dirs:
+            for root, dirs, files in os.walk(module_dir):
+                dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+                for filename in sorted(files):
+                    if filename.startswith(".") or filename.endswith("~"):
+                        continue
+                    file_path = os.path.join(root, filename)
+                    found.append((os.path.relpath(file_path, templates_root).replace(os.sep, "/"), file_path))
+    return found
+
+
+def _django_engines():
+    from django.template import engines
+    from django.template.backends.django import DjangoTemplates
+
+    return [engine for engine in engines.all() if isinstance(engine, DjangoTemplates)]
+
+
+def compile_templates(project_path, verbose=True):
+    """
+    Parse every module template and write the manifest. Returns a summary dict; errors is a list of messages.
+
+    Boots Django in this process, so custom tags and filters of the project resolve.
+    """
+    from django.template import TemplateDoesNotExist, TemplateSyntaxError
+
+    project_path = os.path.abspath(project_path)
+    boot_django(project_path)
+    engines = _django_engines()
+    if not engines:
+        raise RuntimeError("the project has no DjangoTemplates backend in TEMPLATES")
+    engine = engines[0].engine
+
+    start = time.perf_counter()
+    templates = find_module_templates(project_path)
+    compiled, unreachable, errors = [], [], []
+    # debug parsing records the line of a syntax error
+    engine_debug, engine.debug = engine.debug, True
+    try:
+        for name, file_path in templates:
+            try:
+                with open(file_path, "r", encoding="utf-8") as f:
+                    engine.from_string(f.read())
+            except UnicodeDecodeError as e:
+                errors.append(f"{file_path}: not UTF-8 text ({e.reason})")
+                continue
+            except TemplateSyntaxError as e:
+                line = getattr(e, "template_debug", {}).get("line")
+                errors.append(f"{file_path}{f':{line}' if line else ''}: {e}")
+                continue
+            compiled.append(name)
+    finally:
+        engine.debug = engine_debug
+
+    # a template the loaders can't find by name (its app is not in INSTALLED_APPS) can't be warmed
+    for name in compiled:
+        try:
+            engine.find_template(name)
+        except TemplateDoesNotExist:
+            unreachable.append(name)
+
+    manifest_path = os.path.join(project_path, find_settings_package(project_path), TEMPLATE_MANIFEST_NAME)
+    reachable = [name for name in compiled if name not in unreachable]
+    write_file_if_changed(manifest_path, json.dumps({"templates": reachable}, indent=1) + "\n")
+
+    summary = {"templates": len(templates), "compiled": len(compiled), "unreachable": unreachable,
+               "errors": errors, "manifest": manifest_path, "seconds": time.perf_counter() - start}
+    if verbose:
+        for message in errors:
+            print(message)
+        print(f"{len(compiled)} of {len(templates)} module template(s) compiled in {summary['seconds']:.2f}s, "
+              f"{len(reachable)} listed in {manifest_path}")
+        if not os.path.isfile(os.path.join(os.path.dirname(manifest_path), "template_loading.py")):
+            print("  the project has no template_loading.py, so nothing warms the manifest: rerun with --install")
+        if unreachable:
+            print(f"  {len(unreachable)} not found by the template loaders (app not in INSTALLED_APPS?): "
+                  + ", ".join(unreachable[:5]) + (" ..." if len(unreachable) > 5 else ""))
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Parse every templates/<app>/<mod> template of a project ahead of time.')
+    parser.add_argument('project_path', help='The directory of the Django project (the one holding manage.py)')
+    parser.add_argument('--quiet', action='store_true', help='Only print errors')
+    parser.add_argument('--install', action='store_true', help='First add template_loading.py and its settings.py hook (projects created before it existed)')
+
+    args = parser.parse_args()
+    if not os.path.isfile(os.path.join(args.project_path, "manage.py")):
+        print(f"COMPILE-TEMPLATES-Error: Django project '{args.project_path}' does not exist.")
+        sys.exit(1)
+    try:
+        if args.install:
+            install_template_loading(args.project_path)
+        summary = compile_templates(args.project_path, verbose=not args.quiet)
+    except (OSError, RuntimeError) as e:
+        print(f"COMPILE-TEMPLATES-Error: {e}")
+        sys.exit(1)
+    if summary["errors"]:
+        if args.quiet:
+            print("\n".join(summary["errors"]))
+        print(f"COMPILE-TEMPLATES-Error: {len(summary['errors'])} template(s) failed to compile.")
+        sys.exit(1)
@@ -0,0 +1,373 @@
+import os
+import sys
+import json
+import time
+import socket
+import signal
+import argparse
+import subprocess
+
+# Optional resident worker for ./django. `./django daemon start` launches one
+# long-lived Python process that has already imported the management code,
+# read config.ini, loaded the project index and imported Django. Each request
+# arriving on its Unix socket is served by a fork() of that warm process, so a
+# `./django create|apply|delete|list|mgmt ...` pays for a fork instead of a
+# cold interpreter start and a Django import.
+#
+# The client passes its own stdin/stdout/stderr over the socket (SCM_RIGHTS),
+# so output, prompts and exit codes behave exactly as if the command had run
+# in the calling shell. When no daemon is listening, or it can't serve the
+# request as the caller would have run it (different cwd or interpreter,
+# changed code or config), the client exits with DAEMON_UNAVAILABLE and the
+# `django` script runs the command directly as before.
+#
+# This file is kept import-light on purpose: `send` runs under `python -S`
+# for every routed command.
+#
+# Functions in this daemon.py file:
+# default_socket_path()
+# send_request(socket_path, request)
+# serve(socket_path)
+# start_daemon(socket_path)
+# stop_daemon(socket_path)
+# daemon_status(socket_path)
+
+DAEMON_UNAVAILABLE = 75  # EX_TEMPFAIL: the caller should run the command itself
+BIN_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.abspath(os.path.join(BIN_DIR, "..", ".."))
+# relative to REPO_DIR; kept relative so it stays under the AF_UNIX path length limit
+DAEMON_SOCKET_NAME = os.path.join("automate", ".daemon.sock")
+DAEMON_LOG_NAME = os.path.join("automate", ".daemon.log")
+# modules that import without configured settings; everything a manage.py run needs first
+PRELOADED_DJANGO_MODULES = (
+    "django.core.management",
+    "django.core.management.base",
+    "django.db.models",
+    "django.db.migrations",
+    "django.urls",
+    "django.http",
+    "django.forms",
+    "django.views.generic",
+    "django.contrib.admin",
+)
+FORWARDED_SIGNALS = ("SIGINT", "SIGTERM", "SIGHUP", "SIGQUIT")
+
+
+def default_socket_path():
+    """Daemon socket path, relative to the current directory when that is shorter."""
+    socket_path = os.path.join(REPO_DIR, DAEMON_SOCKET_NAME)
+    relative_path = os.path.relpath(socket_path)
+    return relative_path if len(relative_path) < len(socket_path) else socket_path
+
+
+def _read_message(reader):
+    """Read one newline-terminated JSON message from a socket file, or None if the peer went away."""
+    line = reader.readline()
+    if not line.endswith(b"\n"):
+        return None
+    return json.loads(line)
+
+
+def _write_message(conn, message):
+    conn.sendall(json.dumps(message).encode("utf-8") + b"\n")
+
+
+################################################ CLIENT ##############################################################
+def _connect(socket_path, timeout=None):
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    conn.settimeout(timeout)
+    try:
+        conn.connect(socket_path)
+    except OSError:
+        conn.close()
+        return None
+    return conn
+
+
+def send_request(socket_path, request):
+    """
+    Run request in the daemon with this process's stdin/stdout/stderr.
+
+    Returns the command's exit code, or DAEMON_UNAVAILABLE if the daemon isn't
+    running or declined the request.
+    """
+    conn = _connect(socket_path, timeout=5)
+    if conn is None:
+        return DAEMON_UNAVAILABLE
+    request = dict(request, cwd=os.getcwd(), python=os.path.realpath(sys.executable), env=dict(os.environ))
+    try:
+        socket.send_fds(conn, [json.dumps(request).encode("utf-8") + b"\n"], [0, 1, 2])
+        conn.settimeout(None)
+        reader = conn.makefile("rb")
+        started = _read_message(reader)
+        if not started or "pid" not in started:
+            return DAEMON_UNAVAILABLE
+
+        # Ctrl-C & co. reach this client, not the worker; pass them on to the worker's process group
+        def forward(signum, frame):
+            try:
+                os.killpg(started["pid"], signum)
+            except ProcessLookupError:
+                pass
+        for name in FORWARDED_SIGNALS:
+            signal.signal(getattr(signal, name), forward)
+
+        finished = _read_message(reader)
+    except OSError:
+        return DAEMON_UNAVAILABLE
+    finally:
+        conn.close()
+    if finished is None:
+        print("DAEMON-Error: worker exited without reporting a status.", file=sys.stderr)
+        return 1
+    return finished["exit_code"]
+
+
+################################################ SERVER ##############################################################
+def _source_mtimes():
+    """mtimes of everything the resident process has loaded and would otherwise go stale."""
+    paths = [os.path.join(BIN_DIR, f) for f in os.listdir(BIN_DIR) if f.endswith(".py")]
+    paths.append(os.path.join(REPO_DIR, "config.ini"))
+    mtimes = {}
+    for path in paths:
+        try:
+            mtimes[path] = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            mtimes[path] = None
+    return mtimes
+
+
+def _preload():
+    """Import the management code and Django, and load the project index, once."""
+    import django_project_mgmt
+    import project_index
+    base_dir = os.path.abspath(django_project_mgmt.abs_project_base_dir)
+    project_index.load_index(base_dir)
+    project_index.save_index(base_dir)
+    if project_index._loaded_indexes[base_dir][1]:
+        # no base dir to persist a scan into yet; workers will build their own
+        del project_index._loaded_indexes[base_dir]
+    django_version = None
+    try:
+        import django
+        django_version = django.get_version()
+        for module_name in PRELOADED_DJANGO_MODULES:
+            try:
+                __import__(module_name)
+            except Exception as e:
+                print(f"Preload of {module_name} skipped: {e}")
+    except ImportError:
+        print("Django is not importable; mgmt requests will start from a cold import.")
+    return django_project_mgmt, django_version
+
+
+def _run_worker(conn, fds, request, dpm):
+    """Body of the forked child: adopt the client's stdio/env/cwd and run the request."""
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    os.setsid()  # own process group, so forwarded signals reach runserver's reloader child too
+    for target_fd, fd in enumerate(fds):
+        os.dup2(fd, target_fd)
+        os.close(fd)
+    sys.stdout.reconfigure(line_buffering=True)
+    os.environ.clear()
+    os.environ.update(request["env"])
+    _write_message(conn, {"pid": os.getpid()})
+
+    exit_code = 0
+    try:
+        if request["op"] == "run":
+            sys.argv = ["django_project_mgmt.py"] + request["argv"]
+            dpm.main(sys.argv)
+        elif request["op"] == "manage":
+            import runpy
+            project_path = os.path.abspath(request["project_path"])
+            manage_py = os.path.join(project_path, "manage.py")
+            os.chdir(project_path)
+            # python manage.py would not see automate/bin; don't let its modules shadow project ones
+            for name, module in list(sys.modules.items()):
+                if name != "__main__" and os.path.dirname(os.path.abspath(getattr(module, "__file__", None) or "")) == BIN_DIR:
+                    del sys.modules[name]
+            sys.path[:] = [project_path] + [p for p in sys.path if os.path.abspath(p or ".") != BIN_DIR]
+            # the same argv manage.py would see, so runserver's autoreloader re-execs manage.py
+            sys.argv = [manage_py] + request["argv"]
+            runpy.run_path(manage_py, run_name="__main__")
+    except SystemExit as e:
+        if isinstance(e.code, int) or e.code is None:
+            exit_code = e.code or 0
+        else:
+            print(e.code, file=sys.stderr)
+            exit_code = 1
+    except KeyboardInterrupt:
+        exit_code = 130
+    except BaseException:
+        import traceback
+        traceback.print_exc()
+        exit_code = 1
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            _write_message(conn, {"exit_code": exit_code})
+        except OSError:
+            pass
+        os._exit(exit_code)
+
+
+def serve(socket_path):
+    """Accept requests forever, forking one worker per request."""
+    os.chdir(REPO_DIR)
+    dpm, django_version = _preload()
+    loaded_mtimes = _source_mtimes()
+    python = os.path.realpath(sys.executable)
+    started_at = time.time()
+    served = 0
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(socket_path)
+    listener.listen(64)
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)  # workers report to their client; nothing to reap
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"Daemon {os.getpid()} listening on {socket_path} (Django {django_version or 'not loaded'})", flush=True)
+
+    try:
+        while True:
+            conn, _ = listener.accept()
+            fds = []
+            try:
+                message, fds, _, _ = socket.recv_fds(conn, 1 << 20, 3)
+                while message and not message.endswith(b"\n"):
+                    chunk = conn.recv(1 << 20)
+                    if not chunk:
+                        break
+                    message += chunk
+                request = json.loads(message)
+                op = request.get("op")
+                if op == "ping":
+                    _write_message(conn, {"pid": os.getpid(), "uptime": round(time.time() - started_at, 1),
+                                          "served": served, "django": django_version, "cwd": REPO_DIR})
+                    continue
+                if op == "stop":
+                    _write_message(conn, {"pid": os.getpid(), "stopping": True})
+                    break
+
+                stale = _source_mtimes() != loaded_mtimes
+                if (stale or op not in ("run", "manage") or len(fds) != 3
+                        or os.path.realpath(request.get("cwd", "")) != os.path.realpath(REPO_DIR) or request.get("python") != python):
+                    _write_message(conn, {"declined": True})  # client falls back to running it itself
+                    if stale:
+                        print("Code or config changed, restarting.", flush=True)
+                        for fd in fds:
+                            os.close(fd)
+                        conn.close()
+                        listener.close()
+                        os.execv(sys.executable, [sys.executable, os.path.abspath(__file__), "serve", "--socket", socket_path])
+                    continue
+
+                sys.stdout.flush()
+                sys.stderr.flush()
+                if os.fork() == 0:
+                    listener.close()
+                    _run_worker(conn, fds, request, dpm)
+                served += 1
+            except (OSError, ValueError) as e:
+                print(f"Request failed: {e}", flush=True)
+            finally:
+                for fd in fds:  # the worker has its own copies
+                    os.close(fd)
+                conn.close()
+    finally:
+        listener.close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+################################################ CONTROL #############################################################
+def _control(socket_path, op):
+    conn = _connect(socket_path, timeout=5)
+    if conn is None:
+        return None
+    try:
+        _write_message(conn, {"op": op})
+        return _read_message(conn.makefile("rb"))
+    except OSError:
+        return None
+    finally:
+        conn.close()
+
+
+def daemon_status(socket_path):
+    """Return the running daemon's status dict, or None."""
+    return _control(socket_path, "ping")
+
+
+def start_daemon(socket_path, timeout=30):
+    """Launch a detached daemon and wait until it answers. Returns its status."""
+    status = daemon_status(socket_path)
+    if status is not None:
+        print(f"Daemon already running (pid {status['pid']}).")
+        return status
+    # serve() runs from REPO_DIR; a path relative to it stays short enough for AF_UNIX
+    serve_socket_path = os.path.relpath(os.path.abspath(socket_path), REPO_DIR)
+    with open(os.path.join(REPO_DIR, DAEMON_LOG_NAME), "ab") as log:
+        subprocess.Popen([sys.executable, os.path.abspath(__file__), "serve", "--socket", serve_socket_path],
+                         cwd=REPO_DIR, stdin=subprocess.DEVNULL, stdout=log, stderr=log,
+                         start_new_session=True, close_fds=True)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = daemon_status(socket_path)
+        if status is not None:
+            print(f"Daemon started (pid {status['pid']}, Django {status['django'] or 'not loaded'}).")
+            return status
+        time.sleep(0.05)
+    print(f"DAEMON-Error: daemon did not come up, see {DAEMON_LOG_NAME}.")
+    return None
+
+
+def stop_daemon(socket_path):
+    """Ask the daemon to exit. Returns True if one was running."""
+    status = _control(socket_path, "stop")
+    if status is None:
+        print("Daemon is not running.")
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)  # left behind by a daemon that was killed
+        return False
+    print(f"Daemon {status['pid']} stopped.")
+    return True
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 3 and sys.argv[1] == "send":
+        # hot path, no argparse: send <run|manage> ...
+        op = sys.argv[2]
+        if op == "manage":
+            request = {"op": op, "project_path": sys.argv[3], "argv": sys.argv[4:]}
+        else:
+            request = {"op": op, "argv": sys.argv[3:]}
+        sys.exit(send_request(default_socket_path(), request))
+
+    parser = argparse.ArgumentParser(description='Resident worker that serves ./django requests without a cold interpreter start.')
+    parser.add_argument('command', choices=['start', 'stop', 'restart', 'status', 'serve'],
+                        help='serve runs in the foreground; start detaches')
+    parser.add_argument('--socket', default=None, help=f'Socket path (default: {DAEMON_SOCKET_NAME})')
+
+    args = parser.parse_args()
+    socket_path = args.socket or default_socket_path()
+    if args.command == "serve":
+        serve(socket_path)
+    elif args.command == "start":
+        sys.exit(0 if start_daemon(socket_path) else 1)
+    elif args.command == "stop":
+        stop_daemon(socket_path)
+    elif args.command == "restart":
+        stop_daemon(socket_path)
+        sys.exit(0 if start_daemon(socket_path) else 1)
+    elif args.command == "status":
+        status = daemon_status(socket_path)
+        if status is None:
+            print("Daemon is not running.")
+            sys.exit(1)
+        for key, value in status.items():
+            print(f"{key}: {value}")
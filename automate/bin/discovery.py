@@ -0,0 +1,162 @@
+import os
+import ast
+from collections import namedtuple
+
+# Read-only helpers that describe a generated project on disk without
+# importing Django or the project itself.
+#
+# Functions in this discovery.py file:
+# find_settings_package(project_path)
+# read_installed_apps(settings_file)
+# find_url_apps(project_path, installed_apps=None)
+# read_module_constant(module_file, name)
+# scan_app_modules(app_directory, include_default=False)
+# scan_project_apps(project_path)
+
+
+def find_settings_package(project_path, project_prefix="project"):
+    """
+    Return the name of the package holding settings.py inside project_path.
+
+    `<project_prefix>_<project_name>` is checked first since that is what
+    create_django_project() generates; any other package with a settings.py
+    is accepted as a fallback. Returns None if there is none.
+    """
+    project_path = os.path.abspath(project_path)
+    preferred = f"{project_prefix}_{os.path.basename(project_path)}"
+    if os.path.isfile(os.path.join(project_path, preferred, "settings.py")):
+        return preferred
+    for entry in sorted(os.listdir(project_path)):
+        if os.path.isfile(os.path.join(project_path, entry, "settings.py")):
+            return entry
+    return None
+
+
+def read_installed_apps(settings_file):
+    """
+    Statically read INSTALLED_APPS from a settings module.
+
+    Understands `INSTALLED_APPS = [...]`, `INSTALLED_APPS += [...]` and
+    `.append()` / `.extend()` / `.insert()` with literal arguments. Returns None
+    when the value can't be determined without executing the settings.
+    """
+    with open(settings_file, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=settings_file)
+
+    installed_apps = None
+    for node in tree.body:
+        try:
+            if isinstance(node, ast.Assign) and any(isinstance(t, ast.Name) and t.id == "INSTALLED_APPS" for t in node.targets):
+                installed_apps = list(ast.literal_eval(node.value))
+            elif isinstance(node, ast.AugAssign) and isinstance(node.target, ast.Name) and node.target.id == "INSTALLED_APPS":
+                installed_apps = (installed_apps or []) + list(ast.literal_eval(node.value))
+            elif (isinstance(node, ast.Expr) and isinstance(node.value, ast.Call)
+                  and isinstance(node.value.func, ast.Attribute)
+                  and isinstance(node.value.func.value, ast.Name)
+                  and node.value.func.value.id == "INSTALLED_APPS"
+                  and installed_apps is not None):
+                args = [ast.literal_eval(arg) for arg in node.value.args]
+                method = node.value.func.attr
+                if method == "append":
+                    installed_apps.append(args[0])
+                elif method == "extend":
+                    installed_apps.extend(args[0])
+                elif method == "insert":
+                    installed_apps.insert(args[0], args[1])
+        except (ValueError, TypeError, IndexError):
+            return None
+    return installed_apps
+
+
+def find_url_apps(project_path, installed_apps=None):
+    """
+    Return ([app_* with app_urls.py], [rest_* with rest_urls.py]) for a project.
+
+    When installed_apps is given only those apps are considered, in that
+    order; otherwise the project directory is scanned alphabetically.
+    """
+    project_path = os.path.abspath(project_path)
+    candidates = installed_apps if installed_apps is not None else sorted(os.listdir(project_path))
+    app_modules = []
+    rest_modules = []
+    for app in candidates:
+        if app.startswith("app_") and os.path.isfile(os.path.join(project_path, app, "app_urls.py")):
+            app_modules.append(app)
+        elif app.startswith("rest_") and os.path.isfile(os.path.join(project_path, app, "rest_urls.py")):
+            rest_modules.append(app)
+    return app_modules, rest_modules
+
+
+def read_module_constant(module_file, name):
+    """Return the literal value of a top-level `name = <literal>` in a module, or None."""
+    with open(module_file, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=module_file)
+    value = None
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(isinstance(t, ast.Name) and t.id == name for t in node.targets):
+            try:
+                value = ast.literal_eval(node.value)
+            except ValueError:
+                value = None
+    return value
+
+
+# One entry per mod_<name> package of an app, built from a single scandir of
+# the app plus one scandir per module. DirEntry caches the d_type from the
+# directory listing, so no extra stat() calls are made per entry.
+ModuleDescriptor = namedtuple("ModuleDescriptor", [
+    "name",          # package name, e.g. 'mod_posts'
+    "short_name",    # name without the prefix, e.g. 'posts' (also its URL segment)
+    "path",          # absolute path of the package
+    "app_name",      # owning app package, e.g. 'app_blog'
+    "urls_module",   # dotted URL module ('app_blog.mod_posts.urls_posts') or None if missing
+    "has_models",    # models_<short_name>.py exists
+    "has_views",     # views_<short_name>.py exists
+    "has_forms",     # forms_<short_name>.py exists
+    "files",         # frozenset of file names in the package
+])
+
+DEFAULT_MODULE_NAME = "mod_app"
+
+
+def scan_app_modules(app_directory, include_default=False, mod_prefix="mod"):
+    """
+    Return ModuleDescriptors for the mod_* packages of an app, sorted by name.
+
+    mod_app (the app's URL/aggregator package) is skipped unless include_default.
+    """
+    app_directory = os.path.abspath(app_directory)
+    app_name = os.path.basename(app_directory)
+    prefix = f"{mod_prefix}_"
+    modules = []
+    with os.scandir(app_directory) as entries:
+        module_entries = [e for e in entries if e.name.startswith(prefix) and e.is_dir()]
+    for entry in sorted(module_entries, key=lambda e: e.name):
+        if entry.name == DEFAULT_MODULE_NAME and not include_default:
+            continue
+        short_name = entry.name[len(prefix):]
+        with os.scandir(entry.path) as files:
+            file_names = frozenset(f.name for f in files if f.is_file())
+        urls_file = f"urls_{short_name}.py"
+        modules.append(ModuleDescriptor(
+            name=entry.name,
+            short_name=short_name,
+            path=entry.path,
+            app_name=app_name,
+            urls_module=f"{app_name}.{entry.name}.urls_{short_name}" if urls_file in file_names else None,
+            has_models=f"models_{short_name}.py" in file_names,
+            has_views=f"views_{short_name}.py" in file_names,
+            has_forms=f"forms_{short_name}.py" in file_names,
+            files=file_names,
+        ))
+    return modules
+
+
+def scan_project_apps(project_path):
+    """Return the sorted names of the Django apps (directories with apps.py) in a project."""
+    apps = []
+    with os.scandir(project_path) as entries:
+        for entry in entries:
+            if not entry.name.startswith(".") and entry.is_dir() and os.path.isfile(os.path.join(entry.path, "apps.py")):
+                apps.append(entry.name)
+    return sorted(apps)
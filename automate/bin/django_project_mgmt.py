@@ -1,12 +1,18 @@
 import os
 import sys
-import subprocess
-import shutil
 import configparser
 import time 
 
 from generate_urls import *
 from utils import *
+from scaffold import *
+from snapshot import *
+from manifest import *
+from project_index import *
+from trash import move_to_trash, start_background_gc, collect_trash
+from cache_policy import install_module_cache, render_module_views
+from compile_templates import install_template_loading
+from metrics import install_module_metrics
 
 # Load configuration from config.ini
 config = configparser.ConfigParser()
@@ -31,7 +37,14 @@ def create_django_project(project_name, base_dir):
     os.makedirs(project_path, exist_ok=True)    
     if os.path.exists(check_abs_django_project_path):
         return
-    subprocess.run(["django-admin", "startproject", f"project_{project_name}", project_path])
+    create_project_from_snapshot(f"project_{project_name}", project_path, os.path.join(abs_project_base_dir, SNAPSHOT_CACHE_DIR_NAME))
+    # CACHES and @cache_module_view from the [cache] section of config.ini
+    install_module_cache(project_path)
+    # cached template loader outside DEBUG
+    install_template_loading(project_path)
+    # per-module latency/query metrics middleware
+    install_module_metrics(project_path)
+    index_add_project(abs_project_base_dir, project_name)
     
     print(f"Django project '{project_name}' created successfully.")
 ########################################### APP RELATED ########################################################
@@ -44,7 +57,8 @@ def create_django_app(project_name, app_name, base_dir):
         create_django_project(project_name, base_dir)
     if os.path.exists(check_abs_app_path):
         return
-    subprocess.run(["python", "manage.py", "startapp", std_app_name], cwd=project_path, check=True)
+    create_app_skeleton(std_app_name, project_path)
+    index_add_app(abs_project_base_dir, project_name, std_app_name)
     if APP_FILES == "no":
             app_files = ["models.py", "tests.py", "views.py"]            
             for file in app_files:
@@ -65,6 +79,20 @@ def create_django_app(project_name, app_name, base_dir):
     generate_app_urls(std_app_name, app_name, project_path)
     print(f"Django app '{std_app_name}' created successfully.")
 ########################################### MODULE RELATED ########################################################
+def create_module_file(file_path, content):
+    """Create a module file with initial content; an existing file is left alone."""
+    if os.path.exists(file_path):
+        print(f"File already exists at: {file_path}")
+        return
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def create_views_file(file_path, project_path, std_app_name, std_mod_name):
+    """Create views_<mod>.py with the cache decorator import, or empty for projects without module_cache.py."""
+    create_module_file(file_path, render_module_views(project_path, std_app_name, std_mod_name))
+
+
 def create_custom_module(project_name, app_name, mod_name, base_dir):
     """Create a new module in an existing Django app."""
     project_path = os.path.join(abs_project_base_dir, project_name)
@@ -94,40 +122,111 @@ def create_custom_module(project_name, app_name, mod_name, base_dir):
         create_empty_file(os.path.join(check_abs_def_mod_path, f"all_form_imports.py"))
         # update the urls_app.py of the app based on the modules
         generate_urls(check_abs_app_path, "urls_app")
+        generate_aggregators(check_abs_app_path)
+        index_add_module(abs_project_base_dir, project_name, std_app_name, def_mod_name)
         print(f"Django module '{std_mod_name}' created successfully.")
     app_mod_name = f"{MOD_PREFIX}_{app_name}"
     check_abs_app_mod_path = os.path.join(check_abs_app_path, app_mod_name)
     if not os.path.exists(check_abs_app_mod_path):
         create_directory(check_abs_app_mod_path)        
         create_empty_file(os.path.join(check_abs_app_mod_path, "__init__.py"))
-        create_empty_file(os.path.join(check_abs_app_mod_path, f"urls_{app_name}.py")) 
+        create_module_file(os.path.join(check_abs_app_mod_path, f"urls_{app_name}.py"), EMPTY_MODULE_URLS)
         create_empty_file(os.path.join(check_abs_app_mod_path, f"models_{mod_name}.py"))
-        create_empty_file(os.path.join(check_abs_app_mod_path, f"views_{mod_name}.py"))
+        create_views_file(os.path.join(check_abs_app_mod_path, f"views_{mod_name}.py"), project_path, std_app_name, app_mod_name)
         create_empty_file(os.path.join(check_abs_app_mod_path, f"forms_{mod_name}.py"))
         # update the urls_app.py of the app based on the modules
         generate_urls(check_abs_app_path, "urls_app")
+        generate_aggregators(check_abs_app_path)
+        index_add_module(abs_project_base_dir, project_name, std_app_name, app_mod_name)
         print(f"Django module '{app_mod_name}' created successfully.")
 
     check_abs_new_mod_path = os.path.join(check_abs_app_path, std_mod_name)
     if not os.path.exists(check_abs_new_mod_path):
         create_directory(check_abs_new_mod_path)        
         create_empty_file(os.path.join(check_abs_new_mod_path, "__init__.py"))
-        create_empty_file(os.path.join(check_abs_new_mod_path, f"urls_{mod_name}.py")) 
+        create_module_file(os.path.join(check_abs_new_mod_path, f"urls_{mod_name}.py"), EMPTY_MODULE_URLS)
         create_empty_file(os.path.join(check_abs_new_mod_path, f"models_{mod_name}.py"))
-        create_empty_file(os.path.join(check_abs_new_mod_path, f"views_{mod_name}.py"))
+        create_views_file(os.path.join(check_abs_new_mod_path, f"views_{mod_name}.py"), project_path, std_app_name, std_mod_name)
         create_empty_file(os.path.join(check_abs_new_mod_path, f"forms_{mod_name}.py"))
         # update the urls_app.py of the app based on the modules
         generate_urls(check_abs_app_path, "urls_app")
+        generate_aggregators(check_abs_app_path)
+        index_add_module(abs_project_base_dir, project_name, std_app_name, std_mod_name)
         print(f"Django module '{std_mod_name}' created successfully.")
     
 
 ######################################################################################################################
-def delete_django_project(project_name):
-    """Delete an existing Django project."""
-    project_path = os.path.join("env", "dev", project_name)
+def create_shortcut_scripts(project_name):
+    """Create the m1/m2/m3/m123 manage.py shortcuts inside the project directory."""
+    project_path = os.path.join(abs_project_base_dir, project_name)
+    if not os.path.isdir(project_path):
+        return
+    write_shortcut_scripts(project_path)
 
-    if os.path.exists(project_path):
-        shutil.rmtree(project_path)
+
+def apply_manifest(manifest_path):
+    """Create every project/app/module listed in a manifest in one process."""
+    try:
+        entries = load_manifest(manifest_path)
+    except (OSError, ValueError) as e:
+        print(f"APPLY-Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    start = time.time()
+    projects = []
+    begin_url_batch()
+    try:
+        for project_name, app_name, mod_name in entries:
+            if mod_name is not None:
+                create_custom_module(project_name, app_name, mod_name, PROJECT_BASE_DIR)
+            elif app_name is not None:
+                create_django_app(project_name, app_name, PROJECT_BASE_DIR)
+            else:
+                create_django_project(project_name, PROJECT_BASE_DIR)
+            if project_name not in projects:
+                projects.append(project_name)
+    finally:
+        regenerated = flush_url_batch()
+        save_index(abs_project_base_dir)
+    for project_name in projects:
+        create_shortcut_scripts(project_name)
+    print(f"Applied {len(entries)} entries across {len(projects)} project(s), "
+          f"regenerated URLs for {regenerated} app(s) in {time.time() - start:.2f}s.")
+
+
+def run_index_command(command, project_name=None):
+    """Answer list/tree/stats from the project index, or rebuild it for reindex."""
+    if command == "reindex":
+        start = time.time()
+        rebuild_index(abs_project_base_dir)
+        stats = index_stats(abs_project_base_dir)
+        print(f"Indexed {stats['projects']} project(s), {stats['apps']} app(s), {stats['modules']} module(s) "
+              f"in '{PROJECT_BASE_DIR}' in {time.time() - start:.2f}s.")
+    elif command == "list":
+        projects = index_list_projects(abs_project_base_dir)
+        print(f"Total Django projects in '{PROJECT_BASE_DIR}': {len(projects)}")
+        for name in projects:
+            print(name)
+    elif command == "tree":
+        for line in index_tree(abs_project_base_dir, project_name):
+            print(line)
+    elif command == "stats":
+        for key, value in index_stats(abs_project_base_dir).items():
+            print(f"{key}: {value}")
+    # an index missing on first use is rebuilt in memory; persist it
+    save_index(abs_project_base_dir)
+
+
+######################################################################################################################
+def delete_django_project(project_name, background_gc=True):
+    """Delete an existing Django project by moving it to the trash; space is reclaimed in the background."""
+    project_path = os.path.join(abs_project_base_dir, project_name)
+
+    if project_name and not project_name.startswith(".") and os.path.isdir(project_path):
+        trashed_path = move_to_trash(abs_project_base_dir, project_path)
+        index_remove_project(abs_project_base_dir, project_name)
+        if trashed_path is not None and background_gc:
+            start_background_gc(abs_project_base_dir)
         print(f"Django project '{project_name}' deleted successfully.")
     else:
         print(f"Error: Django project '{project_name}' does not exist.")
@@ -137,13 +236,28 @@ def delete_django_project(project_name):
 
   
 #######################################################################################################################
-if __name__ == "__main__":
-    if len(sys.argv) < 3:
+def main(argv=None):
+    """Command-line entry point; argv defaults to sys.argv (the resident daemon passes its own)."""
+    argv = sys.argv if argv is None else argv
+    if len(argv) >= 2 and argv[1] == "gc":
+        collect_trash(abs_project_base_dir)
+        sys.exit(0)
+    if len(argv) >= 2 and argv[1] in ("list", "tree", "stats", "reindex"):
+        run_index_command(argv[1], argv[2] if len(argv) > 2 else None)
+        sys.exit(0)
+    if len(argv) < 3:
         print("Usage: python django_project_mgmt.py <create|delete> <project_name>[.app_name[.mod_name]]")
+        print("       python django_project_mgmt.py apply <manifest.(ini|json)>")
+        print("       python django_project_mgmt.py <list|tree|stats|reindex> [project_name]")
+        print("       python django_project_mgmt.py gc")
         sys.exit(1)
 
-    command = sys.argv[1]
-    project_input = sys.argv[2]
+    command = argv[1]
+    project_input = argv[2]
+    if command == "apply":
+        apply_manifest(project_input)
+        sys.exit(0)
+
     input_parts = project_input.split(".")
     length_input_parts = len(input_parts)
 
@@ -166,35 +280,47 @@ if __name__ == "__main__":
 
     # Execute based on the detected type
     if command == "create":
-        if length_input_parts == 1:
-            #print(f"Creating Django project '{project_name}'")
-            create_django_project(project_name, PROJECT_BASE_DIR)
-        elif length_input_parts == 2:
-            #print(f"Creating Django app '{app_name}' inside project '{project_name}'")
-            create_django_app(project_name, app_name, PROJECT_BASE_DIR)
-        elif length_input_parts == 3:
-            #print(f"Creating module '{mod_name}' inside app '{app_name}' in project '{project_name}'")
-            std_app_name = f"{APP_PREFIX}_{app_name}"
-            std_mod_name = f"{MOD_PREFIX}_{mod_name}"
-            def_mod_name = f"{MOD_PREFIX}_app"
-            if os.path.exists(os.path.join(PROJECT_BASE_DIR, project_name, std_app_name, std_mod_name)):
-                print(f"Warning: Module '{mod_name}' already exists in app '{app_name}' in project '{project_name}'.", file=sys.stderr)
-                sys.exit(1)
+        # URL files of every app touched by this command are written once, at the end
+        begin_url_batch()
+        try:
+            if length_input_parts == 1:
+                #print(f"Creating Django project '{project_name}'")
+                create_django_project(project_name, PROJECT_BASE_DIR)
+            elif length_input_parts == 2:
+                #print(f"Creating Django app '{app_name}' inside project '{project_name}'")
+                create_django_app(project_name, app_name, PROJECT_BASE_DIR)
+            elif length_input_parts == 3:
+                #print(f"Creating module '{mod_name}' inside app '{app_name}' in project '{project_name}'")
+                std_app_name = f"{APP_PREFIX}_{app_name}"
+                std_mod_name = f"{MOD_PREFIX}_{mod_name}"
+                def_mod_name = f"{MOD_PREFIX}_app"
+                if os.path.exists(os.path.join(PROJECT_BASE_DIR, project_name, std_app_name, std_mod_name)):
+                    print(f"Warning: Module '{mod_name}' already exists in app '{app_name}' in project '{project_name}'.", file=sys.stderr)
+                    sys.exit(1)
             
-            create_custom_module(project_name, app_name, mod_name, PROJECT_BASE_DIR)
+                create_custom_module(project_name, app_name, mod_name, PROJECT_BASE_DIR)
+        finally:
+            flush_url_batch()
+            save_index(abs_project_base_dir)
+        create_shortcut_scripts(project_name)
 
     elif command == "delete":
         if length_input_parts == 1:
             print(f"Deleting Django project '{project_name}'")
             delete_django_project(project_name)
+            save_index(abs_project_base_dir)
         else:
             print("Error: Deletion is only supported for full projects, not apps or modules.", file=sys.stderr)
             sys.exit(1)
     else:
-        print("Invalid command. Use: create, delete.", file=sys.stderr)
+        print("Invalid command. Use: create, delete, apply.", file=sys.stderr)
         sys.exit(1)
 
 
+if __name__ == "__main__":
+    main()
+
+
 ############################################################ DEBUG ##################################################
 # def create_mod(project_name, app_name, mod_name, base_dir):
 #     """Create a new module in an existing Django app."""
@@ -1,6 +1,86 @@
 import os
+import ast
+import hashlib
 import argparse
 
+from discovery import find_settings_package, scan_app_modules
+from utils import compile_placeholders, substitute_placeholders
+
+# generate_urls() and generate_aggregators() mark an app as dirty while a
+# batch is open; the files of each dirty app are rendered once in
+# flush_url_batch(). Writes are skipped when the rendered content matches the
+# stored hash, so unchanged files keep their mtime and don't trigger a
+# runserver autoreload.
+CONTENT_HASH_SUFFIX = ".sha256"
+PREFIX_ROUTER_MODULE = "prefix_router"
+# mod_app/all_<kind>_imports.py aggregates the mod_*/<source prefix>_*.py files
+AGGREGATOR_SOURCES = {"model": "models", "view": "views", "form": "forms"}
+AGGREGATOR_TEMPLATE = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "template", "project", "lazy_aggregator.py"))
+# initial urls_<mod>.py: an include() of a module without urlpatterns raises on resolve
+EMPTY_MODULE_URLS = "from django.urls import path\n\nurlpatterns = [\n]\n"
+_dirty_url_apps = None
+_dirty_aggregator_apps = None
+
+
+def begin_url_batch():
+    """Start collecting generate_urls()/generate_aggregators() calls instead of writing immediately."""
+    global _dirty_url_apps, _dirty_aggregator_apps
+    if _dirty_url_apps is None:
+        _dirty_url_apps = {}
+        _dirty_aggregator_apps = {}
+
+
+def flush_url_batch():
+    """Regenerate the URL file and aggregators of every app marked dirty since begin_url_batch()."""
+    global _dirty_url_apps, _dirty_aggregator_apps
+    dirty, _dirty_url_apps = _dirty_url_apps or {}, None
+    dirty_aggregators, _dirty_aggregator_apps = _dirty_aggregator_apps or {}, None
+    for (app_directory, urls_app_filename) in dirty:
+        generate_urls(app_directory, urls_app_filename)
+    for app_directory in dirty_aggregators:
+        generate_aggregators(app_directory)
+    return len(dirty)
+
+
+def write_file_if_changed(file_path, content):
+    """
+    Write content to file_path unless it already holds exactly that content.
+
+    A `.<name>.sha256` sidecar stores the content hash together with the size
+    and mtime of the file it was computed for; when those still match the file
+    is known to be current without reading it. Returns True if it was written.
+    """
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    directory, filename = os.path.split(file_path)
+    hash_path = os.path.join(directory, f".{filename}{CONTENT_HASH_SUFFIX}")
+
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        stat = None
+    if stat is not None:
+        stamp = f"{digest} {stat.st_size} {stat.st_mtime_ns}"
+        try:
+            with open(hash_path, "r") as f:
+                if f.read().strip() == stamp:
+                    return False
+        except FileNotFoundError:
+            pass
+        # No (or stale) stamp: fall back to comparing the actual bytes
+        with open(file_path, "r", encoding="utf-8") as f:
+            unchanged = f.read() == content
+        if unchanged:
+            with open(hash_path, "w") as f:
+                f.write(stamp)
+            return False
+
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    stat = os.stat(file_path)
+    with open(hash_path, "w") as f:
+        f.write(f"{digest} {stat.st_size} {stat.st_mtime_ns}")
+    return True
+
 
 def generate_app_urls(app_name, url_name, base_dir):
     """Automatically create `app_urls.py` inside each app."""
@@ -22,35 +102,124 @@ urlpatterns = [
         print(f"⚠️ {urls_file} already exists, skipping.")
 
 
+def find_prefix_router(app_directory):
+    """
+    Return the dotted prefix_router module of the app's project, or None.
+
+    `./django build-urls <project> --router` installs prefix_router.py in the
+    settings package; once it is there every urls_app.py is generated with it.
+    """
+    project_path = os.path.dirname(os.path.abspath(app_directory))
+    settings_package = find_settings_package(project_path)
+    if settings_package and os.path.isfile(os.path.join(project_path, settings_package, f"{PREFIX_ROUTER_MODULE}.py")):
+        return f"{settings_package}.{PREFIX_ROUTER_MODULE}"
+    return None
+
+
+def render_urls_app(app_directory, router_module=None):
+    """
+    Return the contents of `mod_app/urls_app.py` for the mod_* packages of an app.
+
+    With router_module set the patterns are wrapped in dispatch_patterns() so the
+    module is picked by a dict lookup on the path segment.
+    """
+    lines = ["from django.urls import include, path\n"]
+    if router_module:
+        lines.append(f"from {router_module} import dispatch_patterns\n")
+    lines.append("\nurlpatterns = dispatch_patterns([\n" if router_module else "\nurlpatterns = [\n")
+
+    # scan_app_modules() returns the modules sorted, so the output (and its hash) is stable
+    for module in scan_app_modules(app_directory):
+        if module.urls_module:
+            lines.append(f"    path('{module.short_name}/', include('{module.urls_module}')),\n")
+        else:
+            print(f"urls_module_path does not exist: {os.path.join(module.path, f'urls_{module.short_name}.py')}")
+
+    lines.append("])\n" if router_module else "]\n")
+    return "".join(lines)
+
+
 def generate_urls(app_directory, urls_app_filename):
     # Ensure the app directory path is absolute
     app_directory = os.path.abspath(app_directory)
-    # Extract the app name from the absolute path
-    app_name = os.path.basename(app_directory)
+    if _dirty_url_apps is not None:
+        # deferred: rendered once per app in flush_url_batch()
+        _dirty_url_apps[(app_directory, urls_app_filename)] = True
+        return False
     # Path to the file that will include all module URLs
     urls_file_path = os.path.join(app_directory, 'mod_app' , f"{urls_app_filename}.py")
-    
-    with open(urls_file_path, 'w') as urls_file:
-        urls_file.write("from django.urls import include, path\n\n")
-        urls_file.write("urlpatterns = [\n")
-        
-        for entry in os.listdir(app_directory):
-            entry_path = os.path.join(app_directory, entry)
-            #print(f"Processing entry: {entry_path}")
-            # Check if the entry is a directory and starts with 'mod_' but is not 'mod_app'
-            if os.path.isdir(entry_path) and entry.startswith('mod_') and entry != 'mod_app':
-                urls_module = f'urls_{entry[4:]}'
-                urls_module_path = os.path.join(entry_path, f'{urls_module}.py')
-                #print(f">>> === Found module: {urls_module_path} ===")
-                if os.path.exists(urls_module_path):
-                    urls_file.write(f"    path('{entry[4:]}/', include('{app_name}.{entry}.{urls_module}')),\n")
-                else:
-                    print(f"urls_module_path does not exist: {urls_module_path}")
-        
-        urls_file.write("]\n")
-
-    #print(f"{urls_file_path} generated successfully.")
-    ##print(f"URLs generated successfully.")
+    return write_file_if_changed(urls_file_path, render_urls_app(app_directory, find_prefix_router(app_directory)))
+
+def module_public_names(file_path):
+    """
+    Public names a module defines, without importing it.
+
+    A literal __all__ wins; otherwise top-level classes, functions and
+    assignments not starting with '_' (imported names are not re-exported).
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=file_path)
+    names = []
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(isinstance(t, ast.Name) and t.id == "__all__" for t in node.targets):
+            try:
+                return [str(name) for name in ast.literal_eval(node.value)]
+            except ValueError:
+                pass
+        if isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            names.append(node.name)
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            names.extend(t.id for t in targets if isinstance(t, ast.Name))
+    return [name for name in names if not name.startswith("_")]
+
+
+def render_aggregator(app_directory, kind):
+    """
+    Return the contents of mod_app/all_<kind>_imports.py for an app.
+
+    The name -> module map is computed here, so the generated module never has
+    to import a file to find out what it defines. When two files define the
+    same name the first module (by name) wins.
+    """
+    source_prefix = AGGREGATOR_SOURCES[kind]
+    name_map = {}
+    for module in scan_app_modules(app_directory):
+        for file_name in sorted(module.files):
+            if not (file_name.startswith(f"{source_prefix}_") and file_name.endswith(".py")):
+                continue
+            dotted = f"{module.app_name}.{module.name}.{file_name[:-3]}"
+            try:
+                names = module_public_names(os.path.join(module.path, file_name))
+            except SyntaxError as e:
+                print(f"Skipping {dotted} in all_{kind}_imports.py: {e}")
+                continue
+            for name in names:
+                name_map.setdefault(name, dotted)
+
+    with open(AGGREGATOR_TEMPLATE, "r", encoding="utf-8") as f:
+        template = f.read()
+    content, _ = substitute_placeholders(template, compile_placeholders({
+        "__APP_NAME__": os.path.basename(os.path.abspath(app_directory)),
+        "__SOURCE_PREFIX__": source_prefix,
+        "__KIND__": kind,
+        "__NAME_MAP__": "".join(f'    "{name}": "{dotted}",\n' for name, dotted in sorted(name_map.items())),
+    }))
+    return content
+
+
+def generate_aggregators(app_directory):
+    """Write mod_app/all_{model,view,form}_imports.py for an app. Returns how many changed."""
+    app_directory = os.path.abspath(app_directory)
+    if _dirty_aggregator_apps is not None:
+        _dirty_aggregator_apps[app_directory] = True
+        return 0
+    mod_app_directory = os.path.join(app_directory, "mod_app")
+    if not os.path.isdir(mod_app_directory):
+        return 0
+    return sum(write_file_if_changed(os.path.join(mod_app_directory, f"all_{kind}_imports.py"), render_aggregator(app_directory, kind))
+               for kind in AGGREGATOR_SOURCES)
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Generate a Django URLs file that includes URLs from mod_<modname> directories.')
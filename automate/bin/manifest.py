@@ -0,0 +1,91 @@
+import os
+import re
+import json
+import configparser
+
+# Manifest files describe many `project.app.mod` entries so they can be
+# created in a single process with `./django apply <manifest>`.
+#
+# JSON, either a flat list or a nested mapping:
+#   ["blog", "blog.posts", "blog.posts.comments", "shop.cart.items"]
+#   {"blog": {"posts": ["comments", "tags"], "users": []}, "shop": {}}
+#
+# INI, one section per project, one key per app, modules as the value:
+#   [blog]
+#   posts = comments, tags
+#   users =
+#
+# Functions in this manifest.py file:
+# load_manifest(manifest_path)
+# parse_manifest_entries(data)
+# dedupe_entries(entries)
+
+MANIFEST_SEPARATOR_RE = re.compile(r"[\s,]+")
+
+
+def _split_names(value):
+    """Split a comma/whitespace separated string (or pass a list through)."""
+    if isinstance(value, str):
+        return [name for name in MANIFEST_SEPARATOR_RE.split(value) if name]
+    return [str(name) for name in value or []]
+
+
+def parse_manifest_entries(data):
+    """Turn a decoded manifest (list or nested dict) into dotted entry strings."""
+    entries = []
+    if isinstance(data, dict):
+        if "entries" in data and len(data) == 1:
+            return parse_manifest_entries(data["entries"])
+        for project_name, apps in data.items():
+            entries.append(project_name)
+            if isinstance(apps, dict):
+                for app_name, mods in apps.items():
+                    entries.append(f"{project_name}.{app_name}")
+                    entries.extend(f"{project_name}.{app_name}.{mod}" for mod in _split_names(mods))
+            else:
+                entries.extend(f"{project_name}.{app_name}" for app_name in _split_names(apps))
+    elif isinstance(data, (list, tuple)):
+        for item in data:
+            entries.extend(_split_names(item) if isinstance(item, str) else parse_manifest_entries(item))
+    else:
+        raise ValueError(f"Unsupported manifest structure: {type(data).__name__}")
+    return entries
+
+
+def dedupe_entries(entries):
+    """
+    Validate and dedupe dotted entries, keeping first-seen order.
+
+    Returns a list of (project_name, app_name, mod_name) tuples where app_name
+    and mod_name may be None.
+    """
+    seen = set()
+    result = []
+    for entry in entries:
+        parts = entry.strip().split(".")
+        if not 1 <= len(parts) <= 3 or not all(parts):
+            raise ValueError(f"Invalid manifest entry '{entry}'. Use 'project', 'project.app', or 'project.app.module'.")
+        key = tuple(parts) + (None,) * (3 - len(parts))
+        if key not in seen:
+            seen.add(key)
+            result.append(key)
+    return result
+
+
+def load_manifest(manifest_path):
+    """Read a .json or .ini manifest and return deduped (project, app, mod) tuples."""
+    if not os.path.isfile(manifest_path):
+        raise FileNotFoundError(f"Manifest '{manifest_path}' does not exist.")
+
+    if manifest_path.endswith(".json"):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    elif manifest_path.endswith((".ini", ".cfg")):
+        parser = configparser.ConfigParser(allow_no_value=True)
+        parser.optionxform = str  # keep app names as written
+        parser.read(manifest_path, encoding="utf-8")
+        data = {section: {app: value or "" for app, value in parser.items(section)} for section in parser.sections()}
+    else:
+        raise ValueError(f"Unsupported manifest type '{manifest_path}'. Use .json or .ini.")
+
+    return dedupe_entries(parse_manifest_entries(data))
@@ -0,0 +1,132 @@
+import os
+import re
+import sys
+import glob
+import argparse
+
+from discovery import find_settings_package
+from generate_urls import write_file_if_changed
+from utils import compile_placeholders, substitute_placeholders
+
+# Per-module request metrics for generated projects. install_module_metrics()
+# puts module_metrics.py (the instrumentation middleware and its Prometheus
+# text export) into the settings package and hooks it into settings.py; new
+# projects get it when they are created. `./django metrics <project>` adds it
+# to an existing project, or with --show sums up the metrics files the
+# project's processes wrote, slowest module first. Running processes fold the
+# files of finished ones (recycled workers, earlier runs) into
+# module_metrics.retired.prom, which --show reads too, so the totals cover
+# every process that wrote its metrics. The /-/metrics HTTP endpoint
+# is off unless MODULE_METRICS_PATH is set in settings.py; it must not be
+# served through a reverse proxy (see module_metrics.py).
+#
+# Functions in this metrics.py file:
+# install_module_metrics(project_path)
+# read_metrics_files(paths)
+# summarize_module_metrics(samples)
+
+PROJECT_TEMPLATE_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "template", "project"))
+MODULE_METRICS_TEMPLATE = os.path.join(PROJECT_TEMPLATE_DIR, "module_metrics.py")
+DEFAULT_METRICS_FILE = os.path.join(".metrics", "module_metrics.prom")
+SETTINGS_HOOK = ("\n\n# Added by the project generator: per-module latency/query metrics (module_metrics.py)\n"
+                 "from .module_metrics import apply_module_metrics\n"
+                 "apply_module_metrics(globals())\n")
+SAMPLE_RE = re.compile(r'^(?P<name>[a-z_]+)\{(?P<labels>[^}]*)\} (?P<value>\S+)$')
+LABEL_RE = re.compile(r'(\w+)="([^"]*)"')
+
+
+def install_module_metrics(project_path):
+    """Write module_metrics.py into the settings package and hook it into settings.py (once). Returns True if anything changed."""
+    settings_package = find_settings_package(project_path)
+    if settings_package is None:
+        raise FileNotFoundError(f"No settings package found in '{project_path}'.")
+    with open(MODULE_METRICS_TEMPLATE, "r", encoding="utf-8") as f:
+        template = f.read()
+    content, _ = substitute_placeholders(template, compile_placeholders({
+        "__PROJECT_NAME__": os.path.basename(os.path.abspath(project_path)),
+        "__SETTINGS_PACKAGE__": settings_package,
+    }))
+    changed = write_file_if_changed(os.path.join(project_path, settings_package, "module_metrics.py"), content)
+
+    settings_file = os.path.join(project_path, settings_package, "settings.py")
+    with open(settings_file, "r", encoding="utf-8") as f:
+        settings_source = f.read()
+    if "apply_module_metrics(globals())" not in settings_source:
+        with open(settings_file, "a", encoding="utf-8") as f:
+            f.write(SETTINGS_HOOK)
+        changed = True
+    return changed
+
+
+def read_metrics_files(paths):
+    """[(metric name, {label: value}, value)] from Prometheus text files written by module_metrics.py."""
+    samples = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                match = SAMPLE_RE.match(line.strip())
+                if match:
+                    samples.append((match.group("name"), dict(LABEL_RE.findall(match.group("labels"))),
+                                    float(match.group("value"))))
+    return samples
+
+
+def summarize_module_metrics(samples):
+    """Totals per (app, module) over every process: requests, errors, latency, queries and bytes, slowest first."""
+    modules = {}
+    for name, labels, value in samples:
+        key = (labels.get("app", ""), labels.get("module", ""))
+        row = modules.setdefault(key, {"requests": 0, "errors": 0, "seconds": 0.0, "queries": 0,
+                                       "query_seconds": 0.0, "bytes": 0.0, "sized": 0})
+        if name == "django_module_requests_total":
+            row["requests"] += value
+            if labels.get("status") == "5xx":
+                row["errors"] += value
+        elif name == "django_module_request_duration_seconds_sum":
+            row["seconds"] += value
+        elif name == "django_module_db_queries_total":
+            row["queries"] += value
+        elif name == "django_module_db_query_duration_seconds_total":
+            row["query_seconds"] += value
+        elif name == "django_module_response_size_bytes_sum":
+            row["bytes"] += value
+        elif name == "django_module_response_size_bytes_count":
+            row["sized"] += value
+    return sorted(modules.items(), key=lambda item: -item[1]["seconds"])
+
+
+def _print_summary(rows, files):
+    print(f"Module metrics from {files} file(s), by total time spent")
+    print(f"{'app':<20}{'module':<20}{'requests':>10}{'5xx':>6}{'total s':>10}{'mean ms':>10}"
+          f"{'queries/req':>13}{'db ms/req':>11}{'mean KiB':>10}")
+    for (app, module), row in rows:
+        requests = row["requests"] or 1
+        print(f"{app:<20}{module or '-':<20}{row['requests']:>10.0f}{row['errors']:>6.0f}{row['seconds']:>10.2f}"
+              f"{row['seconds'] / requests * 1000:>10.1f}{row['queries'] / requests:>13.1f}"
+              f"{row['query_seconds'] / requests * 1000:>11.1f}{row['bytes'] / (row['sized'] or 1) / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Install or read the per-module request metrics of a project.')
+    parser.add_argument('project_path', help='The directory of the Django project (the one holding manage.py)')
+    parser.add_argument('--show', action='store_true', help='Summarize the metrics files instead of installing')
+    parser.add_argument('--file', help=f'MODULE_METRICS_FILE of the project if changed in settings.py (default <project>/{DEFAULT_METRICS_FILE})')
+
+    args = parser.parse_args()
+    if not os.path.isfile(os.path.join(args.project_path, "manage.py")):
+        print(f"METRICS-Error: Django project '{args.project_path}' does not exist.")
+        sys.exit(1)
+    if args.show:
+        root, ext = os.path.splitext(args.file or os.path.join(args.project_path, DEFAULT_METRICS_FILE))
+        files = sorted(glob.glob(f"{root}.*{ext}"))  # the live <pid> files and the retired one
+        if not files:
+            print(f"METRICS-Error: no metrics files matching {root}.<pid>{ext} yet.")
+            sys.exit(1)
+        _print_summary(summarize_module_metrics(read_metrics_files(files)), len(files))
+        sys.exit(0)
+    try:
+        changed = install_module_metrics(args.project_path)
+    except OSError as e:
+        print(f"METRICS-Error: {e}")
+        sys.exit(1)
+    print("Module metrics middleware installed." if changed else "Module metrics middleware already up to date.")
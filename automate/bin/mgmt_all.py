@@ -0,0 +1,128 @@
+import os
+import sys
+import json
+import time
+import shlex
+import fnmatch
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from project_index import index_list_projects
+
+# Fan-out of a management command over every project under PROJECT_BASE_DIR.
+# Projects come from the project index; each one runs `manage.py <cmd>` (or a
+# single-boot command list, see boot.py) in its own interpreter, at most
+# --jobs at a time, and the results are collected into one summary.
+#
+# Functions in this mgmt_all.py file:
+# select_projects(base_dir, include=(), exclude=())
+# run_in_project(project_path, command, python_exe, timeout=None)
+# run_in_all_projects(base_dir, command, include=(), exclude=(), jobs=None, python_exe=sys.executable, timeout=None, verbose=True)
+
+BOOT_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "boot.py")
+
+
+def select_projects(base_dir, include=(), exclude=()):
+    """Indexed projects that have a manage.py, filtered by fnmatch include/exclude patterns."""
+    selected = []
+    for name in index_list_projects(base_dir):
+        if include and not any(fnmatch.fnmatch(name, pattern) for pattern in include):
+            continue
+        if any(fnmatch.fnmatch(name, pattern) for pattern in exclude):
+            continue
+        if os.path.isfile(os.path.join(base_dir, name, "manage.py")):
+            selected.append(name)
+    return selected
+
+
+def run_in_project(project_path, command, python_exe, timeout=None):
+    """Run one command in one project; returns {exit_code, duration, output}."""
+    if ";" in command:
+        argv = [python_exe, BOOT_SCRIPT, project_path, command]
+    else:
+        argv = [python_exe, "manage.py", *shlex.split(command)]
+    env = dict(os.environ)
+    env.pop("DJANGO_SETTINGS_MODULE", None)  # every manage.py sets its own
+    start = time.perf_counter()
+    try:
+        completed = subprocess.run(argv, cwd=project_path, env=env, stdin=subprocess.DEVNULL,
+                                   stdout=subprocess.PIPE, stderr=subprocess.STDOUT, timeout=timeout)
+        exit_code, output = completed.returncode, completed.stdout
+    except subprocess.TimeoutExpired as e:
+        exit_code, output = None, (e.stdout or b"") + f"\n[timed out after {timeout}s]\n".encode("utf-8")
+    except OSError as e:
+        exit_code, output = 127, str(e).encode("utf-8")
+    return {
+        "exit_code": exit_code,
+        "duration": time.perf_counter() - start,
+        "output": output.decode("utf-8", errors="replace"),
+    }
+
+
+def run_in_all_projects(base_dir, command, include=(), exclude=(), jobs=None, python_exe=sys.executable, timeout=None, verbose=True):
+    """
+    Run command in every selected project on a bounded pool.
+
+    Returns {project_name: result} in project order; results are printed as
+    they complete when verbose.
+    """
+    base_dir = os.path.abspath(base_dir)
+    projects = select_projects(base_dir, include, exclude)
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(projects) or 1))
+    if verbose:
+        print(f"Running 'manage.py {command}' in {len(projects)} project(s), {jobs} at a time")
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {executor.submit(run_in_project, os.path.join(base_dir, name), command, python_exe, timeout): name
+                   for name in projects}
+        for done, future in enumerate(as_completed(futures), 1):
+            name = futures[future]
+            results[name] = future.result()
+            if verbose:
+                status = "ok" if results[name]["exit_code"] == 0 else f"FAILED ({results[name]['exit_code']})"
+                print(f"  [{done}/{len(projects)}] {name}: {status} in {results[name]['duration']:.2f}s", flush=True)
+    return {name: results[name] for name in projects}
+
+
+def _print_summary(results, show_output, wall_time):
+    failed = [name for name, result in results.items() if result["exit_code"] != 0]
+    for name, result in results.items():
+        if show_output == "all" or (show_output == "failed" and name in failed):
+            print(f"\n----- {name} (exit {result['exit_code']}) -----")
+            print(result["output"].rstrip())
+    if results:
+        width = max(len("project"), *(len(name) for name in results))
+        print(f"\n{'project'.ljust(width)}  exit   time")
+        for name, result in results.items():
+            print(f"{name.ljust(width)}  {str(result['exit_code']).rjust(4)}  {result['duration']:6.2f}s")
+    busy = sum(result["duration"] for result in results.values())
+    print(f"\n{len(results) - len(failed)} ok, {len(failed)} failed; {wall_time:.2f}s wall, {busy:.2f}s summed")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Run a management command in every project under PROJECT_BASE_DIR.')
+    parser.add_argument('base_dir', help='PROJECT_BASE_DIR')
+    parser.add_argument('command', help='Management command with its options, e.g. "migrate --noinput" or "makemigrations; migrate"')
+    parser.add_argument('--include', action='append', default=[], help='Only projects matching this glob (repeatable)')
+    parser.add_argument('--exclude', action='append', default=[], help='Skip projects matching this glob (repeatable)')
+    parser.add_argument('--jobs', '-j', type=int, default=None, help='Parallel processes (default: CPU count)')
+    parser.add_argument('--timeout', type=float, default=None, help='Per-project timeout in seconds')
+    parser.add_argument('--python', default=sys.executable, help='Interpreter to run manage.py with (default: this one)')
+    parser.add_argument('--show-output', choices=['failed', 'all', 'none'], default='failed', help='Whose output to print (default failed)')
+    parser.add_argument('--output', help='Write the per-project results as JSON to this file')
+
+    args = parser.parse_args()
+    if not os.path.isdir(args.base_dir):
+        print(f"MGMT-ALL-Error: Base directory '{args.base_dir}' does not exist.")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    results = run_in_all_projects(args.base_dir, args.command, args.include, args.exclude,
+                                  args.jobs, args.python, args.timeout)
+    _print_summary(results, args.show_output, time.perf_counter() - start)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"command": args.command, "results": results}, f, indent=1)
+    sys.exit(0 if all(result["exit_code"] == 0 for result in results.values()) else 1)
@@ -0,0 +1,257 @@
+import os
+import json
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from discovery import scan_app_modules, scan_project_apps
+
+# Persistent index of the projects, apps and modules under PROJECT_BASE_DIR,
+# kept in `<PROJECT_BASE_DIR>/.index.json`. create/delete update it, so list,
+# tree and stats can be answered without walking the (possibly network)
+# filesystem. `./django reindex` rebuilds it from disk. Writers hold an
+# flock on `.index.json.lock` and replay their changes onto the file as it is
+# at that moment, so concurrent creates/deletes don't overwrite each other.
+#
+# Functions in this project_index.py file:
+# load_index(base_dir)
+# save_index(base_dir)
+# index_add_project(base_dir, project_name)
+# index_add_app(base_dir, project_name, app_name)
+# index_add_module(base_dir, project_name, app_name, mod_name)
+# index_remove_project(base_dir, project_name)
+# rebuild_index(base_dir)
+# index_list_projects(base_dir)
+# index_tree(base_dir, project_name=None)
+# index_stats(base_dir)
+
+INDEX_FILE_NAME = ".index.json"
+INDEX_LOCK_NAME = ".index.json.lock"
+INDEX_VERSION = 1
+
+# base_dir -> [index dict, dirty flag, (mtime_ns, inode) of the file it was read from,
+# changes not saved yet]; changes are written by save_index()
+_loaded_indexes = {}
+# a pending change that makes save_index() write the in-memory index as is
+REPLACE = ("replace",)
+
+
+def _index_path(base_dir):
+    return os.path.join(os.path.abspath(base_dir), INDEX_FILE_NAME)
+
+
+def _index_mtime(base_dir):
+    # every save replaces the file, so the inode tells writes apart even within one mtime tick
+    try:
+        st = os.stat(_index_path(base_dir))
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_ino
+
+
+class _IndexLock:
+    """Exclusive flock on the index's sidecar lock file, for a read-merge-write of .index.json."""
+
+    def __init__(self, base_dir):
+        self.path = os.path.join(base_dir, INDEX_LOCK_NAME)
+        self.file = None
+
+    def __enter__(self):
+        self.file = open(self.path, "a")
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.file.close()  # releases the flock
+        return False
+
+
+def _read_index_file(base_dir):
+    try:
+        with open(_index_path(base_dir), "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    return index if index.get("version") == INDEX_VERSION else None
+
+
+def _empty_index():
+    return {"version": INDEX_VERSION, "updated": None, "projects": {}}
+
+
+def load_index(base_dir):
+    """
+    Return the in-memory index for base_dir, reading (or rebuilding) it on first use.
+
+    A clean in-memory copy is re-read if the file changed underneath it, so a
+    long-lived process (the daemon) sees writes made by other processes.
+    """
+    key = os.path.abspath(base_dir)
+    entry = _loaded_indexes.get(key)
+    if entry is not None and not entry[1] and entry[2] != _index_mtime(key):
+        entry = None
+    if entry is None:
+        mtime = _index_mtime(key)
+        index = _read_index_file(key)
+        if index is None:
+            _loaded_indexes[key] = [_scan_base_dir(key), True, mtime, [REPLACE]]
+        else:
+            _loaded_indexes[key] = [index, False, mtime, []]
+    return _loaded_indexes[key][0]
+
+
+def save_index(base_dir, force=False):
+    """
+    Write the index back if it changed. Returns True if it was written.
+
+    Under the index lock: if another process wrote the file since it was
+    read, this process's changes are replayed onto that version first.
+    """
+    key = os.path.abspath(base_dir)
+    entry = _loaded_indexes.get(key)
+    if entry is None or not (entry[1] or force):
+        return False
+    if not os.path.isdir(key):
+        return False
+    with _IndexLock(key):
+        if REPLACE not in entry[3] and entry[2] != _index_mtime(key):
+            index = _read_index_file(key)
+            if index is not None:
+                for change in entry[3]:
+                    _apply_change(index, change)
+                entry[0] = index
+        index = entry[0]
+        index["updated"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+        tmp_path = _index_path(key) + f".{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, _index_path(key))  # atomic, readers never see a partial file
+        entry[1] = False
+        entry[2] = _index_mtime(key)
+        entry[3] = []
+    return True
+
+
+def _apply_change(index, change):
+    """Apply one recorded change to an index dict. Returns True if it modified it."""
+    projects = index["projects"]
+    kind, project_name = change[0], change[1]
+    if kind == "remove_project":
+        return projects.pop(project_name, None) is not None
+    changed = project_name not in projects
+    project = projects.setdefault(project_name, {"created": change[-1] if kind == "add_project" else None, "apps": {}})
+    if kind == "add_project":
+        return changed
+    app_name = change[2]
+    if app_name not in project["apps"]:
+        project["apps"][app_name] = {"created": change[3] if kind == "add_app" else None, "modules": []}
+        changed = True
+    if kind == "add_module" and change[3] not in project["apps"][app_name]["modules"]:
+        project["apps"][app_name]["modules"].append(change[3])
+        project["apps"][app_name]["modules"].sort()
+        changed = True
+    return changed
+
+
+def _record_change(base_dir, change):
+    """Apply a change to the in-memory index and remember it for save_index()."""
+    index = load_index(base_dir)
+    if _apply_change(index, change):
+        entry = _loaded_indexes[os.path.abspath(base_dir)]
+        entry[1] = True
+        entry[3].append(change)
+
+
+def index_add_project(base_dir, project_name):
+    _record_change(base_dir, ("add_project", project_name, time.strftime("%Y-%m-%dT%H:%M:%S")))
+    return load_index(base_dir)["projects"][project_name]
+
+
+def index_add_app(base_dir, project_name, app_name):
+    index_add_project(base_dir, project_name)
+    _record_change(base_dir, ("add_app", project_name, app_name, time.strftime("%Y-%m-%dT%H:%M:%S")))
+    return load_index(base_dir)["projects"][project_name]["apps"][app_name]
+
+
+def index_add_module(base_dir, project_name, app_name, mod_name):
+    index_add_app(base_dir, project_name, app_name)
+    _record_change(base_dir, ("add_module", project_name, app_name, mod_name))
+
+
+def index_remove_project(base_dir, project_name):
+    _record_change(base_dir, ("remove_project", project_name))
+
+
+def _scan_base_dir(base_dir):
+    """Build an index by walking base_dir (the slow path reindex exists for)."""
+    index = _empty_index()
+    if not os.path.isdir(base_dir):
+        return index
+    for project_entry in os.scandir(base_dir):
+        if project_entry.name.startswith(".") or not project_entry.is_dir():
+            continue
+        apps = {}
+        for app_name in scan_project_apps(project_entry.path):
+            modules = [m.name for m in scan_app_modules(os.path.join(project_entry.path, app_name), include_default=True)]
+            apps[app_name] = {"created": None, "modules": modules}
+        index["projects"][project_entry.name] = {"created": None, "apps": apps}
+    return index
+
+
+def rebuild_index(base_dir):
+    """Rescan base_dir, replace the stored index and return it."""
+    key = os.path.abspath(base_dir)
+    previous = load_index(key)["projects"]
+    index = _scan_base_dir(key)
+    # keep creation times recorded by create; a scan can't recover them
+    for project_name, project in index["projects"].items():
+        old_project = previous.get(project_name, {})
+        project["created"] = old_project.get("created")
+        for app_name, app in project["apps"].items():
+            app["created"] = old_project.get("apps", {}).get(app_name, {}).get("created")
+    _loaded_indexes[key] = [index, True, None, [REPLACE]]
+    save_index(key)
+    return _loaded_indexes[key][0]
+
+
+def index_list_projects(base_dir):
+    return sorted(load_index(base_dir)["projects"])
+
+
+def index_tree(base_dir, project_name=None):
+    """Return the lines of a project/app/module tree for one or all projects."""
+    projects = load_index(base_dir)["projects"]
+    names = [project_name] if project_name else sorted(projects)
+    lines = []
+    for name in names:
+        if name not in projects:
+            lines.append(f"{name} (not in index)")
+            continue
+        lines.append(name)
+        apps = projects[name]["apps"]
+        for app_index, app_name in enumerate(sorted(apps)):
+            last_app = app_index == len(apps) - 1
+            lines.append(f"{'└── ' if last_app else '├── '}{app_name}")
+            modules = apps[app_name]["modules"]
+            for mod_index, mod_name in enumerate(modules):
+                branch = '└── ' if mod_index == len(modules) - 1 else '├── '
+                lines.append(f"{'    ' if last_app else '│   '}{branch}{mod_name}")
+    return lines
+
+
+def index_stats(base_dir):
+    projects = load_index(base_dir)["projects"]
+    app_count = sum(len(p["apps"]) for p in projects.values())
+    mod_count = sum(len(a["modules"]) for p in projects.values() for a in p["apps"].values())
+    largest = max(projects, key=lambda n: len(projects[n]["apps"]), default=None)
+    return {
+        "projects": len(projects),
+        "apps": app_count,
+        "modules": mod_count,
+        "largest_project": largest,
+        "updated": load_index(base_dir).get("updated"),
+    }
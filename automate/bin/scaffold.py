@@ -0,0 +1,175 @@
+import os
+import re
+import shutil
+import secrets
+import subprocess
+import importlib.util
+from importlib import metadata
+
+# In-process replacement for `django-admin startproject` / `manage.py startapp`.
+# Renders the same trees Django would, without booting a new interpreter and
+# importing Django for every project or app we create.
+#
+# Functions in this scaffold.py file:
+# get_django_version()
+# get_docs_version(version)
+# get_random_secret_key()
+# find_scaffold_template_dir(app_or_project)
+# render_scaffold_template(template_dir, top_dir, app_or_project, name, django_version, context_overrides=None)
+# create_project_skeleton(project_name, project_path)
+# create_app_skeleton(app_name, project_path)
+# write_shortcut_scripts(project_path)
+
+SCAFFOLD_TEMPLATE_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "template", "scaffold"))
+BUNDLED_DJANGO_VERSION = "5.1.4"  # version the bundled templates were taken from
+SECRET_KEY_INSECURE_PREFIX = "django-insecure-"
+SECRET_KEY_CHARS = "abcdefghijklmnopqrstuvwxyz0123456789!@#$%^&*(-_=+)"
+TEMPLATE_VARIABLE_RE = re.compile(r"{{ (\w+) }}")
+TEMPLATE_SUFFIXES = ((".py-tpl", ".py"),)
+SKIPPED_TEMPLATE_FILES = (".pyo", ".pyc", ".py.class")
+# manage.py shortcuts placed in every project directory
+SHORTCUT_SCRIPTS = {
+    "m1": "#!/bin/bash\npython manage.py makemigrations\n",
+    "m2": "#!/bin/bash\npython manage.py migrate\n",
+    "m3": "#!/bin/bash\npython manage.py runserver\n",
+    "m123": "#!/bin/bash\n./m1\n./m2\n./m3\n",
+}
+
+
+def get_django_version():
+    """Return the installed Django version without importing Django, or None."""
+    try:
+        return metadata.version("django")
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def get_docs_version(version):
+    """Mirror django.utils.version.get_docs_version() for a version string."""
+    match = re.match(r"^(\d+)\.(\d+)(?:\.\d+)?$", version or "")
+    if not match:
+        # alpha, beta, rc and dev builds all point at the dev docs
+        return "dev"
+    return f"{match.group(1)}.{match.group(2)}"
+
+
+def get_random_secret_key():
+    """Same alphabet and length as django.core.management.utils.get_random_secret_key()."""
+    return SECRET_KEY_INSECURE_PREFIX + "".join(secrets.choice(SECRET_KEY_CHARS) for _ in range(50))
+
+
+def find_scaffold_template_dir(app_or_project):
+    """
+    Locate the `project_template` / `app_template` directory to render.
+
+    The installed Django's own templates are preferred so the output matches
+    `django-admin` exactly; the bundled copy under automate/template/scaffold
+    is used when Django's package directory can't be found.
+    """
+    subdir = f"{app_or_project}_template"
+    spec = importlib.util.find_spec("django")  # locates the package, does not import it
+    if spec is not None and spec.submodule_search_locations:
+        installed_dir = os.path.join(list(spec.submodule_search_locations)[0], "conf", subdir)
+        if os.path.isdir(installed_dir):
+            return installed_dir
+    return os.path.join(SCAFFOLD_TEMPLATE_DIR, subdir)
+
+
+def render_scaffold_template(template_dir, top_dir, app_or_project, name, django_version, context_overrides=None):
+    """
+    Render a Django project/app template tree into top_dir.
+
+    Follows TemplateCommand.handle(): `<app_or_project>_name` is replaced in
+    paths, `.py-tpl` files become `.py`, and `{{ var }}` placeholders are
+    filled from the same context django-admin builds. context_overrides
+    replaces individual values (snapshots use it to leave tokens behind).
+    """
+    base_name = f"{app_or_project}_name"
+    context = {
+        base_name: name,
+        f"{app_or_project}_directory": top_dir,
+        f"camel_case_{app_or_project}_name": "".join(x for x in name.title() if x != "_"),
+        "docs_version": get_docs_version(django_version),
+        "django_version": django_version,
+    }
+    if app_or_project == "project":
+        context["secret_key"] = get_random_secret_key()
+    context.update(context_overrides or {})
+
+    umask = os.umask(0)
+    os.umask(umask)
+    prefix_length = len(template_dir) + 1
+    for root, dirs, files in os.walk(template_dir):
+        relative_dir = root[prefix_length:].replace(base_name, name)
+        if relative_dir:
+            os.makedirs(os.path.join(top_dir, relative_dir), exist_ok=True)
+        dirs[:] = [d for d in dirs if not d.startswith(".") and d != "__pycache__"]
+
+        for filename in files:
+            if filename.endswith(SKIPPED_TEMPLATE_FILES):
+                continue
+            old_path = os.path.join(root, filename)
+            new_path = os.path.join(top_dir, relative_dir, filename.replace(base_name, name))
+            for old_suffix, new_suffix in TEMPLATE_SUFFIXES:
+                if new_path.endswith(old_suffix):
+                    new_path = new_path[: -len(old_suffix)] + new_suffix
+                    break
+            if os.path.exists(new_path):
+                raise FileExistsError(f"{new_path} already exists.")
+
+            if new_path.endswith(".py"):
+                with open(old_path, encoding="utf-8") as template_file:
+                    content = template_file.read()
+                content = TEMPLATE_VARIABLE_RE.sub(lambda m: str(context.get(m.group(1), "")), content)
+                with open(new_path, "w", encoding="utf-8") as new_file:
+                    new_file.write(content)
+            else:
+                shutil.copyfile(old_path, new_path)
+            # same permission handling as django-admin: template mode minus umask, always user-writable
+            os.chmod(new_path, (os.stat(old_path).st_mode & ~umask & 0o777) | 0o200)
+
+
+def create_project_skeleton(project_name, project_path):
+    """Render the startproject tree into project_path, falling back to django-admin."""
+    if project_name.isidentifier():
+        django_version = get_django_version() or BUNDLED_DJANGO_VERSION
+        template_dir = find_scaffold_template_dir("project")
+        rendered = [os.path.join(project_path, "manage.py"), os.path.join(project_path, project_name)]
+        rendered = [path for path in rendered if not os.path.lexists(path)]  # never remove what was there before
+        try:
+            render_scaffold_template(template_dir, project_path, "project", project_name, django_version)
+            return
+        except OSError as e:
+            print(f"Scaffold render failed ({e}), falling back to django-admin.")
+            # startproject refuses to write over a partial render
+            for path in rendered:
+                if os.path.isdir(path) and not os.path.islink(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                elif os.path.lexists(path):
+                    os.remove(path)
+    subprocess.run(["django-admin", "startproject", project_name, project_path])
+
+
+def create_app_skeleton(app_name, project_path):
+    """Render the startapp tree into project_path/app_name, falling back to manage.py."""
+    app_path = os.path.join(project_path, app_name)
+    if app_name.isidentifier() and not os.path.exists(app_path):
+        django_version = get_django_version() or BUNDLED_DJANGO_VERSION
+        template_dir = find_scaffold_template_dir("app")
+        try:
+            os.makedirs(app_path)
+            render_scaffold_template(template_dir, app_path, "app", app_name, django_version)
+            return
+        except OSError as e:
+            print(f"Scaffold render failed ({e}), falling back to manage.py startapp.")
+            shutil.rmtree(app_path, ignore_errors=True)
+    subprocess.run(["python", "manage.py", "startapp", app_name], cwd=project_path, check=True)
+
+
+def write_shortcut_scripts(project_path):
+    """Write the m1/m2/m3/m123 shortcuts into project_path (executable)."""
+    for name, content in SHORTCUT_SCRIPTS.items():
+        shortcut_path = os.path.join(project_path, name)
+        with open(shortcut_path, "w") as f:
+            f.write(content)
+        os.chmod(shortcut_path, 0o755)
@@ -0,0 +1,115 @@
+import os
+import sys
+import argparse
+import importlib.util
+
+from discovery import find_settings_package
+from utils import compile_placeholders, substitute_placeholders
+
+# Production-style serving for generated projects: writes a tuned
+# gunicorn.conf.py into the project (preloaded app, gc.freeze() before
+# forking, CPU-sized worker count, worker recycling) and execs gunicorn with
+# it. gunicorn (and uvicorn for --asgi) are optional dependencies; only this
+# command needs them.
+#
+# Functions in this serve.py file:
+# default_worker_count()
+# render_server_config(project_path, workers=None, bind=DEFAULT_BIND, threads=1, max_requests=DEFAULT_MAX_REQUESTS, timeout=DEFAULT_TIMEOUT, asgi=False)
+# write_server_config(project_path, **options)
+# serve_project(project_path, **options)
+
+PROJECT_TEMPLATE_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "template", "project"))
+SERVER_CONFIG_TEMPLATE = os.path.join(PROJECT_TEMPLATE_DIR, "gunicorn_conf.py")
+SERVER_CONFIG_NAME = "gunicorn.conf.py"
+DEFAULT_BIND = "127.0.0.1:8000"
+DEFAULT_MAX_REQUESTS = 1000
+DEFAULT_TIMEOUT = 30
+ASGI_WORKER_CLASS = "uvicorn.workers.UvicornWorker"
+
+
+def default_worker_count():
+    """(2 x usable cores) + 1, the usual starting point for sync workers."""
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+    return 2 * cores + 1
+
+
+def render_server_config(project_path, workers=None, bind=DEFAULT_BIND, threads=1,
+                         max_requests=DEFAULT_MAX_REQUESTS, timeout=DEFAULT_TIMEOUT, asgi=False):
+    """Return gunicorn.conf.py content for the project; workers=None sizes them from the CPU count at start."""
+    project_path = os.path.abspath(project_path)
+    settings_package = find_settings_package(project_path)
+    if settings_package is None:
+        raise FileNotFoundError(f"No settings package found in '{project_path}'.")
+    if asgi:
+        worker_class, app_module = ASGI_WORKER_CLASS, f"{settings_package}.asgi:application"
+    else:
+        worker_class, app_module = ("gthread" if threads > 1 else "sync"), f"{settings_package}.wsgi:application"
+
+    with open(SERVER_CONFIG_TEMPLATE, "r", encoding="utf-8") as f:
+        template = f.read()
+    content, _ = substitute_placeholders(template, compile_placeholders({
+        "__PROJECT_NAME__": os.path.basename(project_path),
+        "__APP_MODULE__": app_module,
+        "__SETTINGS_PACKAGE__": settings_package,
+        "__BIND__": bind,
+        "__WORKERS__": str(workers) if workers else "2 * _cpu_count() + 1",
+        "__WORKER_CLASS__": worker_class,
+        "__THREADS__": str(threads),
+        "__MAX_REQUESTS__": str(max_requests),
+        "__MAX_REQUESTS_JITTER__": str(max(1, max_requests // 10)),
+        "__TIMEOUT__": str(timeout),
+    }))
+    return content
+
+
+def write_server_config(project_path, **options):
+    """Write <project>/gunicorn.conf.py and return its path."""
+    config_path = os.path.join(os.path.abspath(project_path), SERVER_CONFIG_NAME)
+    with open(config_path, "w", encoding="utf-8") as f:
+        f.write(render_server_config(project_path, **options))
+    return config_path
+
+
+def serve_project(project_path, **options):
+    """Write the server config and replace this process with gunicorn. Returns an exit code only on failure."""
+    missing = [name for name in (["gunicorn", "uvicorn"] if options.get("asgi") else ["gunicorn"])
+               if importlib.util.find_spec(name) is None]
+    if missing:
+        print(f"SERVE-Error: {' and '.join(missing)} not installed for {sys.executable} (pip install {' '.join(missing)}).")
+        return 1
+    config_path = write_server_config(project_path, **options)
+    workers = options.get("workers") or default_worker_count()
+    print(f"Serving {os.path.basename(os.path.abspath(project_path))} on {options.get('bind', DEFAULT_BIND)} "
+          f"with {workers} preforked worker(s), config {config_path}", flush=True)
+    os.chdir(os.path.dirname(config_path))
+    os.execv(sys.executable, [sys.executable, "-m", "gunicorn", "--config", config_path])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Serve a generated project with preforked gunicorn workers.')
+    parser.add_argument('project_path', help='The directory of the Django project (the one holding manage.py)')
+    parser.add_argument('--bind', default=DEFAULT_BIND, help=f'Address to listen on (default {DEFAULT_BIND})')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: 2 x cores + 1)')
+    parser.add_argument('--threads', type=int, default=1, help='Threads per worker; >1 uses gthread workers')
+    parser.add_argument('--max-requests', type=int, default=DEFAULT_MAX_REQUESTS, help='Recycle a worker after this many requests (0 disables)')
+    parser.add_argument('--timeout', type=int, default=DEFAULT_TIMEOUT, help='Worker timeout in seconds')
+    parser.add_argument('--asgi', action='store_true', help='Serve the ASGI application with uvicorn workers')
+    parser.add_argument('--config-only', action='store_true', help=f'Write {SERVER_CONFIG_NAME} and exit')
+
+    args = parser.parse_args()
+    if not os.path.isfile(os.path.join(args.project_path, "manage.py")):
+        print(f"SERVE-Error: Django project '{args.project_path}' does not exist.")
+        sys.exit(1)
+    options = dict(workers=args.workers, bind=args.bind, threads=args.threads,
+                   max_requests=args.max_requests, timeout=args.timeout, asgi=args.asgi)
+    try:
+        if args.config_only:
+            print(f"Wrote {write_server_config(args.project_path, **options)}")
+            sys.exit(0)
+        sys.exit(serve_project(args.project_path, **options))
+    except FileNotFoundError as e:
+        print(f"SERVE-Error: {e}")
+        sys.exit(1)
@@ -0,0 +1,104 @@
+import os
+import shutil
+import hashlib
+
+from scaffold import *
+from utils import copy_many, replace_placeholders_in_files
+
+# Cached, versioned project skeletons. The first project created for a given
+# scaffold version + Django version renders the startproject tree (and the
+# shortcut scripts) once into a snapshot directory with tokens in place of
+# the project name and secret key. Every later project is a copy of that
+# snapshot plus one substitution pass.
+#
+# The snapshot key hashes automate/template and config.ini, so editing either
+# invalidates the cache automatically.
+#
+# Functions in this snapshot.py file:
+# snapshot_key(django_version)
+# build_project_snapshot(cache_dir, django_version)
+# create_project_from_snapshot(project_name, project_path, cache_dir)
+
+SCAFFOLD_VERSION = 1  # bump when the snapshot layout or the create steps change
+SNAPSHOT_CACHE_DIR_NAME = os.path.join(".cache", "scaffold")
+SNAPSHOT_PROJECT_TOKEN = "__scaffold_project_name__"
+SNAPSHOT_SECRET_TOKEN = "__scaffold_secret_key__"
+REPO_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+SNAPSHOT_INPUTS = (os.path.join(REPO_DIR, "automate", "template"), os.path.join(REPO_DIR, "config.ini"))
+
+
+def snapshot_key(django_version):
+    """Hash of everything a rendered project skeleton depends on."""
+    digest = hashlib.sha256(f"scaffold-v{SCAFFOLD_VERSION}|django-{django_version}".encode("utf-8"))
+    for input_path in SNAPSHOT_INPUTS:
+        if os.path.isfile(input_path):
+            paths = [input_path]
+        else:
+            paths = sorted(os.path.join(root, f) for root, dirs, files in os.walk(input_path)
+                           for f in files if "__pycache__" not in root)
+        for path in paths:
+            digest.update(os.path.relpath(path, REPO_DIR).encode("utf-8"))
+            with open(path, "rb") as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+    return f"v{SCAFFOLD_VERSION}-django{django_version}-{digest.hexdigest()[:16]}"
+
+
+def build_project_snapshot(cache_dir, django_version):
+    """Return the snapshot directory for this scaffold/Django version, building it if needed."""
+    key = snapshot_key(django_version)
+    snapshot_dir = os.path.join(cache_dir, key)
+    if os.path.isdir(snapshot_dir):
+        return snapshot_dir
+
+    os.makedirs(cache_dir, exist_ok=True)
+    build_dir = os.path.join(cache_dir, f".build-{key}-{os.getpid()}")
+    shutil.rmtree(build_dir, ignore_errors=True)
+    os.makedirs(build_dir)
+    render_scaffold_template(find_scaffold_template_dir("project"), build_dir, "project",
+                             SNAPSHOT_PROJECT_TOKEN, django_version,
+                             {"secret_key": SNAPSHOT_SECRET_TOKEN, "project_directory": ""})
+    write_shortcut_scripts(build_dir)
+    try:
+        os.rename(build_dir, snapshot_dir)  # atomic publish; a concurrent builder may have won
+    except OSError:
+        shutil.rmtree(build_dir, ignore_errors=True)
+        if not os.path.isdir(snapshot_dir):
+            raise
+
+    # snapshots for older templates/config/Django versions can't be used any more
+    for entry in os.listdir(cache_dir):
+        if entry != key and not entry.startswith("."):
+            shutil.rmtree(os.path.join(cache_dir, entry), ignore_errors=True)
+    return snapshot_dir
+
+
+def create_project_from_snapshot(project_name, project_path, cache_dir):
+    """
+    Create the project skeleton in project_path from the cached snapshot.
+
+    Falls back to create_project_skeleton() if the snapshot can't be used.
+    """
+    if not project_name.isidentifier():
+        return create_project_skeleton(project_name, project_path)
+    django_version = get_django_version() or BUNDLED_DJANGO_VERSION
+    try:
+        snapshot_dir = build_project_snapshot(cache_dir, django_version)
+        pairs = []
+        for root, dirs, files in os.walk(snapshot_dir):
+            target_dir = os.path.join(project_path, os.path.relpath(root, snapshot_dir).replace(SNAPSHOT_PROJECT_TOKEN, project_name))
+            os.makedirs(target_dir, exist_ok=True)
+            for filename in files:
+                target_file = os.path.join(target_dir, filename.replace(SNAPSHOT_PROJECT_TOKEN, project_name))
+                if os.path.exists(target_file):
+                    raise FileExistsError(f"{target_file} already exists.")
+                pairs.append((os.path.join(root, filename), target_file))
+        copied, failed = copy_many(pairs, preserve_metadata=False)
+        if failed:
+            raise OSError(f"{failed} file(s) could not be copied from the snapshot")
+        replace_placeholders_in_files(project_path, {
+            SNAPSHOT_PROJECT_TOKEN: project_name,
+            SNAPSHOT_SECRET_TOKEN: get_random_secret_key(),
+        })
+    except OSError as e:
+        print(f"Scaffold snapshot failed ({e}), rendering the project directly.")
+        return create_project_skeleton(project_name, project_path)
@@ -0,0 +1,157 @@
+import os
+import sys
+import time
+import errno
+import shutil
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Instant deletes: a project is renamed into `<PROJECT_BASE_DIR>/.trash` (a
+# single atomic rename on the same filesystem) and the actual rmtree happens
+# later, in a detached background process or via `./django gc`.
+#
+# Functions in this trash.py file:
+# move_to_trash(base_dir, path)
+# start_background_gc(base_dir)
+# collect_trash(base_dir, max_workers=None, verbose=True)
+
+TRASH_DIR_NAME = ".trash"
+GC_LOCK_NAME = ".gc.lock"
+
+
+def _trash_dir(base_dir):
+    return os.path.join(os.path.abspath(base_dir), TRASH_DIR_NAME)
+
+
+def move_to_trash(base_dir, path):
+    """
+    Atomically move path into base_dir/.trash and return its new location.
+
+    Falls back to deleting in place if the rename crosses filesystems.
+    """
+    trash_dir = _trash_dir(base_dir)
+    os.makedirs(trash_dir, exist_ok=True)
+    trashed_path = os.path.join(trash_dir, f"{os.path.basename(os.path.normpath(path))}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}")
+    try:
+        os.rename(path, trashed_path)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.rmtree(path)
+        return None
+    return trashed_path
+
+
+def start_background_gc(base_dir):
+    """Spawn a detached `trash.py gc` so the caller can return immediately."""
+    with open(os.devnull, "wb") as devnull:
+        subprocess.Popen([sys.executable, os.path.abspath(__file__), "gc", os.path.abspath(base_dir), "--quiet"],
+                         stdin=subprocess.DEVNULL, stdout=devnull, stderr=devnull,
+                         start_new_session=True, close_fds=True)
+
+
+def _work_units(trashed_path):
+    """Split a trashed tree into its top-level children so they can be removed in parallel."""
+    if os.path.isdir(trashed_path) and not os.path.islink(trashed_path):
+        with os.scandir(trashed_path) as entries:
+            return [entry.path for entry in entries]
+    return []
+
+
+def _remove(path):
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    return path
+
+
+def _trashed_entries(trash_dir):
+    try:
+        return sorted(entry.path for entry in os.scandir(trash_dir) if entry.name != GC_LOCK_NAME)
+    except FileNotFoundError:
+        return []
+
+
+def _reclaim(trash_dir, trashed, max_workers, verbose):
+    units = [unit for path in trashed for unit in _work_units(path)]
+    if verbose:
+        print(f"Reclaiming {len(trashed)} trashed item(s) ({len(units)} work unit(s)) from '{trash_dir}'")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_remove, unit) for unit in units]
+        for done, _ in enumerate(as_completed(futures), 1):
+            if verbose and (done == len(futures) or done % max(1, len(futures) // 20) == 0):
+                print(f"  [{done}/{len(futures)}] {done * 100 // len(futures)}% reclaimed")
+    for path in trashed:
+        _remove(path)
+
+
+def collect_trash(base_dir, max_workers=None, verbose=True):
+    """
+    Reclaim everything in base_dir/.trash on a thread pool.
+
+    Only one collector runs at a time (flock on .trash/.gc.lock); a second one
+    returns None straight away. The lock holder re-scans the trash until it is
+    empty, and once more after unlocking, so an item trashed by a delete whose
+    own collector bailed out is still reclaimed. Returns the number of trashed
+    entries removed.
+    """
+    trash_dir = _trash_dir(base_dir)
+    if not os.path.isdir(trash_dir):
+        if verbose:
+            print("Nothing to collect.")
+        return 0
+
+    start = time.time()
+    removed = 0
+    stuck = []  # entries that survived a pass (permissions, busy mounts); don't loop on them
+    while True:
+        lock_file = open(os.path.join(trash_dir, GC_LOCK_NAME), "w")
+        try:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    # the holder scans again after it unlocks, so it will see our items
+                    if verbose and not removed:
+                        print("GC-Warning: another gc is already running.")
+                    return removed or None
+            while True:
+                trashed = [path for path in _trashed_entries(trash_dir) if path not in stuck]
+                if not trashed:
+                    break
+                _reclaim(trash_dir, trashed, max_workers, verbose)
+                left = set(_trashed_entries(trash_dir))
+                stuck += [path for path in trashed if path in left]
+                removed += len(trashed) - len(left.intersection(trashed))
+        finally:
+            lock_file.close()
+        # something trashed between the last scan and the unlock may have lost the lock race
+        if not [path for path in _trashed_entries(trash_dir) if path not in stuck]:
+            break
+
+    if stuck and verbose:
+        print(f"GC-Warning: {len(stuck)} trashed item(s) could not be removed: {', '.join(stuck)}")
+    if verbose:
+        print(f"Reclaimed {removed} item(s) in {time.time() - start:.2f}s.")
+    return removed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Reclaim space from projects moved to <PROJECT_BASE_DIR>/.trash.')
+    parser.add_argument('command', choices=['gc'], help='gc: delete everything in the trash')
+    parser.add_argument('base_dir', help='PROJECT_BASE_DIR holding the .trash directory')
+    parser.add_argument('--workers', type=int, default=None, help='Number of parallel delete threads')
+    parser.add_argument('--quiet', action='store_true', help='No progress output')
+
+    args = parser.parse_args()
+    collect_trash(args.base_dir, max_workers=args.workers, verbose=not args.quiet)
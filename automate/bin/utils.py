@@ -2,18 +2,36 @@ import os
 import shutil
 import re
 import glob
+import sys
+import errno
+import codecs
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
 
 # Functions in this utils.py file:
-# copy_files_with_prefix(src_directory, dest_directory, prefix)
+# copy_files_with_prefix(src_directory, dest_directory, prefix, preserve_metadata=False, verbose=False)
 # read_all_files(directory)
 # format_title_re(title)
-# copy_files(src_dir, dst_dir, files)
+# copy_files(src_dir, dst_dir, files, preserve_metadata=True, verbose=False)
 # process_word(word)
-# copy_directory_contents(source_dir, destination_dir)
-# read_files_replace_variables(root_directory, variable_dict)
-# replace_placeholders_in_files(root_directory, variable_dict)
-# copy_file(source_file, destination_dir)
-# copy_files_by_pattern(source_pattern, destination_dir)
+# copy_directory_contents(source_dir, destination_dir, preserve_metadata=True, max_workers=None, verbose=False)
+# read_files_replace_variables(root_directory, variable_dict, max_workers=None)
+# iter_files_replace_variables(root_directory, variable_dict)
+# iter_file_chunks_replace_variables(root_directory, variable_dict, chunk_size=DEFAULT_CHUNK_SIZE)
+# replace_placeholders_in_files(root_directory, variable_dict, max_workers=None)
+# compile_placeholders(variable_dict)
+# substitute_placeholders(content, compiled)
+# is_binary_data(data)
+# copy_file(source_file, destination_dir, preserve_metadata=True)
+# fast_copy_file(source_file, destination_file, preserve_metadata=True)
+# copy_many(pairs, preserve_metadata=True, max_workers=None, verbose=False, symlinks=False)
+# collect_tree_copy_pairs(source_dir, destination_dir, symlinks=True)
+# copy_files_by_pattern(source_pattern, destination_dir, preserve_metadata=True, verbose=False)
 # delete_specific_file_or_dir(path)
 # create_directory(path)
 # create_empty_file(file_path)
@@ -85,28 +103,141 @@ def delete_specific_file_or_dir(path):
 # delete_specific_item('/one/two/file.txt')  # Specify the full path to the file or directory
 
 
-def copy_files_by_pattern(source_pattern, destination_dir):
+FICLONE = 0x40049409  # linux/fs.h: _IOW(0x94, 9, int)
+COPY_CHUNK_SIZE = 64 * 1024 * 1024
+_reflink_supported = fcntl is not None and sys.platform.startswith("linux")
+_copy_file_range_supported = hasattr(os, "copy_file_range")
+_sendfile_supported = hasattr(os, "sendfile") and sys.platform.startswith("linux")  # elsewhere the target must be a socket
+
+
+def _copy_file_data(source_file, destination_file):
+    """Copy file bytes using the cheapest mechanism the OS/filesystem offers."""
+    global _reflink_supported, _copy_file_range_supported, _sendfile_supported
+    with open(source_file, 'rb') as src, open(destination_file, 'wb') as dst:
+        if _reflink_supported:
+            # Copy-on-write clone (btrfs, xfs, ...): no data is copied at all
+            try:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+                return
+            except OSError as e:
+                if e.errno not in (errno.EXDEV, errno.EINVAL, errno.ENOTTY, errno.EOPNOTSUPP):
+                    raise
+                if e.errno in (errno.ENOTTY, errno.EOPNOTSUPP):
+                    _reflink_supported = False  # filesystem can't do it, stop trying
+        size = os.fstat(src.fileno()).st_size
+        offset = 0
+        if _copy_file_range_supported:
+            # In-kernel copy; may also reflink or offload on NFS/CIFS
+            try:
+                while offset < size:
+                    copied = os.copy_file_range(src.fileno(), dst.fileno(), min(COPY_CHUNK_SIZE, size - offset))
+                    if copied == 0:
+                        break
+                    offset += copied
+                if offset >= size:
+                    return
+            except OSError as e:
+                if e.errno not in (errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP):
+                    raise
+                if offset == 0 and e.errno in (errno.ENOSYS, errno.EOPNOTSUPP):
+                    _copy_file_range_supported = False
+        if _sendfile_supported:
+            # In-kernel copy through the page cache (older kernels, cross-filesystem)
+            try:
+                while offset < size:
+                    sent = os.sendfile(dst.fileno(), src.fileno(), offset, min(COPY_CHUNK_SIZE, size - offset))
+                    if sent == 0:
+                        break
+                    offset += sent
+                if offset >= size:
+                    return
+            except OSError as e:
+                if e.errno not in (errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP):
+                    raise
+                if offset == 0 and e.errno in (errno.ENOSYS, errno.EOPNOTSUPP):
+                    _sendfile_supported = False
+        # buffered copy of whatever is left
+        src.seek(offset)
+        dst.seek(offset)
+        shutil.copyfileobj(src, dst, COPY_CHUNK_SIZE)
+
+
+def fast_copy_file(source_file, destination_file, preserve_metadata=True):
+    """
+    Copy one file via reflink / copy_file_range / sendfile.
+
+    preserve_metadata=True keeps permissions and timestamps (like shutil.copy2),
+    False only keeps permission bits (like shutil.copy).
+    """
+    _copy_file_data(source_file, destination_file)
+    if preserve_metadata:
+        shutil.copystat(source_file, destination_file)
+    else:
+        shutil.copymode(source_file, destination_file)
+
+
+def copy_many(pairs, preserve_metadata=True, max_workers=None, verbose=False, symlinks=False):
+    """
+    Copy (source_file, destination_file) pairs on a thread pool.
+
+    Symlinks are followed like shutil.copy() does, unless symlinks is set:
+    then they are recreated as links (for whole trees, see
+    collect_tree_copy_pairs()). Output is quiet unless verbose is set; errors
+    are always reported. Returns (copied, failed).
+    """
+    pairs = list(pairs)
+
+    def copy_one(pair):
+        source_file, destination_file = pair
+        try:
+            if symlinks and os.path.islink(source_file):
+                if os.path.lexists(destination_file):
+                    os.remove(destination_file)
+                os.symlink(os.readlink(source_file), destination_file)
+            else:
+                fast_copy_file(source_file, destination_file, preserve_metadata)
+        except OSError as e:
+            print(f"Error: Failed to copy '{source_file}' to '{destination_file}'. Reason: {e}")
+            return False
+        if verbose:
+            print(f"Copied: {source_file} to {destination_file}")
+        return True
+
+    results = _map_files(copy_one, pairs, max_workers)
+    copied = sum(results)
+    return copied, len(results) - copied
+
+
+def collect_tree_copy_pairs(source_dir, destination_dir, symlinks=True):
+    """Create the directory skeleton of source_dir under destination_dir and list the files to copy."""
+    pairs = []
+    for dirpath, dirnames, filenames in os.walk(source_dir, followlinks=not symlinks):
+        target_dir = os.path.join(destination_dir, os.path.relpath(dirpath, source_dir))
+        os.makedirs(target_dir, exist_ok=True)
+        if symlinks:
+            # symlinked directories are copied as links, not descended into
+            for dirname in [d for d in dirnames if os.path.islink(os.path.join(dirpath, d))]:
+                dirnames.remove(dirname)
+                filenames.append(dirname)
+        pairs.extend((os.path.join(dirpath, f), os.path.join(target_dir, f)) for f in filenames)
+    return pairs
+
+
+def copy_files_by_pattern(source_pattern, destination_dir, preserve_metadata=True, verbose=False):
     try:
         # Create destination directory if it doesn't exist
         os.makedirs(destination_dir, exist_ok=True)
         
         # Find all files matching the source pattern
-        files_to_copy = glob.glob(source_pattern)
-        
-        for source_file in files_to_copy:
-            # Extract the filename from the source path
-            filename = os.path.basename(source_file)
-            
-            # Construct the destination path
-            destination_file = os.path.join(destination_dir, filename)
-            
-            # Copy the file
-            shutil.copy2(source_file, destination_file)
-            
-            print(f"File '{source_file}' copied to '{destination_file}' successfully.")
+        files_to_copy = [f for f in glob.glob(source_pattern) if os.path.isfile(f)]
+        pairs = [(f, os.path.join(destination_dir, os.path.basename(f))) for f in files_to_copy]
+        copied, failed = copy_many(pairs, preserve_metadata=preserve_metadata, verbose=verbose)
+        print(f"Copied {copied} file(s) matching '{source_pattern}' to '{destination_dir}'" + (f", {failed} failed." if failed else "."))
+        return copied
     
     except IOError as e:
         print(f"Error: {e}")
+        return 0
 
 # # Example usage:
 # source_pattern = '/path/to/source/*.txt'  # Example: all .txt files in /path/to/source/
@@ -115,7 +246,7 @@ def copy_files_by_pattern(source_pattern, destination_dir):
 # copy_files_by_pattern(source_pattern, destination_directory)
 
 
-def copy_file(source_file, destination_dir):
+def copy_file(source_file, destination_dir, preserve_metadata=True):
     try:
         # Create destination directory if it doesn't exist
         os.makedirs(destination_dir, exist_ok=True)
@@ -127,7 +258,7 @@ def copy_file(source_file, destination_dir):
         destination_file = os.path.join(destination_dir, filename)
         
         # Copy the file
-        shutil.copy2(source_file, destination_file)
+        fast_copy_file(source_file, destination_file, preserve_metadata)
         
         #print(f"File '{source_file}' copied to '{destination_file}' successfully.")
     except IOError as e:
@@ -140,27 +271,112 @@ def copy_file(source_file, destination_dir):
 # copy_file(source_file_path, destination_directory)
 
 
-def replace_placeholders_in_files(root_directory, variable_dict):
-    # Walk through all files and directories starting from root_directory
+BINARY_SNIFF_SIZE = 8192
+PARALLEL_FILE_THRESHOLD = 64  # below this many files a thread pool costs more than it saves
+
+
+@functools.lru_cache(maxsize=32)
+def _compile_placeholder_items(items):
+    keys = sorted((key for key, _ in items), key=len, reverse=True)  # longest key wins on overlap
+    pattern = re.compile("|".join(re.escape(key) for key in keys))
+    return pattern, dict(items)
+
+
+def compile_placeholders(variable_dict):
+    """
+    Compile every placeholder key into one escaped alternation.
+
+    Keys are matched literally (not as regexes) and all of them are replaced
+    in a single pass over the content. The result is cached per mapping.
+    """
+    items = tuple((str(key), str(value)) for key, value in variable_dict.items() if str(key))
+    if not items:
+        return None
+    return _compile_placeholder_items(items)
+
+
+def substitute_placeholders(content, compiled):
+    """Return (new_content, number_of_replacements) for a compiled placeholder set."""
+    if compiled is None:
+        return content, 0
+    pattern, replacements = compiled
+    return pattern.subn(lambda match: replacements[match.group(0)], content)
+
+
+def is_binary_data(data):
+    """Treat file content as binary if its first block contains a NUL byte."""
+    return b"\0" in data[:BINARY_SNIFF_SIZE]
+
+
+def _iter_files(root_directory):
     for dirpath, _, filenames in os.walk(root_directory):
         for filename in filenames:
-            # Construct the full path to the file
-            file_path = os.path.join(dirpath, filename)
-            
-            # Read the file contents
-            with open(file_path, 'r', encoding='utf-8') as file:
-                content = file.read()
-            
-            # Replace placeholders (__var__) with corresponding values from variable_dict
-            for key, value in variable_dict.items():
-                placeholder = f'{key}'
-                content = re.sub(placeholder, str(value), content)
-            
-            # Write the modified content back to the file
-            with open(file_path, 'w', encoding='utf-8') as file:
-                file.write(content)
-            
-            #print(f"Modified '{file_path}' successfully.")
+            yield os.path.join(dirpath, filename)
+
+
+def _read_text_file(file_path):
+    """Return the file's text, or None for binary / non-UTF-8 files."""
+    with open(file_path, 'rb') as file:
+        data = file.read()
+    if is_binary_data(data):
+        return None
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError:
+        return None
+
+
+def _is_text_file(file_path, chunk_size):
+    """_read_text_file()'s test (no NUL in the first block, valid UTF-8) without reading the whole file at once."""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    with open(file_path, 'rb') as file:
+        block = file.read(BINARY_SNIFF_SIZE)
+        if is_binary_data(block):
+            return False
+        try:
+            while block:
+                decoder.decode(block)
+                block = file.read(chunk_size)
+            decoder.decode(b"", final=True)
+        except UnicodeDecodeError:
+            return False
+    return True
+
+
+def _replace_placeholders_in_file(file_path, compiled):
+    content = _read_text_file(file_path)
+    if content is None:
+        return False
+    content, count = substitute_placeholders(content, compiled)
+    if not count:
+        # nothing to replace: leave the file (and its mtime) alone
+        return False
+    with open(file_path, 'w', encoding='utf-8', newline='') as file:
+        file.write(content)
+    return True
+
+
+def _map_files(func, file_paths, max_workers=None):
+    if len(file_paths) < PARALLEL_FILE_THRESHOLD or max_workers == 1:
+        return [func(file_path) for file_path in file_paths]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(func, file_paths))
+
+
+def replace_placeholders_in_files(root_directory, variable_dict, max_workers=None):
+    """
+    Replace placeholder keys with their values in every text file under root_directory.
+
+    Binary files and files without any placeholder are skipped without being
+    rewritten. Large trees are processed on a thread pool. Returns the number
+    of files modified.
+    """
+    compiled = compile_placeholders(variable_dict)
+    if compiled is None:
+        return 0
+    file_paths = list(_iter_files(root_directory))
+    results = _map_files(functools.partial(_replace_placeholders_in_file, compiled=compiled), file_paths, max_workers)
+    return sum(results)
 
 # # Example usage:
 # root_dir = '/path/to/your/root/directory'
@@ -174,28 +390,20 @@ def replace_placeholders_in_files(root_directory, variable_dict):
 
 
 
-def read_files_replace_variables(root_directory, variable_dict):
-    file_contents = {}
+def read_files_replace_variables(root_directory, variable_dict, max_workers=None):
+    """Return {file_path: substituted_content} for every text file under root_directory."""
+    compiled = compile_placeholders(variable_dict)
+    file_paths = list(_iter_files(root_directory))
 
-    # Walk through all files and directories starting from root_directory
-    for dirpath, _, filenames in os.walk(root_directory):
-        for filename in filenames:
-            # Construct the full path to the file
-            file_path = os.path.join(dirpath, filename)
-            
-            # Read the file contents
-            with open(file_path, 'r', encoding='utf-8') as file:
-                content = file.read()
-            
-            # Replace placeholders (__var__) with corresponding values from variable_dict
-            for key, value in variable_dict.items():
-                placeholder = f'{key}'
-                #print(f"Replacing '{placeholder}' with '{value}' in '{file_path}'")
-                content = re.sub(placeholder, str(value), content)
-            
+    def render(file_path):
+        content = _read_text_file(file_path)
+        return None if content is None else substitute_placeholders(content, compiled)[0]
+
+    file_contents = {}
+    for file_path, content in zip(file_paths, _map_files(render, file_paths, max_workers)):
+        if content is not None:
             # Store content in dictionary with file path as key
             file_contents[file_path] = content
-    
     return file_contents
 
 # # Example usage:
@@ -215,26 +423,96 @@ def read_files_replace_variables(root_directory, variable_dict):
 #     print('-' * 50)
 
 
-def copy_directory_contents(source_dir, destination_dir):
+DEFAULT_CHUNK_SIZE = 1024 * 1024  # characters per chunk in the chunked reader
+
+
+def iter_files_replace_variables(root_directory, variable_dict):
+    """
+    Lazily yield (file_path, substituted_content) for every text file under root_directory.
+
+    Same output as read_files_replace_variables(), but only one file is held
+    in memory at a time. Binary files are skipped.
+    """
+    compiled = compile_placeholders(variable_dict)
+    for file_path in _iter_files(root_directory):
+        content = _read_text_file(file_path)
+        if content is not None:
+            yield file_path, substitute_placeholders(content, compiled)[0]
+
+
+def iter_file_chunks_replace_variables(root_directory, variable_dict, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield (file_path, substituted_chunk) pieces for every text file under root_directory.
+
+    Joining the chunks of a file gives the same text as iter_files_replace_variables(),
+    but memory stays bounded by chunk_size even for very large files. Placeholders
+    that straddle a chunk boundary are still replaced: the last len(longest_key) - 1
+    characters are carried over into the next chunk. Binary and non-UTF-8 files are
+    skipped, checked in a first pass so a file is never cut off half-way.
+    """
+    compiled = compile_placeholders(variable_dict)
+    for file_path in _iter_files(root_directory):
+        if not _is_text_file(file_path, chunk_size):
+            continue
+        with open(file_path, 'r', encoding='utf-8', newline='') as file:
+            for chunk in _substitute_stream(file, compiled, chunk_size):
+                yield file_path, chunk
+
+
+def _substitute_stream(file, compiled, chunk_size):
+    if compiled is None:
+        while chunk := file.read(chunk_size):
+            yield chunk
+        return
+    pattern, replacements = compiled
+    overlap = max(len(key) for key in replacements) - 1
+    carry = ""
+    while True:
+        chunk = file.read(chunk_size)
+        buffer = carry + chunk
+        if not chunk:
+            if buffer:
+                yield substitute_placeholders(buffer, compiled)[0]
+            return
+        # a match starting before safe_end can't grow once more text arrives
+        safe_end = len(buffer) - overlap
+        pieces = []
+        position = 0
+        for match in pattern.finditer(buffer):
+            if match.start() >= safe_end:
+                break
+            pieces.append(buffer[position:match.start()])
+            pieces.append(replacements[match.group(0)])
+            position = match.end()
+        cut = max(safe_end, position)
+        pieces.append(buffer[position:cut])
+        carry = buffer[cut:]
+        output = "".join(pieces)
+        if output:
+            yield output
+
+# # Example usage:
+# for file_path, content in iter_files_replace_variables(root_dir, variables):
+#     print(file_path, len(content))
+#
+# for file_path, chunk in iter_file_chunks_replace_variables(root_dir, variables, chunk_size=65536):
+#     sys.stdout.write(chunk)
+
+
+def copy_directory_contents(source_dir, destination_dir, preserve_metadata=True, max_workers=None, verbose=False):
     try:
         # Create destination directory if it doesn't exist
         os.makedirs(destination_dir, exist_ok=True)
-        
-        # Iterate over files and subdirectories in the source directory
-        for item in os.listdir(source_dir):
-            source_item = os.path.join(source_dir, item)
-            destination_item = os.path.join(destination_dir, item)
-            
-            # Copy if it's a file
-            if os.path.isfile(source_item):
-                shutil.copy2(source_item, destination_item)
-            # Recursively copy if it's a directory
-            elif os.path.isdir(source_item):
-                shutil.copytree(source_item, destination_item, symlinks=True)
-        
-        print(f"Contents of '{source_dir}' copied to '{destination_dir}' successfully.")
+
+        # Mirror the directory tree first, then copy every file in parallel
+        pairs = collect_tree_copy_pairs(source_dir, destination_dir, symlinks=True)
+        copied, failed = copy_many(pairs, preserve_metadata=preserve_metadata, max_workers=max_workers, verbose=verbose, symlinks=True)
+
+        print(f"Contents of '{source_dir}' copied to '{destination_dir}' successfully ({copied} file(s)" + (f", {failed} failed)." if failed else ")."))
+        return copied
     except OSError as e:
         print(f"Error: {e}")
+        return 0
 
 # # Usage example:
 # source_directory = '/path/to/source_directory'
@@ -242,7 +520,7 @@ def copy_directory_contents(source_dir, destination_dir):
 # copy_directory_contents(source_directory, destination_directory)
 
 
-def copy_files_with_prefix(src_directory, dest_directory, prefix):
+def copy_files_with_prefix(src_directory, dest_directory, prefix, preserve_metadata=False, verbose=False):
     # Create the destination directory if it doesn't exist
     if not os.path.exists(dest_directory):
         os.makedirs(dest_directory)
@@ -250,11 +528,12 @@ def copy_files_with_prefix(src_directory, dest_directory, prefix):
     # Use glob to get a list of all files in the source directory
     files = glob.glob(os.path.join(src_directory, '*'))
     
-    # Iterate through the files and copy those that start with the given prefix
-    for file in files:
-        if os.path.basename(file).startswith(prefix):
-            shutil.copy(file, dest_directory)
-            print(f"Copied: {file} to {dest_directory}")
+    # Copy those that start with the given prefix
+    pairs = [(file, os.path.join(dest_directory, os.path.basename(file)))
+             for file in files if os.path.basename(file).startswith(prefix) and os.path.isfile(file)]
+    copied, failed = copy_many(pairs, preserve_metadata=preserve_metadata, verbose=verbose)
+    print(f"Copied {copied} file(s) with prefix '{prefix}' to {dest_directory}" + (f", {failed} failed." if failed else "."))
+    return copied
 
 # # Example usage
 # src_directory = 'path/to/source/directory'
@@ -284,28 +563,30 @@ def format_title_re(title):
     return formatted_title
 
 
-def copy_files(src_dir, dst_dir, files):
+def copy_files(src_dir, dst_dir, files, preserve_metadata=True, verbose=False):
     # Check if the source directory exists
     if not os.path.exists(src_dir):
         print(f"Source directory '{src_dir}' does not exist.")
-        return
+        return 0
 
     # Ensure the destination directory exists
     if not os.path.exists(dst_dir):
         os.makedirs(dst_dir)
-        print(f"Destination directory '{dst_dir}' created.")
+        if verbose:
+            print(f"Destination directory '{dst_dir}' created.")
 
     # Copy each file from the source to destination directory
+    pairs = []
     for file_name in files:
         src_file_path = os.path.join(src_dir, file_name)
-        dst_file_path = os.path.join(dst_dir, file_name)
-
         # Check if the file exists before copying
         if os.path.exists(src_file_path):
-            shutil.copy2(src_file_path, dst_file_path)
-            print(f"Copied {file_name} to {dst_dir}.")
+            pairs.append((src_file_path, os.path.join(dst_dir, file_name)))
         else:
             print(f"File {file_name} does not exist in the source directory.")
+    copied, failed = copy_many(pairs, preserve_metadata=preserve_metadata, verbose=verbose)
+    print(f"Copied {copied} file(s) to {dst_dir}" + (f", {failed} failed." if failed else "."))
+    return copied
 
 # Example usage
 # source_directory = "/path/to/source"
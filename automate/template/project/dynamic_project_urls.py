@@ -3,7 +3,9 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 import os
-import importlib
+import ast
+import importlib.util
+from .lazy_urls import lazy_include  # copy automate/template/project/lazy_urls.py next to this file
 
 # Ensure static and media directories exist
 os.makedirs(settings.STATIC_ROOT, exist_ok=True)
@@ -13,24 +15,43 @@ urlpatterns = [
     path('admin/', admin.site.urls),
 ]
 
+
+def read_app_name(spec):
+    """The module's literal `app_name = '...'`, read from its source without importing it (None if absent)."""
+    if not spec.origin or not spec.origin.endswith(".py"):
+        return None
+    with open(spec.origin, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=spec.origin)
+    app_name = None
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(isinstance(t, ast.Name) and t.id == "app_name" for t in node.targets):
+            try:
+                app_name = ast.literal_eval(node.value)
+            except ValueError:
+                app_name = None
+    return app_name if isinstance(app_name, str) else None
+
+
 # Dynamically add URLs for `app_` prefixed apps
 for app in settings.INSTALLED_APPS:
     if app.startswith("app_"):
-        try:
-            app_urls = importlib.import_module(f"{app}.app_urls")
-            urlpatterns.append(path(f"{app.replace('app_', '')}/", include(f"{app}.app_urls")))
-            print(f"✅ Loaded App URLs from: {app}.app_urls")
-        except ModuleNotFoundError:
+        # find_spec() only locates the module; it is imported on the first request to its prefix
+        spec = importlib.util.find_spec(f"{app}.app_urls")
+        if spec is not None:
+            # lazy_include() can't see the app_name of a module it hasn't imported, so pass it along
+            urlpatterns.append(path(f"{app.replace('app_', '')}/", lazy_include(f"{app}.app_urls", app_name=read_app_name(spec))))
+            print(f"✅ Registered App URLs from: {app}.app_urls")
+        else:
             print(f"❌ No `app_urls.py` found for {app}, skipping.")
 
 # Dynamically add URLs for `rest_` prefixed apps
 for app in settings.INSTALLED_APPS:
     if app.startswith("rest_"):
-        try:
-            rest_urls = importlib.import_module(f"{app}.rest_urls")
-            urlpatterns.append(path(f"api/{app.replace('rest_', '')}/", include(f"{app}.rest_urls")))
-            print(f"✅ Loaded REST API URLs from: {app}.rest_urls")
-        except ModuleNotFoundError:
+        spec = importlib.util.find_spec(f"{app}.rest_urls")
+        if spec is not None:
+            urlpatterns.append(path(f"api/{app.replace('rest_', '')}/", lazy_include(f"{app}.rest_urls", app_name=read_app_name(spec))))
+            print(f"✅ Registered REST API URLs from: {app}.rest_urls")
+        else:
             print(f"❌ No `rest_urls.py` found for {app}, skipping.")
 
 # Serve static and media files in development
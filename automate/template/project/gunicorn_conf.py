@@ -0,0 +1,56 @@
+# Generated by `./django serve __PROJECT_NAME__` -- re-run it (or pass options to it) instead of editing.
+# Preforking gunicorn setup: the application is imported once in the master,
+# the objects it created are moved out of the garbage collector's reach with
+# gc.freeze() and every worker is forked from that image, so the pages holding
+# Django, the settings and the URLConf stay shared between workers.
+import gc
+import os
+import multiprocessing
+
+
+def _cpu_count():
+    try:
+        return len(os.sched_getaffinity(0))  # respects CPU pinning/cgroup cpusets
+    except AttributeError:
+        return multiprocessing.cpu_count()
+
+
+wsgi_app = "__APP_MODULE__"
+bind = os.environ.get("SERVE_BIND", "__BIND__")
+# (2 x cores) + 1 unless fixed with `./django serve __PROJECT_NAME__ --workers N`
+workers = int(os.environ.get("SERVE_WORKERS", __WORKERS__))
+worker_class = "__WORKER_CLASS__"
+threads = __THREADS__
+preload_app = True
+# recycle workers to cap slow leaks; the jitter keeps them from restarting together
+max_requests = __MAX_REQUESTS__
+max_requests_jitter = __MAX_REQUESTS_JITTER__
+timeout = __TIMEOUT__
+graceful_timeout = __TIMEOUT__
+keepalive = 5
+worker_tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+accesslog = "-"
+errorlog = "-"
+
+
+def _warm_templates(server):
+    # templates listed by `./django compile-templates` are parsed here once and
+    # every worker inherits the cached loader's entries
+    try:
+        from __SETTINGS_PACKAGE__.template_loading import warm_template_cache
+    except ImportError:
+        return
+    server.log.info("template cache warmed with %d template(s)", warm_template_cache())
+
+
+def when_ready(server):
+    _warm_templates(server)
+    # the preloaded app is fully imported by now; nothing allocated so far needs collecting
+    gc.collect()
+    gc.freeze()
+    server.log.info("gc.freeze(): %d objects moved to the permanent generation", gc.get_freeze_count())
+
+
+def pre_fork(server, worker):
+    # objects created in the master since the last fork (e.g. by a respawn) stay shared as well
+    gc.freeze()
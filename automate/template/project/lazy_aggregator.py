@@ -0,0 +1,25 @@
+# Generated from the mod_*/__SOURCE_PREFIX___*.py files of __APP_NAME__ -- do not edit by hand.
+# Regenerated when a module is created and by `./django build-urls <project>`.
+#
+# Every public name of those files is available from here, but a file is only
+# imported the first time one of its names is used (PEP 562 module __getattr__).
+# `from .all___KIND___imports import *` imports all of them.
+import importlib
+
+_NAME_TO_MODULE = {
+__NAME_MAP__}
+
+__all__ = list(_NAME_TO_MODULE)
+
+
+def __getattr__(name):
+    module_name = _NAME_TO_MODULE.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value  # later lookups no longer reach __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_NAME_TO_MODULE))
@@ -0,0 +1,26 @@
+"""
+Lazy URL includes for the generated root URLConf.
+
+`include('app_blog.app_urls')` imports the app's URL module (and through
+mod_app/urls_app.py every mod_* URL and view module) while the root URLConf
+is being imported. `lazy_include()` registers the same prefix but hands
+Django the dotted module name instead, so the import only happens the first
+time a request reaches that prefix.
+
+reverse() keeps working: the first reverse() call populates the resolver and
+imports every app at that point, exactly as it would have at boot.
+"""
+from django.core.exceptions import ImproperlyConfigured
+
+
+def lazy_include(urlconf_name, app_name=None, namespace=None):
+    """Drop-in for include('<dotted.module>') that defers the import."""
+    if not isinstance(urlconf_name, str):
+        raise ImproperlyConfigured("lazy_include() needs a dotted module path, use include() for module objects.")
+    if namespace and not app_name:
+        raise ImproperlyConfigured(
+            "Specifying a namespace in lazy_include() without providing an app_name is not supported."
+        )
+    # path() turns this (urlconf, app_name, namespace) triple into a URLResolver;
+    # URLResolver imports a string urlconf on first access to url_patterns.
+    return (urlconf_name, app_name, namespace or app_name)
@@ -0,0 +1,201 @@
+# Generated by `./django cache __PROJECT_NAME__` from the [cache] section of config.ini -- do not edit by hand.
+# settings.py calls apply_module_cache(globals()) as its last statement.
+#
+# Views opt in per view:
+#
+#     from __SETTINGS_PACKAGE__.module_cache import cache_module_view
+#
+#     @cache_module_view                # policy of the view's mod_* package
+#     def post_list(request): ...
+#
+#     @cache_module_view(ttl=30, vary=["Cookie"])
+#     def post_detail(request, pk): ...
+#
+# Only GET/HEAD responses with status 200 that set no cookies and are not
+# marked private are stored. Cache keys carry a hash of the module's code and
+# templates, so editing a module starts it with a fresh cache.
+# invalidate_url_prefix() drops every module mounted under a URL prefix (an
+# app's or a module's URL prefix, or "/") by bumping the generation counter
+# that is part of the module's keys; the mounts are read from the URLConf.
+import os
+import hashlib
+import functools
+import importlib.util
+
+CACHE_ENABLED = __CACHE_ENABLED__
+CACHE_ALIAS = "module_cache"
+CACHE_BACKEND = "__CACHE_BACKEND__"
+CACHE_LOCATION = "__CACHE_LOCATION__"
+KEY_PREFIX = "modcache"
+DEFAULT_POLICY = {"enabled": True, "ttl": __CACHE_TTL__, "vary": __CACHE_VARY__}
+# "<app>.<mod>" (without the app_/mod_ prefixes) -> overrides of DEFAULT_POLICY
+MODULE_POLICIES = {
+__MODULE_POLICIES__}
+CACHEABLE_METHODS = ("GET", "HEAD")
+
+
+def apply_module_cache(settings):
+    caches = dict(settings.get("CACHES") or {})
+    caches.setdefault("default", {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"})
+    location = CACHE_LOCATION
+    if CACHE_BACKEND.endswith("FileBasedCache") and not os.path.isabs(location):
+        base_dir = settings.get("BASE_DIR") or os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        location = os.path.join(base_dir, location)
+    caches.setdefault(CACHE_ALIAS, {"BACKEND": CACHE_BACKEND, "LOCATION": location, "TIMEOUT": DEFAULT_POLICY["ttl"]})
+    settings["CACHES"] = caches
+
+
+def _split_module(view_module):
+    """'app_blog.mod_posts.views_posts' -> ('app_blog', 'mod_posts')."""
+    parts = view_module.split(".")
+    if len(parts) < 3:
+        raise ValueError(f"cache_module_view is for views in <app>.<mod>.views_<mod> modules, not {view_module!r}")
+    return parts[0], parts[1]
+
+
+def _short(name):
+    return name.split("_", 1)[1] if "_" in name else name
+
+
+def module_policy(app, mod):
+    policy = dict(DEFAULT_POLICY)
+    policy.update(MODULE_POLICIES.get(f"{_short(app)}.{_short(mod)}", {}))
+    return policy
+
+
+@functools.lru_cache(maxsize=None)
+def module_code_version(app, mod):
+    """Hash of the module's .py files and its templates/<app>/<mod> directory, computed once per process."""
+    spec = importlib.util.find_spec(f"{app}.{mod}")
+    package_dir = list(spec.submodule_search_locations)[0]
+    app_dir = os.path.dirname(package_dir)
+    paths = [os.path.join(package_dir, name) for name in os.listdir(package_dir) if name.endswith(".py")]
+    for root, dirs, files in os.walk(os.path.join(app_dir, "templates", app, mod)):
+        paths.extend(os.path.join(root, name) for name in files)
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        digest.update(os.path.relpath(path, app_dir).encode("utf-8"))
+        with open(path, "rb") as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()[:12]
+
+
+def _generation_keys(app, mod):
+    return [f"{KEY_PREFIX}:gen:/", f"{KEY_PREFIX}:gen:{app}.{mod}"]
+
+
+@functools.lru_cache(maxsize=None)
+def module_url_prefixes():
+    """{'app_blog.mod_posts': '/blog/.../posts/'}: where the URLConf mounts each module's urls_<mod>.py."""
+    from django.core.exceptions import ImproperlyConfigured
+    from django.urls import URLResolver, get_resolver
+
+    prefixes = {}
+
+    def walk(patterns, prefix):
+        for pattern in patterns:
+            if not isinstance(pattern, URLResolver):
+                continue
+            route = prefix + str(pattern.pattern)
+            # include() hands over the imported module, a dotted string or a list
+            urlconf = pattern.urlconf_name
+            parts = (urlconf if isinstance(urlconf, str) else getattr(urlconf, "__name__", "")).split(".")
+            if len(parts) == 3 and parts[2].startswith("urls_") and parts[1] != "mod_app":
+                prefixes.setdefault(f"{parts[0]}.{parts[1]}", "/" + route)
+                continue
+            try:
+                walk(pattern.url_patterns, route)
+            except ImproperlyConfigured:  # an include without urlpatterns mounts no module
+                pass
+
+    walk(get_resolver().url_patterns, "")
+    return prefixes
+
+
+def _response_key(cache, request, app, mod, vary):
+    generation_keys = _generation_keys(app, mod)
+    generations = cache.get_many(generation_keys)
+    generation = ".".join(str(generations.get(key, 0)) for key in generation_keys)
+    request_digest = hashlib.md5(request.build_absolute_uri().encode("utf-8"), usedforsecurity=False)
+    for header in vary:
+        request_digest.update(b"\0" + request.headers.get(header, "").encode("utf-8"))
+    return (f"{KEY_PREFIX}:{app}.{mod}:{module_code_version(app, mod)}:{generation}:"
+            f"{request.method}:{request_digest.hexdigest()}")
+
+
+def _is_cacheable(response, vary):
+    from django.utils.cache import cc_delim_re
+
+    if response.status_code != 200 or response.streaming or response.cookies:
+        return False
+    cache_control = response.get("Cache-Control", "").lower()
+    if "private" in cache_control or "no-store" in cache_control:
+        return False
+    # a Vary header the key does not account for would serve one client's copy to another
+    allowed = {header.lower() for header in vary}
+    return all(header.lower() in allowed for header in cc_delim_re.split(response.get("Vary", "")) if header)
+
+
+def cache_module_view(view=None, *, ttl=None, vary=None):
+    """Cache a view's responses under the policy of its mod_* package; ttl/vary override it."""
+    if view is None:
+        return functools.partial(cache_module_view, ttl=ttl, vary=vary)
+    app, mod = _split_module(view.__module__)
+    policy = module_policy(app, mod)
+    timeout = policy["ttl"] if ttl is None else ttl
+    vary = tuple(policy["vary"] if vary is None else vary)
+    if not (CACHE_ENABLED and policy["enabled"] and timeout > 0):
+        return view
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        from django.core.cache import caches
+        from django.utils.cache import patch_response_headers, patch_vary_headers
+
+        if request.method not in CACHEABLE_METHODS:
+            return view(request, *args, **kwargs)
+        cache = caches[CACHE_ALIAS]
+        key = _response_key(cache, request, app, mod, vary)
+        response = cache.get(key)
+        if response is not None:
+            return response
+        response = view(request, *args, **kwargs)
+        if vary:
+            patch_vary_headers(response, vary)
+        if _is_cacheable(response, vary):
+            patch_response_headers(response, timeout)
+            if callable(getattr(response, "render", None)) and not getattr(response, "is_rendered", True):
+                response.add_post_render_callback(lambda rendered: cache.set(key, rendered, timeout))
+            else:
+                cache.set(key, response, timeout)
+        return response
+    return wrapper
+
+
+def _bump(cache, key):
+    try:
+        return cache.incr(key)
+    except ValueError:  # first invalidation of this key
+        cache.set(key, 1, None)
+        return 1
+
+
+def invalidate_url_prefix(prefix="/"):
+    """
+    Drop the cached responses of every module mounted under prefix; returns the module names.
+
+    A prefix inside a module ('/blog/blog/posts/42/') drops that whole module,
+    '/' drops everything.
+    """
+    from django.core.cache import caches
+
+    cache = caches[CACHE_ALIAS]
+    prefix = "/" + prefix.strip("/") + "/" if prefix.strip("/") else "/"
+    if prefix == "/":
+        _bump(cache, f"{KEY_PREFIX}:gen:/")
+        return sorted(module_url_prefixes())
+    modules = sorted(module for module, mount in module_url_prefixes().items()
+                     if mount.startswith(prefix) or prefix.startswith(mount))
+    for module in modules:
+        _bump(cache, f"{KEY_PREFIX}:gen:{module}")
+    return modules
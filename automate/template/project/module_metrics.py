@@ -0,0 +1,354 @@
+# Generated for __PROJECT_NAME__ -- do not edit by hand, `./django metrics __PROJECT_NAME__` rewrites it.
+# settings.py calls apply_module_metrics(globals()) as its last statement.
+#
+# ModuleMetricsMiddleware (first in MIDDLEWARE) labels every request with the
+# app_* and mod_* of the view it resolved to and records, per module:
+#   django_module_requests_total{status="2xx"}     requests by status class
+#   django_module_request_duration_seconds          latency histogram
+#   django_module_db_queries_total                  queries run by the request
+#   django_module_db_query_duration_seconds_total   time spent in those queries
+#   django_module_response_size_bytes               response size histogram
+#
+# The numbers live in the process. Setting MODULE_METRICS_PATH (off by default)
+# serves them as Prometheus text to MODULE_METRICS_ALLOWED_IPS, and when
+# MODULE_METRICS_TOKEN is set only with "Authorization: Bearer <token>". A
+# reverse proxy on the same host makes every client look like 127.0.0.1: never
+# proxy MODULE_METRICS_PATH, or set a token. Each scrape is answered by whichever
+# worker got the request, so its samples carry a pid label like the files below;
+# sum over pid in queries. Every MODULE_METRICS_FILE_INTERVAL
+# seconds, at the end of a request, each process also writes them to
+# MODULE_METRICS_FILE with its pid in the name (module_metrics.<pid>.prom, with a
+# pid label, the layout node_exporter's textfile collector reads). The previous
+# snapshots are kept as .prom.1 ... .prom.<MODULE_METRICS_FILE_BACKUPS>. When a
+# live process writes its own file it folds the last file of every process that
+# is gone (recycled workers, an earlier run) into module_metrics.retired.prom,
+# summed without the pid label, and removes the dead process's files; so the
+# .prom files together always hold every request counted so far.
+# Override any MODULE_METRICS_* name in settings.py.
+import os
+import re
+import sys
+import glob
+import hmac
+import time
+import atexit
+import bisect
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+METRICS_MIDDLEWARE = "__SETTINGS_PACKAGE__.module_metrics.ModuleMetricsMiddleware"
+DEFAULTS = {
+    "MODULE_METRICS_ENABLED": True,
+    "MODULE_METRICS_PATH": None,  # e.g. "/-/metrics"; must not be reachable through a proxy
+    "MODULE_METRICS_ALLOWED_IPS": ["127.0.0.1", "::1"],
+    "MODULE_METRICS_TOKEN": None,
+    "MODULE_METRICS_FILE": os.path.join(".metrics", "module_metrics.prom"),  # relative to BASE_DIR; None disables
+    "MODULE_METRICS_FILE_INTERVAL": 60,
+    "MODULE_METRICS_FILE_BACKUPS": 5,
+}
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+RETIRED_NAME = "retired"
+PID_LABEL_RE = re.compile(r',pid="\d+"')
+
+
+def apply_module_metrics(settings):
+    for name, value in DEFAULTS.items():
+        settings.setdefault(name, value)
+    metrics_file = settings["MODULE_METRICS_FILE"]
+    if metrics_file and not os.path.isabs(metrics_file):
+        base_dir = settings.get("BASE_DIR") or os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        settings["MODULE_METRICS_FILE"] = os.path.join(base_dir, metrics_file)
+    middleware = list(settings.get("MIDDLEWARE", []))
+    if METRICS_MIDDLEWARE not in middleware:
+        settings["MIDDLEWARE"] = [METRICS_MIDDLEWARE] + middleware
+
+
+def view_labels(request):
+    """(app, module) of the view the request resolved to; ('unresolved', '') for 404s before a match."""
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unresolved", ""
+    view_module = getattr(match.func, "__module__", "") or ""
+    parts = view_module.split(".")
+    if len(parts) >= 2 and parts[0].startswith("app_") and parts[1].startswith("mod_"):
+        return parts[0], parts[1]
+    return parts[0] or "unknown", ""
+
+
+class _Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self, buckets):
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, buckets, value):
+        self.counts[bisect.bisect_left(buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class _ModuleStats:
+    __slots__ = ("statuses", "duration", "size", "queries", "query_seconds")
+
+    def __init__(self):
+        self.statuses = {}
+        self.duration = _Histogram(DURATION_BUCKETS)
+        self.size = _Histogram(SIZE_BUCKETS)
+        self.queries = 0
+        self.query_seconds = 0.0
+
+
+class MetricsRegistry:
+    """Per-process metrics keyed by (app, module)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.modules = {}
+
+    def record(self, labels, status, seconds, size, queries, query_seconds):
+        status_class = f"{status // 100}xx"
+        with self.lock:
+            stats = self.modules.get(labels)
+            if stats is None:
+                stats = self.modules[labels] = _ModuleStats()
+            stats.statuses[status_class] = stats.statuses.get(status_class, 0) + 1
+            stats.duration.observe(DURATION_BUCKETS, seconds)
+            if size is not None:
+                stats.size.observe(SIZE_BUCKETS, size)
+            stats.queries += queries
+            stats.query_seconds += query_seconds
+
+    def render(self, extra_labels=""):
+        """Prometheus text exposition format (0.0.4)."""
+        with self.lock:
+            snapshot = sorted(self.modules.items())
+            lines = [
+                "# HELP django_module_requests_total Requests by app, module and status class.",
+                "# TYPE django_module_requests_total counter",
+            ]
+            for (app, module), stats in snapshot:
+                for status_class, count in sorted(stats.statuses.items()):
+                    lines.append(f'django_module_requests_total{{app="{app}",module="{module}",status="{status_class}"{extra_labels}}} {count}')
+            for name, kind, buckets, help_text in (
+                    ("django_module_request_duration_seconds", "duration", DURATION_BUCKETS, "Request latency."),
+                    ("django_module_response_size_bytes", "size", SIZE_BUCKETS, "Response body size.")):
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                for (app, module), stats in snapshot:
+                    histogram = getattr(stats, kind)
+                    labels = f'app="{app}",module="{module}"{extra_labels}'
+                    cumulative = 0
+                    for bound, count in zip(buckets + ("+Inf",), histogram.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                    lines.append(f"{name}_sum{{{labels}}} {histogram.total}")
+                    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+            for name, attribute, help_text in (
+                    ("django_module_db_queries_total", "queries", "Database queries run by requests."),
+                    ("django_module_db_query_duration_seconds_total", "query_seconds", "Time spent in database queries.")):
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+                for (app, module), stats in snapshot:
+                    lines.append(f'{name}{{app="{app}",module="{module}"{extra_labels}}} {getattr(stats, attribute)}')
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+class _QueryTimer:
+    """connection.execute_wrapper() callable counting the queries of one request."""
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.count += 1
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # someone else's process
+    return True
+
+
+def _read_families(path):
+    """{metric family: [header lines, {sample without pid label: value}]} of a metrics file, in file order."""
+    families = {}
+    family = None
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if line.startswith("# HELP "):
+                family = families.setdefault(line.split(" ", 3)[2], [[], {}])
+                if line not in family[0]:
+                    family[0].append(line)
+            elif line.startswith("# TYPE ") and family is not None:
+                if line not in family[0]:
+                    family[0].append(line)
+            elif line and family is not None:
+                sample, _, value = line.rpartition(" ")
+                sample = PID_LABEL_RE.sub("", sample)
+                family[1][sample] = family[1].get(sample, 0.0) + float(value)
+    return families
+
+
+def _format_value(value):
+    return str(int(value)) if value == int(value) else repr(value)
+
+
+class _FileExporter:
+    def __init__(self, path, interval, backups):
+        root, ext = os.path.splitext(path)
+        self.root, self.ext = root, ext
+        self.pid = os.getpid()
+        self.path = f"{root}.{self.pid}{ext}"
+        self.interval = interval
+        self.backups = backups
+        self.next_write = time.monotonic() + interval
+        self.lock = threading.Lock()
+
+    def prune_dead(self):
+        """Fold the last file of every pid that no longer runs into the retired file, then remove its files."""
+        dead = {}
+        for path in glob.glob(f"{glob.escape(self.root)}.*{self.ext}*"):
+            pid = path[len(self.root) + 1:].split(".", 1)[0]
+            if pid.isdigit() and int(pid) != self.pid and not _pid_alive(int(pid)):
+                dead.setdefault(int(pid), []).append(path)
+        if not dead:
+            return
+        retired_path = f"{self.root}.{RETIRED_NAME}{self.ext}"
+        with open(f"{retired_path}.lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)  # one folder at a time, or a file is counted twice
+            families = _read_families(retired_path) if os.path.exists(retired_path) else {}
+            folded = []
+            for pid, paths in sorted(dead.items()):
+                try:
+                    dead_families = _read_families(f"{self.root}.{pid}{self.ext}")
+                except FileNotFoundError:
+                    dead_families = {}  # only backups left, or another process folded it first
+                for name, (headers, samples) in dead_families.items():
+                    family = families.setdefault(name, [headers, {}])
+                    for sample, value in samples.items():
+                        family[1][sample] = family[1].get(sample, 0.0) + value
+                folded += paths
+            lines = []
+            for headers, samples in families.values():
+                lines += headers
+                lines += [f"{sample} {_format_value(value)}" for sample, value in samples.items()]
+            tmp_path = f"{retired_path}.{self.pid}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+            os.replace(tmp_path, retired_path)
+            for path in folded:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def maybe_write(self, force=False):
+        if not force and time.monotonic() < self.next_write:
+            return
+        if not self.lock.acquire(blocking=False):
+            return  # another thread of this process is writing
+        try:
+            self.next_write = time.monotonic() + self.interval
+            content = registry.render(f',pid="{self.pid}"')
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            for index in range(self.backups - 1, 0, -1):
+                if os.path.exists(f"{self.path}.{index}"):
+                    os.replace(f"{self.path}.{index}", f"{self.path}.{index + 1}")
+            if self.backups and os.path.exists(self.path):
+                os.replace(self.path, f"{self.path}.1")
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp_path, self.path)
+            self.prune_dead()
+        except OSError as e:  # read-only deploys: keep serving, stop writing
+            self.interval = float("inf")
+            print(f"module_metrics: not writing {self.path}: {e}", file=sys.stderr)
+        finally:
+            self.lock.release()
+
+
+class ModuleMetricsMiddleware:
+    def __init__(self, get_response):
+        from django.conf import settings
+        from django.core.exceptions import MiddlewareNotUsed
+
+        if not getattr(settings, "MODULE_METRICS_ENABLED", True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.metrics_path = getattr(settings, "MODULE_METRICS_PATH", None)
+        self.allowed_ips = set(getattr(settings, "MODULE_METRICS_ALLOWED_IPS", ()))
+        self.token = getattr(settings, "MODULE_METRICS_TOKEN", None)
+        self.file_options = (getattr(settings, "MODULE_METRICS_FILE", None),
+                             getattr(settings, "MODULE_METRICS_FILE_INTERVAL", 60),
+                             getattr(settings, "MODULE_METRICS_FILE_BACKUPS", 5))
+        self.exporter = None
+
+    def _exporter(self):
+        # created lazily in each process: with a preloaded master the pid is the worker's
+        if self.exporter is None or self.exporter.pid != os.getpid():
+            path, interval, backups = self.file_options
+            self.exporter = _FileExporter(path, interval, backups) if path else False
+            if self.exporter:
+                atexit.register(self.exporter.maybe_write, True)
+        return self.exporter
+
+    def _metrics_allowed(self, request):
+        if request.META.get("REMOTE_ADDR") not in self.allowed_ips:
+            return False
+        if self.token is None:
+            return True
+        return hmac.compare_digest(request.META.get("HTTP_AUTHORIZATION", ""), f"Bearer {self.token}")
+
+    def __call__(self, request):
+        from django.db import connections
+
+        if self.metrics_path and request.path == self.metrics_path and self._metrics_allowed(request):
+            from django.http import HttpResponse
+            # each preforked worker answers for itself only; the pid label keeps its series apart
+            return HttpResponse(registry.render(f',pid="{os.getpid()}"'), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+        timer = _QueryTimer()
+        wrapped = []
+        start = time.perf_counter()
+        try:
+            for connection in connections.all():
+                connection.execute_wrappers.append(timer)
+                wrapped.append(connection)
+            response = self.get_response(request)
+        finally:
+            for connection in wrapped:
+                connection.execute_wrappers.remove(timer)
+        seconds = time.perf_counter() - start
+
+        if response.streaming:
+            length = response.get("Content-Length")
+            size = int(length) if length and length.isdigit() else None
+        else:
+            size = len(response.content)
+        registry.record(view_labels(request), response.status_code, seconds, size, timer.count, timer.seconds)
+        exporter = self._exporter()
+        if exporter:
+            exporter.maybe_write()
+        return response
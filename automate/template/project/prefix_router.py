@@ -0,0 +1,82 @@
+"""
+Prefix-dispatch routing for generated URLConfs.
+
+Django tries every entry of a urlpatterns list in order, so resolving
+`/<app>/<mod>/...` costs one regex match per app and then one per module.
+`dispatch_patterns()` wraps a urlpatterns list in a resolver that first looks
+the leading path segment up in a dict and only runs Django's normal matching
+over the patterns that can possibly match it. Used at the root (one bucket per
+app) and in mod_app/urls_app.py (one bucket per module), a request only runs
+full pattern matching inside the chosen module.
+
+Patterns whose first segment isn't a plain literal (converters, re_path(),
+empty prefixes) are kept in every bucket in their original order, so the
+match returned is always the one a plain urlpatterns list would return.
+reverse() is unaffected: it still sees the full list.
+"""
+import threading
+
+from django.urls import URLPattern, URLResolver
+from django.urls.resolvers import RoutePattern
+
+
+def _dispatch_key(pattern):
+    """Literal first path segment a pattern requires, or None if it can't be keyed."""
+    if not isinstance(pattern.pattern, RoutePattern):
+        return None
+    route = str(pattern.pattern)
+    head, slash, _ = route.partition("/")
+    if not head or "<" in head:
+        return None
+    if slash or (isinstance(pattern, URLPattern) and pattern.pattern._is_endpoint):
+        # 'blog/...' needs the segment 'blog'; an endpoint 'blog' needs the whole path to be 'blog'
+        return head
+    # a non-endpoint route without '/' ('blog' + include) also matches 'blogroll/...'
+    return None
+
+
+class PrefixDispatchResolver(URLResolver):
+    """URLResolver that narrows its patterns by the first path segment before matching."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._buckets = None
+        self._fallback = None
+        self._buckets_lock = threading.Lock()
+
+    def _build_buckets(self):
+        keyed = {}
+        ordered = []
+        for pattern in self.url_patterns:
+            key = _dispatch_key(pattern)
+            ordered.append((key, pattern))
+            if key is not None:
+                keyed.setdefault(key, None)
+        buckets = {}
+        for key in keyed:
+            patterns = [p for k, p in ordered if k is None or k == key]
+            buckets[key] = self._bucket_resolver(patterns)
+        fallback = self._bucket_resolver([p for k, p in ordered if k is None])
+        return buckets, fallback
+
+    def _bucket_resolver(self, patterns):
+        # Same pattern, kwargs and namespace as this resolver, so ResolverMatch comes out identical
+        return URLResolver(self.pattern, patterns, self.default_kwargs, self.app_name, self.namespace)
+
+    def resolve(self, path):
+        if self._buckets is None:
+            with self._buckets_lock:
+                if self._buckets is None:
+                    buckets, self._fallback = self._build_buckets()
+                    self._buckets = buckets
+        path = str(path)
+        match = self.pattern.match(path)
+        if not match:
+            return super().resolve(path)
+        segment = match[0].partition("/")[0]
+        return self._buckets.get(segment, self._fallback).resolve(path)
+
+
+def dispatch_patterns(urlpatterns):
+    """Wrap a urlpatterns list so it is resolved through a PrefixDispatchResolver."""
+    return [PrefixDispatchResolver(RoutePattern("", is_endpoint=False), urlpatterns)]
@@ -0,0 +1,57 @@
+# Generated by `./django build-static __PROJECT_NAME__` -- do not edit by hand, re-run the build.
+# Wires the output of the build into the settings. settings.py calls
+# apply_static_build(globals()) as its last statement.
+#
+# - {% static %} resolves to the fingerprinted names listed in
+#   STATIC_ROOT/staticfiles.json (ManifestStaticFilesStorage's format).
+# - With whitenoise installed, its middleware serves STATIC_ROOT including the
+#   .gz/.br variants, and fingerprinted files get a one-year immutable
+#   Cache-Control; everything else gets STATIC_BUILD_MAX_AGE.
+import os
+import json
+import importlib.util
+
+STATIC_BUILD_MANIFEST = "staticfiles.json"
+STATIC_BUILD_MAX_AGE = 60
+WHITENOISE_MIDDLEWARE = "whitenoise.middleware.WhiteNoiseMiddleware"
+
+
+def _fingerprinted_names(static_root):
+    """Fingerprinted names from the build manifest, read once when first needed."""
+    try:
+        with open(os.path.join(static_root, STATIC_BUILD_MANIFEST), "r", encoding="utf-8") as f:
+            return frozenset(json.load(f).get("paths", {}).values())
+    except (OSError, ValueError):
+        return frozenset()
+
+
+def apply_static_build(settings):
+    base_dir = settings.get("BASE_DIR") or os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if not settings.get("STATIC_ROOT"):
+        settings["STATIC_ROOT"] = os.path.join(base_dir, "__DEFAULT_STATIC_ROOT__")
+    static_root = str(settings["STATIC_ROOT"])
+    if not os.path.isfile(os.path.join(static_root, STATIC_BUILD_MANIFEST)):
+        return  # not built yet; plain static files as before
+
+    storages = dict(settings.get("STORAGES") or {})
+    storages.setdefault("default", {"BACKEND": "django.core.files.storage.FileSystemStorage"})
+    storages["staticfiles"] = {"BACKEND": "django.contrib.staticfiles.storage.ManifestStaticFilesStorage"}
+    settings["STORAGES"] = storages
+
+    if importlib.util.find_spec("whitenoise") is None:
+        return
+    middleware = list(settings.get("MIDDLEWARE", []))
+    if WHITENOISE_MIDDLEWARE not in middleware:
+        security = "django.middleware.security.SecurityMiddleware"
+        middleware.insert(middleware.index(security) + 1 if security in middleware else 0, WHITENOISE_MIDDLEWARE)
+        settings["MIDDLEWARE"] = middleware
+    settings.setdefault("WHITENOISE_MAX_AGE", STATIC_BUILD_MAX_AGE)
+    static_url = "/" + str(settings.get("STATIC_URL", "static/")).strip("/") + "/"
+    fingerprinted = []
+
+    def immutable_file_test(path, url):
+        if not fingerprinted:
+            fingerprinted.append(_fingerprinted_names(static_root))
+        return url.startswith(static_url) and url[len(static_url):] in fingerprinted[0]
+
+    settings.setdefault("WHITENOISE_IMMUTABLE_FILE_TEST", immutable_file_test)
@@ -0,0 +1,34 @@
+# Generated by `./django build-urls __PROJECT_NAME__` -- do not edit by hand, re-run the build.
+# checksum: __CHECKSUM__
+from django.contrib import admin
+from django.urls import path, include
+from django.conf import settings
+from django.conf.urls.static import static
+__URL_IMPORTS__
+urlpatterns = [
+    path('admin/', admin.site.urls),
+__URL_PATTERNS__]
+__URL_DISPATCH__
+if settings.DEBUG:
+    import os
+    import importlib
+
+    # Pick up apps added since the last build, the same way dynamic_project_urls.py does
+    BUILT_URL_APPS = __BUILT_APPS__
+    for app in settings.INSTALLED_APPS:
+        for app_prefix, urls_module, url_prefix in (("app_", "app_urls", ""), ("rest_", "rest_urls", "api/")):
+            if app.startswith(app_prefix) and app not in BUILT_URL_APPS:
+                try:
+                    importlib.import_module(f"{app}.{urls_module}")
+                    urlpatterns.append(path(f"{url_prefix}{app.replace(app_prefix, '')}/", include(f"{app}.{urls_module}")))
+                    print(f"⚠️ {app}.{urls_module} is not in the built urls.py, run `./django build-urls __PROJECT_NAME__`")
+                except ModuleNotFoundError:
+                    pass
+
+    # Ensure static and media directories exist, and serve them in development
+    if settings.STATIC_ROOT:
+        os.makedirs(settings.STATIC_ROOT, exist_ok=True)
+        urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
+    if settings.MEDIA_ROOT and settings.MEDIA_URL:
+        os.makedirs(settings.MEDIA_ROOT, exist_ok=True)
+        urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -0,0 +1,56 @@
+# Generated for __PROJECT_NAME__ -- do not edit by hand, `./django compile-templates __PROJECT_NAME__ --install` rewrites it.
+# settings.py calls apply_template_loading(globals()) as its last statement.
+#
+# Outside DEBUG the Django template loaders are wrapped in the cached loader
+# explicitly, so a template is looked up across the template directories and
+# parsed once per process. `./django compile-templates` parses every template
+# of the templates/<app>/<mod> directories ahead of time and lists them in
+# template_manifest.json; warm_template_cache() loads those into the cache
+# (the generated gunicorn config calls it in the master before forking, so
+# every worker starts with them).
+import os
+import json
+
+TEMPLATE_MANIFEST = os.path.join(os.path.dirname(os.path.abspath(__file__)), "template_manifest.json")
+DJANGO_TEMPLATES_BACKEND = "django.template.backends.django.DjangoTemplates"
+CACHED_LOADER = "django.template.loaders.cached.Loader"
+
+
+def apply_template_loading(settings):
+    if settings.get("DEBUG"):
+        return  # Django's default loaders reload edited templates
+    templates = []
+    for backend in settings.get("TEMPLATES", []):
+        backend = dict(backend)
+        options = dict(backend.get("OPTIONS", {}))
+        if backend.get("BACKEND") == DJANGO_TEMPLATES_BACKEND and "loaders" not in options:
+            loaders = ["django.template.loaders.filesystem.Loader"]
+            if backend.pop("APP_DIRS", False):  # APP_DIRS can't be combined with explicit loaders
+                loaders.append("django.template.loaders.app_directories.Loader")
+            options["loaders"] = [(CACHED_LOADER, loaders)]
+            backend["OPTIONS"] = options
+        templates.append(backend)
+    settings["TEMPLATES"] = templates
+
+
+def warm_template_cache():
+    """Load the templates listed by `./django compile-templates` through every Django engine; returns how many loaded."""
+    from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+    from django.template.backends.django import DjangoTemplates
+
+    try:
+        with open(TEMPLATE_MANIFEST, "r", encoding="utf-8") as f:
+            names = json.load(f).get("templates", [])
+    except (OSError, ValueError):
+        return 0
+    loaded = 0
+    for engine in engines.all():
+        if not isinstance(engine, DjangoTemplates):
+            continue
+        for name in names:
+            try:
+                engine.get_template(name)
+                loaded += 1
+            except (TemplateDoesNotExist, TemplateSyntaxError):
+                pass
+    return loaded
@@ -0,0 +1,11 @@
+from django.shortcuts import render
+
+from __SETTINGS_PACKAGE__.module_cache import cache_module_view
+
+# Views of __APP_NAME__.__MODULE_NAME__.
+# @cache_module_view caches a view with this module's policy from the [cache]
+# section of config.ini; use @cache_module_view(ttl=..., vary=[...]) to override it.
+#
+# @cache_module_view
+# def index(request):
+#     return render(request, "__APP_NAME__/__MODULE_NAME__/index.html")
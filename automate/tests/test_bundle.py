@@ -0,0 +1,58 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "bin"))
+
+from bundle import plan_bundle
+
+
+def _write(path, content=""):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+class PlanBundleInstalledAppsTest(unittest.TestCase):
+    def _make_project(self, root, installed_apps_source):
+        _write(os.path.join(root, "manage.py"), "")
+        _write(os.path.join(root, "project_demo", "__init__.py"))
+        _write(os.path.join(root, "project_demo", "settings.py"), installed_apps_source)
+        for app in ("app_blog", "app_shop"):
+            _write(os.path.join(root, app, "__init__.py"))
+            _write(os.path.join(root, app, "apps.py"), "")
+
+    def test_literal_installed_apps_prunes_unused_apps(self):
+        with tempfile.TemporaryDirectory() as root:
+            self._make_project(root, "INSTALLED_APPS = ['django.contrib.admin', 'app_blog']\n")
+            plan = plan_bundle(root)
+        self.assertEqual(plan["unused_apps"], ["app_shop"])
+
+    def test_non_literal_installed_apps_keeps_every_app(self):
+        with tempfile.TemporaryDirectory() as root:
+            self._make_project(root, "BASE_APPS = ['django.contrib.admin']\n"
+                                     "INSTALLED_APPS = BASE_APPS + ['app_blog']\n")
+            plan = plan_bundle(root)
+            bundled = {relative_path.split(os.sep)[0] for _, relative_path in plan["files"]}
+        self.assertEqual(plan["unused_apps"], [])
+        self.assertIn("app_blog", bundled)
+        self.assertIn("app_shop", bundled)
+
+
+class PlanBundleStubTest(unittest.TestCase):
+    def test_empty_generated_aggregator_is_pruned_unless_imported(self):
+        aggregator = "import importlib\n\n_NAME_TO_MODULE = {\n}\n\n__all__ = list(_NAME_TO_MODULE)\n"
+        with tempfile.TemporaryDirectory() as root:
+            _write(os.path.join(root, "manage.py"), "")
+            _write(os.path.join(root, "project_demo", "settings.py"), "INSTALLED_APPS = ['app_blog']\n")
+            _write(os.path.join(root, "app_blog", "apps.py"), "")
+            _write(os.path.join(root, "app_blog", "mod_app", "all_model_imports.py"), aggregator)
+            _write(os.path.join(root, "app_blog", "mod_app", "all_form_imports.py"), aggregator)
+            _write(os.path.join(root, "app_blog", "mod_app", "views_app.py"), "from .all_form_imports import *\n")
+            plan = plan_bundle(root)
+        self.assertEqual(plan["pruned_stubs"], [os.path.join("app_blog", "mod_app", "all_model_imports.py")])
+
+
+if __name__ == "__main__":
+    unittest.main()